@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_cold_start.py
+#
+# Tempo de carga "a frio" do catálogo: CSV com inferência padrão (caminho antigo),
+# CSV tipado (build_catalog) e leitura do cache colunar memory-mapped.
+# Uso: python benchmarks/bench_cold_start.py --scale 1 10
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netflix_core import build_catalog, load_catalog  # noqa: E402
+
+NETFLIX_PATH = os.path.join("data", "netflix_titles.csv")
+RATINGS_PATH = os.path.join("data", "ratings.csv")
+
+
+def legacy_load(netflix_path, ratings_path):
+    # caminho original: inferência padrão de dtypes/datas, contagens com lambda, merge por rerun
+    df = pd.read_csv(netflix_path)
+    for col in ["country", "listed_in", "cast", "director", "title", "type", "description"]:
+        df[col] = df[col].fillna("").astype(str)
+    df["date_added"] = pd.to_datetime(df["date_added"], errors="coerce")
+    df["n_countries"] = df["country"].apply(lambda x: 0 if not x else len([c.strip() for c in str(x).split(",") if c.strip()]))
+    df["n_genres"] = df["listed_in"].apply(lambda x: 0 if not x else len([g.strip() for g in str(x).split(",") if g.strip()]))
+    r = pd.read_csv(ratings_path)
+    df["title_norm"] = df["title"].str.strip().str.lower()
+    r["title_norm"] = r["title"].astype(str).str.strip().str.lower()
+    return df.merge(r[["title_norm", "score"]], on="title_norm", how="left")
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=int, nargs="+", default=[1, 10])
+    args = ap.parse_args()
+
+    base = pd.read_csv(NETFLIX_PATH)
+    ratings = pd.read_csv(RATINGS_PATH)
+    print(f"{'linhas':>9} {'CSV antigo (ms)':>16} {'CSV tipado (ms)':>16} {'cache miss (ms)':>16} {'cache hit (ms)':>15}")
+    for k in args.scale:
+        tmp = tempfile.mkdtemp(prefix="nx_bench_")
+        try:
+            netflix_path = os.path.join(tmp, "netflix_titles.csv")
+            ratings_path = os.path.join(tmp, "ratings.csv")
+            big = pd.concat([base] * k, ignore_index=True)
+            big["title"] = big["title"].astype(str) + pd.Series(range(len(big))).floordiv(len(base)).map(lambda i: f" #{i}" if i else "")
+            big.to_csv(netflix_path, index=False)
+            rk = pd.concat([ratings] * k, ignore_index=True)
+            rk["title"] = big["title"]
+            rk.to_csv(ratings_path, index=False)
+            cache_dir = os.path.join(tmp, ".cache")
+
+            t_old, _ = timed(lambda: legacy_load(netflix_path, ratings_path))
+            t_csv, _ = timed(lambda: build_catalog(netflix_path, ratings_path))
+            t_miss, _ = timed(lambda: load_catalog(netflix_path, ratings_path, cache_dir))
+            t_hit, df = timed(lambda: load_catalog(netflix_path, ratings_path, cache_dir))
+            print(f"{len(df):>9,} {t_old * 1e3:>16.1f} {t_csv * 1e3:>16.1f} {t_miss * 1e3:>16.1f} {t_hit * 1e3:>15.1f}")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
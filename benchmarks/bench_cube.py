@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_cube.py
+#
+# Agregados do Dashboard por roll-up do cubo (netflix_core/cube.py) contra o cálculo
+# linha a linha, offline: catálogo sintético ingerido, mesmos recortes nas duas rotas.
+# O cubo atende recortes de ano/score (a visão padrão incluída); com país/gênero o
+# cálculo é linha a linha nas duas rotas. Mede o tempo de compute_aggregates por recorte
+# e, à parte, só a etapa que o cubo substitui (barras de país/gênero, linha anual +
+# estatísticas, histograma e grade de score), e confere que os agregados saem iguais.
+# Uso: python benchmarks/bench_cube.py --rows 10000 100000 1000000
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from netflix_core import FilterState, build_store, compute_aggregates, default_filter_state, ingest_catalog  # noqa: E402
+from netflix_core.aggregations import DashboardAggregates, _facets, _rollup_cube, _rollup_rows  # noqa: E402
+from synthetic import write_synthetic_catalog  # noqa: E402
+
+STATES = [
+    FilterState(),
+    FilterState.from_selection(year_range=(2000, 2020)),
+    FilterState.from_selection(score_range=(6.0, 8.5)),
+    FilterState.from_selection(year_range=(2010, 2021), score_range=(5.1, 9.0)),
+]
+
+
+def same(a, b) -> bool:
+    for f in fields(a):
+        x, y = getattr(a, f.name), getattr(b, f.name)
+        if isinstance(x, (pd.Series, pd.DataFrame)):
+            ok = x.equals(y) and x.index.equals(y.index)
+        elif isinstance(x, float):
+            ok = np.isclose(x, y)
+        else:
+            ok = x == y
+        if not ok:
+            return False
+    return True
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def stage_rows(store, mask, rows):
+    agg = DashboardAggregates()
+    _facets(agg, store.bridges, mask)
+    _rollup_rows(agg, store.df, rows)
+
+
+def stage_cube(store, mask, sl):
+    agg = DashboardAggregates()
+    _facets(agg, store.bridges, mask, store.cube, sl)
+    _rollup_cube(agg, store.cube, sl)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'linhas':>10} {'células':>9} {'store (s)':>9} {'agregados linhas/cubo (ms)':>27} "
+          f"{'etapa linhas/cubo (ms)':>23} {'ganho':>6}  iguais")
+    for n in args.rows:
+        tmp = tempfile.mkdtemp(prefix="nx_cube_")
+        try:
+            data = os.path.join(tmp, "data")
+            write_synthetic_catalog(n, data)
+            catalog = ingest_catalog(os.path.join(data, "netflix_titles.csv"), os.path.join(data, "ratings.csv"),
+                                     os.path.join(data, ".cache"))
+            t0 = time.perf_counter()
+            store = build_store(catalog)
+            t_build = time.perf_counter() - t0
+            t_rows = t_cube = s_rows = s_cube = 0.0
+            ok = True
+            for state in STATES + [default_filter_state(store)]:
+                mask = state.mask(store.df, store.indexes)
+                rows, sl = np.flatnonzero(mask), state.cells(store.cube)
+                args_ = (store.df, store.bridges, mask, state)
+                kw = {"incidences": store.incidences}
+                t_rows += timed(lambda: compute_aggregates(*args_, **kw), args.repeat)
+                t_cube += timed(lambda: compute_aggregates(*args_, cube=store.cube, **kw), args.repeat)
+                s_rows += timed(lambda: stage_rows(store, mask, rows), args.repeat)
+                s_cube += timed(lambda: stage_cube(store, mask, sl), args.repeat)
+                ok &= same(compute_aggregates(*args_, **kw), compute_aggregates(*args_, cube=store.cube, **kw))
+            k = (len(STATES) + 1) / 1e3
+            print(f"{n:>10,} {len(store.cube.cells):>9,} {t_build:>9.2f} {t_rows / k:>13.1f} / {t_cube / k:<11.1f} "
+                  f"{s_rows / k:>10.1f} / {s_cube / k:<10.1f} {s_rows / s_cube:>5.1f}x  {ok}", flush=True)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_figcache.py
+#
+# Cache de figuras (netflix_core/figcache.py) num catálogo sintético, sem Streamlit.
+# Por gráfico: montar + serializar como o st.plotly_chart (falta) vs remontar do JSON
+# compacto em cache (acerto), e o tamanho do JSON enviado antes/depois da compactação.
+# Depois, uma sequência de reruns alternando recortes, com acertos/faltas do LRU.
+# Uso: python benchmarks/bench_figcache.py --rows 10000 100000
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import plotly.io as pio
+from plotly.tools import return_figure_from_figure_or_data
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from netflix_core import (  # noqa: E402
+    DASHBOARD_FIGURES,
+    FigureCache,
+    FilterState,
+    build_store,
+    compact_json,
+    compute_aggregates,
+    figure_from_json,
+    ingest_catalog,
+)
+from netflix_core.charts import build_figure, figure_inputs  # noqa: E402
+from synthetic import write_synthetic_catalog  # noqa: E402
+
+STATES = [
+    FilterState(),
+    FilterState.from_selection(["United States"]),
+    FilterState.from_selection(["India"], ["Dramas"]),
+    FilterState.from_selection(year_range=(2015, 2021)),
+]
+
+
+def to_browser(fig) -> str:
+    # o que o st.plotly_chart faz com a figura recebida
+    return pio.to_json(return_figure_from_figure_or_data(fig, validate_figure=True), validate=False)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--reruns", type=int, default=40)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    for n in args.rows:
+        tmp = tempfile.mkdtemp(prefix="nx_figcache_")
+        try:
+            netflix_path, ratings_path = write_synthetic_catalog(n, tmp, args.seed)
+            store = build_store(ingest_catalog(netflix_path, ratings_path, os.path.join(tmp, ".cache")))
+            aggs = [compute_aggregates(store.df, store.bridges, s.mask(store.df, store.indexes), s,
+                                       incidences=store.incidences, cube=store.cube) for s in STATES]
+
+            print(f"\n{n:,} títulos — recorte padrão")
+            print(f"{'gráfico':>11} {'falta (ms)':>11} {'acerto (ms)':>12} {'JSON (KB)':>10} {'compacto (KB)':>14}")
+            for name in DASHBOARD_FIGURES:
+                values = figure_inputs(aggs[0], name)
+                if values is None:
+                    continue
+                build_figure(name, *values)  # imports/caches internos do plotly fora da medição
+                t_miss = best_of(lambda: to_browser(build_figure(name, *values)), args.repeat)
+                payload = compact_json(build_figure(name, *values))
+                t_hit = best_of(lambda: to_browser(figure_from_json(payload)), args.repeat)
+                full = len(build_figure(name, *values).to_json())
+                print(f"{name:>11} {t_miss:>11.1f} {t_hit:>12.1f} {full / 1024:>10.1f} {len(payload) / 1024:>14.1f}")
+
+            cache = FigureCache()
+            t0 = time.perf_counter()
+            for i in range(args.reruns):
+                agg = aggs[i % len(aggs)]
+                for name in DASHBOARD_FIGURES:
+                    values = figure_inputs(agg, name)
+                    if values is not None:
+                        to_browser(cache.figure(name, DASHBOARD_FIGURES[name][0], *values))
+            ms = (time.perf_counter() - t0) * 1e3 / args.reruns
+            st = cache.stats()
+            print(f"{args.reruns} reruns em {len(STATES)} recortes: {ms:.0f} ms/rerun, {st['hits']} acertos / "
+                  f"{st['misses']} faltas ({st['hit_rate']:.0%}), {st['entries']} figuras, {st['bytes'] / 1024:.0f} KB")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_filters.py
+#
+# Compara o filtro antigo (lambda + split por linha) com o índice CSR.
+# Uso: python benchmarks/bench_filters.py --scale 1 10 50
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netflix_core import build_token_index, filter_mask  # noqa: E402
+
+NETFLIX_PATH = os.path.join("data", "netflix_titles.csv")
+
+STATES = [
+    ("1 país", ["Brazil"], [], (1925, 2021)),
+    ("2 países × 2 gêneros", ["United States", "India"], ["Dramas", "Comedies"], (1925, 2021)),
+    ("gênero + anos", [], ["Documentaries"], (2010, 2020)),
+]
+
+
+def legacy_filter(d, sel_countries, sel_genres, year_range):
+    # caminho original de apply_filters (dashboard_netflix.py)
+    d = d.copy()
+    y0, y1 = year_range
+    d = d[(d["release_year"] >= y0) & (d["release_year"] <= y1)]
+    if sel_countries:
+        d = d[d["country"].apply(lambda x: any(c in [s.strip() for s in str(x).split(",") if s.strip()] for c in sel_countries))]
+    if sel_genres:
+        d = d[d["listed_in"].apply(lambda x: any(g in [s.strip() for s in str(x).split(",") if s.strip()] for g in sel_genres))]
+    return d
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    base = pd.read_csv(NETFLIX_PATH)
+    for col in ["country", "listed_in"]:
+        base[col] = base[col].fillna("").astype(str)
+
+    print(f"{'linhas':>9} {'estado':<22} {'lambda (ms)':>12} {'índice (ms)':>12} {'ganho':>7}")
+    for k in args.scale:
+        df = pd.concat([base] * k, ignore_index=True)
+        t0 = time.perf_counter()
+        indexes = {col: build_token_index(df[col]) for col in ["country", "listed_in"]}
+        build = time.perf_counter() - t0
+        print(f"{len(df):>9,} {'(build do índice)':<22} {'':>12} {build * 1e3:>12.1f}")
+        for name, countries, genres, years in STATES:
+            t_old, old = best_of(lambda: legacy_filter(df, countries, genres, years), args.repeat)
+            t_new, new = best_of(lambda: df[filter_mask(df, indexes, countries, genres, years)], args.repeat)
+            assert np.array_equal(old.index.to_numpy(), new.index.to_numpy()), name
+            print(f"{len(df):>9,} {name:<22} {t_old * 1e3:>12.1f} {t_new * 1e3:>12.1f} {t_old / t_new:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
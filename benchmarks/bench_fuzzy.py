@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_fuzzy.py
+#
+# Tempo do match aproximado (blocos + rapidfuzz.process.cdist) em função do tamanho
+# do catálogo. Os títulos de ratings são versões "sujas" dos do catálogo
+# (pontuação, acentos, um erro de digitação), então nenhum casa no join exato.
+# Uso: python benchmarks/bench_fuzzy.py --sizes 10000 50000 100000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netflix_core import build_fuzzy_mapping, build_title_index, join_ratings  # noqa: E402
+
+NETFLIX_PATH = os.path.join("data", "netflix_titles.csv")
+
+
+def synthetic_titles(n, rng):
+    words = pd.read_csv(NETFLIX_PATH)["title"].astype(str).str.split().explode()
+    words = words[words.str.len() > 2].unique()
+    lens = rng.integers(2, 5, size=n)
+    picks = rng.choice(words, size=lens.sum())
+    titles = pd.Series(np.split(picks, np.cumsum(lens)[:-1])).str.join(" ")
+    return titles + " " + pd.Series(np.arange(n)).astype(str)  # títulos únicos
+
+
+def dirty(titles, rng):
+    out = titles.str.replace("e", "é", n=1, regex=False)
+    out = out.where(rng.random(len(out)) < 0.5, out + "!")
+    typo = rng.random(len(out)) < 0.3
+    # troca a segunda letra por "x" em ~30% dos títulos
+    out[typo] = out[typo].str.slice_replace(1, 2, "x")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    ap.add_argument("--threshold", type=float, default=85.0)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(7)
+    print(f"{'títulos':>9} {'match (s)':>10} {'títulos/s':>10} {'recuperados':>12}")
+    for n in args.sizes:
+        titles = synthetic_titles(n, rng)
+        df = pd.DataFrame({"title": titles, "release_year": rng.integers(1990, 2022, size=n)})
+        ratings = pd.DataFrame({"title": dirty(titles, rng), "score": rng.uniform(4, 9.5, size=n).round(1)})
+        index = build_title_index(ratings, "score")
+        df = join_ratings(df, index)
+
+        t0 = time.perf_counter()
+        mapping = build_fuzzy_mapping(df, index, args.threshold)
+        dt = time.perf_counter() - t0
+        missing = int(df["score"].isna().sum())
+        print(f"{n:>9,} {dt:>10.2f} {missing / dt:>10,.0f} {len(mapping) / max(missing, 1):>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
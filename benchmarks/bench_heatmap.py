@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_heatmap.py
+#
+# Heatmap País × Gênero: caminho antigo (copiar o recorte, explodir country e
+# listed_in, pivot_table) vs coocorrência esparsa sobre as incidências pré-montadas.
+# Uso: python benchmarks/bench_heatmap.py --scale 1 10 50
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netflix_core import build_bridges, build_incidences, heatmap_counts, load_catalog  # noqa: E402
+
+NETFLIX_PATH = os.path.join("data", "netflix_titles.csv")
+RATINGS_PATH = os.path.join("data", "ratings.csv")
+
+
+def old_heatmap(df_f: pd.DataFrame, top: int = 15) -> pd.DataFrame:
+    tmp = df_f.copy()
+    tmp["country"] = tmp["country"].str.split(",")
+    tmp = tmp.explode("country")
+    tmp["country"] = tmp["country"].str.strip()
+    tmp["listed_in"] = tmp["listed_in"].str.split(",")
+    tmp = tmp.explode("listed_in")
+    tmp["listed_in"] = tmp["listed_in"].str.strip()
+    tmp = tmp[(tmp["country"] != "") & (tmp["listed_in"] != "")]
+    top_c = tmp["country"].value_counts().head(top).index
+    top_g = tmp["listed_in"].value_counts().head(top).index
+    tmp = tmp[tmp["country"].isin(top_c) & tmp["listed_in"].isin(top_g)]
+    return tmp.pivot_table(index="country", columns="listed_in", values="title", aggfunc="size", fill_value=0)
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50])
+    args = ap.parse_args()
+
+    base = load_catalog(NETFLIX_PATH, RATINGS_PATH)
+    print(f"{'linhas':>9} {'recorte':<10} {'antes (ms)':>11} {'depois (ms)':>12} {'ganho':>7}")
+    for k in args.scale:
+        df = pd.concat([base] * k, ignore_index=True)
+        inc = build_incidences(df, build_bridges(df, ["country", "listed_in"]), ["country", "listed_in"])
+        cuts = {"tudo": np.ones(len(df), dtype=bool), "≥ 2015": (df["release_year"] >= 2015).to_numpy()}
+        for name, mask in cuts.items():
+            old = timed(lambda: old_heatmap(df[mask]))
+            new = timed(lambda: heatmap_counts(inc, mask))
+            print(f"{len(df):>9,} {name:<10} {old * 1e3:>11,.1f} {new * 1e3:>12,.1f} {old / new:>6.0f}x")
+
+
+if __name__ == "__main__":
+    main()
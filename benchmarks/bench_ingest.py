@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_ingest.py
+#
+# Carga a frio do catálogo inteiro (read_csv + tipagem + merge, depois pontes e termos
+# das descrições, como o app fazia) vs ingestão em chunks: tempo, pico de memória durante
+# a carga e memória do frame que fica residente no app (o texto pesado da ingestão fica em
+# disco, com memory-map). O pico é o RSS máximo de um processo novo por caminho: tracemalloc
+# não enxerga os buffers do Arrow, onde a ingestão guarda núcleo, pontes e texto.
+# Uso: python benchmarks/bench_ingest.py --rows 100000 500000 --chunk 50000
+
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from netflix_core import build_bridges, build_catalog, build_term_matrix, ingest_catalog  # noqa: E402
+from synthetic import write_synthetic_catalog  # noqa: E402
+
+
+def full_load(netflix_path, ratings_path):
+    df = build_catalog(netflix_path, ratings_path)
+    return df, build_bridges(df), build_term_matrix(df["description"])
+
+
+def _child(path: str, netflix_path: str, ratings_path: str, cache_dir: str, chunk: int, out):
+    import resource  # só Unix; o benchmark roda fora do app
+
+    t0 = time.perf_counter()
+    if path == "inteiro":
+        df = full_load(netflix_path, ratings_path)[0]
+    else:
+        df = ingest_catalog(netflix_path, ratings_path, cache_dir, chunk_rows=chunk).core
+    elapsed = time.perf_counter() - t0
+    out.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, int(df.memory_usage(deep=True).sum())))
+
+
+def measure(path: str, *args):
+    # processo novo (spawn) por caminho: o pico de um não contamina o outro
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(path, *args, out))
+    proc.start()
+    result = out.get()
+    proc.join()
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[100_000, 300_000])
+    ap.add_argument("--chunk", type=int, default=50_000)
+    args = ap.parse_args()
+
+    print(f"{'linhas':>9} {'caminho':<10} {'tempo (s)':>10} {'pico (MB)':>10} {'residente (MB)':>15}")
+    for n in args.rows:
+        tmp = tempfile.mkdtemp(prefix="nx_ingest_")
+        try:
+            netflix_path, ratings_path = write_synthetic_catalog(n, tmp)
+            t_full, p_full, res_full = measure("inteiro", netflix_path, ratings_path, "", args.chunk)
+            t_ing, p_ing, res_ing = measure("chunks", netflix_path, ratings_path, os.path.join(tmp, ".cache"), args.chunk)
+            for name, t, p, r in [("inteiro", t_full, p_full, res_full), ("chunks", t_ing, p_ing, res_ing)]:
+                print(f"{n:>9,} {name:<10} {t:>10.1f} {p / 2**20:>10.0f} {r / 2**20:>15.0f}")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_memory.py
+#
+# Memória por sessão: frame antigo (tudo object, cópias a cada rerun) vs frame compacto
+# (categorias, strings Arrow, inteiros reduzidos) filtrado por posições de linha.
+# Por sessão conta o que cada rerun materializa: a cópia devolvida pelo st.cache_data,
+# `df = df_raw.copy()` e o recorte copiado em apply_filters (caminho antigo) vs a cópia
+# do cache + o array de posições (caminho novo).
+# Uso: python benchmarks/bench_memory.py --scale 1 10 --sessions 1 10 50
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netflix_core import FilterState, build_bridges, build_catalog, index_from_bridge  # noqa: E402
+
+NETFLIX_PATH = os.path.join("data", "netflix_titles.csv")
+RATINGS_PATH = os.path.join("data", "ratings.csv")
+
+
+def legacy_frame(path):
+    # como o app carregava: inferência padrão, strings como objetos Python
+    df = pd.read_csv(path)
+    for col in ["country", "listed_in", "cast", "director", "title", "type", "description"]:
+        df[col] = df[col].fillna("").astype(str)
+    df["title_norm"] = df["title"].str.strip().str.lower()
+    return df
+
+
+def mb(n):
+    return n / 2**20
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=int, nargs="+", default=[1, 10])
+    ap.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    args = ap.parse_args()
+
+    base_old = legacy_frame(NETFLIX_PATH)
+    base_new = build_catalog(NETFLIX_PATH, RATINGS_PATH)
+    state = FilterState.from_selection(year_range=(2010, 2021))
+    print(f"{'linhas':>9} {'frame antigo':>13} {'frame novo':>11} {'recorte antigo':>15} {'recorte novo':>13}   (MB)")
+    per_session = {}
+    for k in args.scale:
+        old = pd.concat([base_old] * k, ignore_index=True)
+        new = pd.concat([base_new] * k, ignore_index=True)  # categorias iguais: continua categórico
+        indexes = {c: index_from_bridge(b, len(new)) for c, b in build_bridges(new, ["country", "listed_in"]).items()}
+        mask = state.mask(new, indexes)
+        old_mem = old.memory_usage(deep=True).sum()
+        new_mem = new.memory_usage(deep=True).sum()
+        old_cut = old[mask].copy().memory_usage(deep=True).sum()
+        new_cut = state.rows(new, indexes).nbytes
+        print(f"{len(old):>9,} {mb(old_mem):>13.1f} {mb(new_mem):>11.1f} {mb(old_cut):>15.1f} {mb(new_cut):>13.2f}")
+        # por rerun: cópia do cache + df_raw.copy() + recorte (antigo) | cópia do cache + posições (novo)
+        per_session[len(old)] = (2 * old_mem + old_cut, new_mem + new_cut)
+
+    print(f"\n{'linhas':>9} {'sessões':>8} {'antigo (MB)':>12} {'novo (MB)':>10} {'redução':>8}")
+    for rows, (o, n) in per_session.items():
+        for s in args.sessions:
+            print(f"{rows:>9,} {s:>8} {mb(o * s):>12.0f} {mb(n * s):>10.0f} {o / n:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_payload.py
+#
+# Tamanho do JSON enviado ao navegador pelo histograma e pelo score × ano:
+# figuras antigas (px.histogram/px.scatter com linhas cruas) vs agregadas no servidor.
+# Uso: python benchmarks/bench_payload.py --scale 1 10 50
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netflix_core import (  # noqa: E402
+    FilterState,
+    build_bridges,
+    compute_aggregates,
+    load_catalog,
+    score_histogram_figure,
+    score_year_figure,
+)
+
+NETFLIX_PATH = os.path.join("data", "netflix_titles.csv")
+RATINGS_PATH = os.path.join("data", "ratings.csv")
+
+
+def payload(fig):
+    return len(fig.to_json())
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50])
+    args = ap.parse_args()
+
+    base = load_catalog(NETFLIX_PATH, RATINGS_PATH)
+    print(f"{'linhas':>9} {'gráfico':<12} {'antes (KB)':>11} {'depois (KB)':>12} {'redução':>8}")
+    for k in args.scale:
+        df = pd.concat([base] * k, ignore_index=True)
+        mask = np.ones(len(df), dtype=bool)
+        agg = compute_aggregates(df, build_bridges(df, ["country", "listed_in"]), mask, FilterState())
+        raw = df.dropna(subset=["score", "release_year"])
+
+        old_hist = payload(px.histogram(raw, x="score", nbins=25, labels={"score": "Score"}))
+        new_hist = payload(score_histogram_figure(agg.score_hist))
+        old_sc = payload(px.scatter(raw, x="release_year", y="score", hover_name="title",
+                                       labels={"release_year": "Ano", "score": "Score"}))
+        new_sc = payload(score_year_figure(agg.scatter, agg.score_grid))
+        for name, old, new in [("histograma", old_hist, new_hist), ("score × ano", old_sc, new_sc)]:
+            print(f"{len(df):>9,} {name:<12} {old / 1024:>11,.1f} {new / 1024:>12,.1f} {old / new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
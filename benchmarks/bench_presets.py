@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_presets.py
+#
+# Presets com snapshot (netflix_core/presets.py) num catálogo sintético, sem Streamlit:
+# tempo para montar os snapshots de N presets (o que roda em segundo plano quando as
+# fontes mudam), tamanho do SQLite e a abertura de cada preset — leitura fria (SQLite +
+# unpickle, processo recém-iniciado), quente (memória) e o cálculo completo que ela evita
+# (agregados + figuras + nuvem).
+# Uso: python benchmarks/bench_presets.py --rows 10000 100000
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from netflix_core import FilterState, PresetStore, build_store, ingest_catalog, warm_view  # noqa: E402
+from synthetic import write_synthetic_catalog  # noqa: E402
+
+PRESETS = {
+    "Brasil": FilterState.from_selection(["Brazil"]),
+    "EUA + Índia, dramas": FilterState.from_selection(["United States", "India"], ["Dramas"]),
+    "Anos 2015–2021": FilterState.from_selection(year_range=(2015, 2021)),
+    "Comédias": FilterState.from_selection(sel_genres=["Comedies"]),
+}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000])
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    for n in args.rows:
+        tmp = tempfile.mkdtemp(prefix="nx_presets_")
+        try:
+            netflix_path, ratings_path = write_synthetic_catalog(n, tmp, args.seed)
+            store = build_store(ingest_catalog(netflix_path, ratings_path, os.path.join(tmp, ".cache")))
+            signature = store.content_id
+            db = os.path.join(tmp, "presets.sqlite")
+            presets = PresetStore(db)
+            for name, state in PRESETS.items():
+                presets.save(name, state)
+
+            t0 = time.perf_counter()
+            built = presets.refresh(store, signature)
+            t_build = (time.perf_counter() - t0) * 1e3
+            print(f"\n{n:,} títulos — {built} snapshots em {t_build:,.0f} ms, SQLite {os.path.getsize(db) / 1024:,.0f} KB")
+            print(f"{'preset':>22} {'cálculo (ms)':>13} {'frio (ms)':>10} {'quente (ms)':>12}")
+            for name, state in PRESETS.items():
+                t0 = time.perf_counter()
+                warm_view(store, state, mode="serial")
+                t_full = (time.perf_counter() - t0) * 1e3
+                cold = PresetStore(db)  # sem nada em memória, como num processo novo
+                t0 = time.perf_counter()
+                view = cold.view(state.key(), signature)
+                t_cold = (time.perf_counter() - t0) * 1e3
+                times = []
+                for _ in range(20):
+                    t0 = time.perf_counter()
+                    cold.view(state.key(), signature)
+                    times.append((time.perf_counter() - t0) * 1e3)
+                assert view is not None
+                print(f"{name:>22} {t_full:>13,.0f} {t_cold:>10.1f} {np.median(times):>12.3f}")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_ranking.py
+#
+# Top 10 por score (netflix_core/ranking.py) num catálogo sintético, sem Streamlit:
+# ordenar as linhas do recorte a cada rerun (top_by_score) vs percorrer as listas
+# pré-ordenadas do ranking contra a máscara. Confere que os dois dão as mesmas linhas.
+# O foco por país compara também o filtro antigo por substring (str.contains) com o
+# token exato: "divergências" = recortes em que o substring trazia títulos de outro país.
+# Uso: python benchmarks/bench_ranking.py --rows 10000 100000 1000000
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from netflix_core import FilterState, build_store, facet_mask, ingest_catalog  # noqa: E402
+from netflix_core.aggregations import top_by_score  # noqa: E402
+from netflix_core.ranking import build_ranking  # noqa: E402
+from synthetic import COUNTRIES, write_synthetic_catalog  # noqa: E402
+
+STATES = [
+    ("padrão", FilterState()),
+    ("1 país", FilterState.from_selection(["United States"])),
+    ("país raro", FilterState.from_selection(["Nigeria"])),
+    ("país + gênero", FilterState.from_selection(["India"], ["Dramas"])),
+    ("3 países", FilterState.from_selection(["France", "Japan", "Egypt"])),
+    ("anos + score", FilterState.from_selection(year_range=(2015, 2021), score_range=(6.0, 9.0))),
+]
+
+
+def best_of(fn, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    for n in args.rows:
+        tmp = tempfile.mkdtemp(prefix="nx_rank_")
+        try:
+            netflix_path, ratings_path = write_synthetic_catalog(n, tmp, args.seed)
+            store = build_store(ingest_catalog(netflix_path, ratings_path, os.path.join(tmp, ".cache")))
+            df, ranking = store.df, store.ranking
+            t_build, _ = best_of(lambda: build_ranking(df, store.indexes), 1)
+            score = df["score"].to_numpy(dtype=float, na_value=np.nan)
+
+            print(f"\n{n:,} títulos — ranking montado em {t_build:,.0f} ms")
+            print(f"{'recorte':>14} {'linhas':>9} {'sort (ms)':>10} {'ranking (ms)':>13} {'iguais':>7}")
+            for label, state in STATES:
+                mask = state.mask(df, store.indexes)
+                t_sort, old = best_of(lambda: top_by_score(df, np.flatnonzero(mask)), args.repeat)
+                sel = {"country": state.countries, "listed_in": state.genres}
+                t_rank, new = best_of(lambda: ranking.top(mask, 10, sel), args.repeat)
+                same = np.array_equal(old.index.to_numpy(), df.index[new].to_numpy())
+                print(f"{label:>14} {int(mask.sum()):>9,} {t_sort:>10.2f} {t_rank:>13.3f} {'sim' if same else 'NÃO':>7}")
+
+            # foco por país: substring no texto vs token exato
+            t_old = t_new = 0.0
+            diverged = 0
+            for pais in COUNTRIES:
+                t, old = best_of(lambda: df["country"].str.contains(pais, na=False, regex=False).to_numpy(), 1)
+                t_old += t
+                t, new = best_of(lambda: facet_mask(store.bridges["country"], [pais], len(df)), 1)
+                t_new += t
+                diverged += int(not np.array_equal(old & ~np.isnan(score), new & ~np.isnan(score)))
+            print(f"{'foco (' + str(len(COUNTRIES)) + ' países)':>14} {'':>9} {t_old:>10.2f} {t_new:>13.3f}"
+                  f"   divergências substring × token: {diverged}")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_refresh.py
+#
+# Refresh incremental (netflix_core/refresh.py) contra ingestão completa, offline:
+# gera um catálogo sintético, ingere, aplica um "drop" novo do CSV (linhas removidas,
+# alteradas e inseridas em posições aleatórias, mais scores alterados no ratings.csv)
+# e compara tempo e resultado das duas rotas. Núcleo, pontes, texto e contagens de
+# termos por linha devem sair idênticos; o vocabulário da nuvem é comparado pelas
+# frequências do catálogo inteiro.
+# Uso: python benchmarks/bench_refresh.py --rows 100000 --change 0.001 0.01 0.1
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from netflix_core import ingest_catalog, refresh_ingested  # noqa: E402
+from synthetic import synthetic_catalog  # noqa: E402
+
+
+def mutate(titles: pd.DataFrame, ratings: pd.DataFrame, frac: float, seed: int):
+    # frac das linhas removidas, frac alteradas (descrição/país/gênero) e frac inseridas
+    rng = np.random.default_rng(seed)
+    n = len(titles)
+    k = max(1, int(n * frac))
+    titles = titles.drop(index=rng.choice(n, k, replace=False)).reset_index(drop=True)
+    upd = rng.choice(len(titles), k, replace=False)
+    titles.loc[upd, "description"] = titles.loc[upd, "description"].fillna("") + " revised edition"
+    titles.loc[upd[::2], "country"] = "Brazil, Portugal"
+    titles.loc[upd[1::2], "listed_in"] = "Dramas"
+    extra, _ = synthetic_catalog(k, seed + 1)
+    extra["show_id"] = "n" + pd.Series(np.arange(k)).astype(str)
+    extra["title"] = extra["title"] + " (novo)"
+    at = np.sort(rng.integers(0, len(titles) + 1, k))
+    parts, prev = [], 0
+    for i, cut in enumerate(at):
+        parts += [titles.iloc[prev:cut], extra.iloc[i:i + 1]]
+        prev = cut
+    titles = pd.concat(parts + [titles.iloc[prev:]], ignore_index=True)
+    ratings = ratings.copy()
+    ratings.loc[rng.choice(len(ratings), k, replace=False), "score"] = 9.9
+    return titles, ratings
+
+
+def compare(a, b) -> dict:
+    text_ok = a.text is None and b.text is None or all(
+        a.text.take(c, np.arange(len(a.core))).equals(b.text.take(c, np.arange(len(b.core)))) for c in a.text.columns)
+    fa, fb = a.terms.frequencies(max_words=100_000), b.terms.frequencies(max_words=100_000)
+    common = set(fa) & set(fb)
+    # contagens por linha: soma de termos de cada título (independe do vocabulário)
+    rows_a = np.bincount(a.terms.row_ids, weights=a.terms.counts, minlength=len(a.core))
+    rows_b = np.bincount(b.terms.row_ids, weights=b.terms.counts, minlength=len(b.core))
+    return {
+        "núcleo": a.core.equals(b.core) and list(a.core.dtypes) == list(b.core.dtypes),
+        "pontes": a.bridges.keys() == b.bridges.keys() and all(a.bridges[c].equals(b.bridges[c]) for c in a.bridges),
+        "texto": text_ok,
+        "termos/linha": np.array_equal(rows_a, rows_b),
+        "vocab igual": f"{sum(fa[w] == fb[w] for w in common) / max(len(fb), 1):.1%}",
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--change", type=float, nargs="+", default=[0.001, 0.01, 0.1])
+    ap.add_argument("--chunk-rows", type=int, default=50_000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="nx_refresh_")
+    try:
+        titles, ratings = synthetic_catalog(args.rows, args.seed)
+        print(f"{'linhas':>9} {'mudança':>8} {'diff (+/~/-)':>24} {'completa (s)':>13} {'refresh (s)':>12}  verificação")
+        for frac in args.change:
+            src, inc, full = (os.path.join(tmp, d) for d in ("src", "inc", "full"))
+            for d in (src, inc, full):
+                shutil.rmtree(d, ignore_errors=True)
+                os.makedirs(d)
+            netflix_path, ratings_path = os.path.join(src, "netflix_titles.csv"), os.path.join(src, "ratings.csv")
+            titles.to_csv(netflix_path, index=False)
+            ratings.to_csv(ratings_path, index=False)
+            ingest_catalog(netflix_path, ratings_path, inc, args.chunk_rows)
+
+            new_titles, new_ratings = mutate(titles, ratings, frac, args.seed)
+            new_titles.to_csv(netflix_path, index=False)
+            new_ratings.to_csv(ratings_path, index=False)
+
+            t0 = time.perf_counter()
+            res = refresh_ingested(netflix_path, ratings_path, inc, chunk_rows=args.chunk_rows)
+            t_inc = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            ref = ingest_catalog(netflix_path, ratings_path, full, args.chunk_rows)
+            t_full = time.perf_counter() - t0
+
+            d = res.diff
+            diff = "completa" if d is None else f"+{d.inserted:,}/~{d.updated:,}/-{d.deleted:,}"
+            checks = " ".join(f"{k}={v}" for k, v in compare(res.catalog, ref).items())
+            print(f"{len(new_titles):>9,} {frac:>8.1%} {diff:>24} {t_full:>13.2f} {t_inc:>12.2f}  {checks}", flush=True)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_search.py
+#
+# Busca textual (netflix_core/search.py) num catálogo sintético: tempo de montagem
+# do índice invertido, memória (arrays do índice e crescimento do RSS) e latência
+# das consultas (p50/p95/máx) com e sem prefixo, sozinhas e combinadas com um filtro
+# da sidebar. As consultas saem do próprio índice: termos comuns e raros (título,
+# elenco, direção ou descrição), pares de termos da mesma descrição e prefixos de 3 letras.
+# Uso: python benchmarks/bench_search.py --rows 100000 1000000
+
+import argparse
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from netflix_core import FilterState, build_search_index, index_from_bridge, ingest_catalog, query_tokens  # noqa: E402
+from bench_sessions import rss_mb, settle  # noqa: E402
+from synthetic import write_synthetic_catalog  # noqa: E402
+
+
+def sample_queries(index, text, n: int, seed: int):
+    # termos por faixa de frequência (df), pares da mesma descrição e prefixos, todos presentes no índice
+    rng = np.random.default_rng(seed)
+    pairs = [query_tokens(d)[:2] for d in text.take("description", rng.choice(index.n_rows, n)).fillna("")]
+    df = np.diff(index.indptr)
+    order = np.argsort(-df)
+    # comuns: os 200 termos de maior df; raros: df até 5 (no sintético, o nº no fim de cada título é único)
+    common, rare = order[:200], np.flatnonzero((df > 0) & (df <= 5))
+    pick = lambda pool: index.vocab[rng.choice(pool)]  # noqa: E731
+    out = []
+    for i in range(n):
+        out += [
+            ("termo comum", pick(common), False),
+            ("termo raro", pick(rare), False),
+            ("dois termos", " ".join(pairs[i]), False),
+            ("prefixo (3)", pick(common)[:3], True),
+        ]
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[100_000])
+    ap.add_argument("--queries", type=int, default=50, help="consultas por tipo")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    for n in args.rows:
+        tmp = tempfile.mkdtemp(prefix="nx_search_")
+        try:
+            data = os.path.join(tmp, "data")
+            write_synthetic_catalog(n, data, args.seed)
+            catalog = ingest_catalog(os.path.join(data, "netflix_titles.csv"), os.path.join(data, "ratings.csv"),
+                                     os.path.join(data, ".cache"))
+            before = settle()
+            t0 = time.perf_counter()
+            index = build_search_index(catalog.core, catalog.text)
+            t_build = time.perf_counter() - t0
+            gc.collect()
+            print(f"\n{n:,} títulos: índice em {t_build:.1f} s, {index.vocab.size:,} termos, {index.rows.size:,} postings, "
+                  f"{index.nbytes() / 2**20:.0f} MB (RSS +{settle() - before:.0f} MB, processo {rss_mb():.0f} MB)")
+
+            countries = index_from_bridge(catalog.bridges["country"], n)
+            state = FilterState(countries=("United States", "India"))
+            filtro = state.mask(catalog.core, {"country": countries})
+            print(f"{'consulta':>14} {'filtro':>7} {'p50 (ms)':>9} {'p95 (ms)':>9} {'máx (ms)':>9} {'achados':>9}")
+            queries = sample_queries(index, catalog.text, args.queries, args.seed)
+            for kind in dict.fromkeys(k for k, _, _ in queries):
+                for mask in (None, filtro):
+                    times, hits = [], []
+                    for _, q, prefix in (x for x in queries if x[0] == kind):
+                        t0 = time.perf_counter()
+                        rows, _ = index.search(q, prefix=prefix, mask=mask, limit=20)
+                        times.append((time.perf_counter() - t0) * 1e3)
+                        found = index.mask(q, prefix)
+                        hits.append(int(found.sum() if mask is None else (found & mask).sum()))
+                    p50, p95, mx = np.percentile(times, 50), np.percentile(times, 95), max(times)
+                    print(f"{kind:>14} {'sim' if mask is not None else 'não':>7} {p50:>9.1f} {p95:>9.1f} {mx:>9.1f} "
+                          f"{int(np.median(hits)):>9,}", flush=True)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
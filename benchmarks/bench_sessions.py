@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_sessions.py
+#
+# Teste de carga de memória: simula N sessões do dashboard no mesmo processo
+# (streamlit.testing AppTest, cada uma com seu session_state e filtros próprios)
+# e mede o RSS do processo conforme as sessões se acumulam. O catálogo vem do
+# st.cache_resource (um por processo), então o crescimento por sessão deve ficar
+# restrito às seleções, máscaras e ao que a própria sessão renderiza.
+# Uso: python benchmarks/bench_sessions.py --sessions 1 10 50
+#      python benchmarks/bench_sessions.py --rows 100000 --sessions 1 10 30   (catálogo sintético)
+#      python benchmarks/bench_sessions.py --script /tmp/dashboard_antigo.py  (compara outra versão do app)
+
+import argparse
+import ctypes
+import gc
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from synthetic import write_synthetic_catalog  # noqa: E402
+
+# recortes variados: sessões diferentes não batem todas na mesma entrada do memo
+SELECTIONS = [
+    ([], []),
+    (["United States"], []),
+    (["India"], ["Dramas"]),
+    (["Brazil"], []),
+    (["United Kingdom", "Canada"], ["Comedies"]),
+    ([], ["Documentaries"]),
+    (["Japan"], ["Anime Series"]),
+    (["France", "Spain"], []),
+]
+
+
+def rss_mb() -> float:
+    # RSS atual (Linux); fora do Linux cai para o pico (ru_maxrss)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def settle() -> float:
+    # coleta + devolve ao SO a memória livre do malloc (glibc): o RSS reflete o que está vivo
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except OSError:
+        pass
+    return rss_mb()
+
+
+def open_session(script: str, i: int) -> AppTest:
+    at = AppTest.from_file(script, default_timeout=600)
+    at.run()
+    at.radio(key="view").set_value("Dashboard").run()
+    countries, genres = SELECTIONS[i % len(SELECTIONS)]
+    ms = at.sidebar.multiselect
+    ms[0].set_value([c for c in countries if c in ms[0].options])
+    ms[1].set_value([g for g in genres if g in ms[1].options])
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return at
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    ap.add_argument("--rows", type=int, help="catálogo sintético com N linhas (padrão: data/ do repositório)")
+    ap.add_argument("--script", default=os.path.join(ROOT, "dashboard_netflix.py"))
+    args = ap.parse_args()
+
+    script = os.path.abspath(args.script)
+    tmp = None
+    if args.rows:
+        # o app lê data/ relativo ao diretório corrente
+        tmp = tempfile.mkdtemp(prefix="nx_sessions_")
+        write_synthetic_catalog(args.rows, os.path.join(tmp, "data"))
+        os.chdir(tmp)
+    else:
+        os.chdir(ROOT)
+
+    try:
+        # aquecimento: carrega o catálogo (ingestão + cache compartilhado) e descarta a sessão
+        t0 = time.perf_counter()
+        open_session(script, 0)
+        base = settle()
+        print(f"RSS após carregar o catálogo: {base:.1f} MB ({time.perf_counter() - t0:.1f} s)")
+        print(f"{'sessões':>8} {'RSS (MB)':>10} {'crescimento':>12} {'MB/sessão':>10} {'tempo (s)':>10}")
+        sessions = []
+        t0 = time.perf_counter()
+        for target in sorted(args.sessions):
+            while len(sessions) < target:
+                sessions.append(open_session(script, len(sessions)))
+            rss = settle()
+            print(f"{len(sessions):>8} {rss:>10.1f} {rss - base:>12.1f} {(rss - base) / len(sessions):>10.2f} "
+                  f"{time.perf_counter() - t0:>10.1f}", flush=True)
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
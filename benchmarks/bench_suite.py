@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# benchmarks/bench_suite.py
+#
+# Linha de base do caminho de dados do dashboard, sem Streamlit: para cada tamanho de
+# catálogo sintético (benchmarks/synthetic.py) mede latência (melhor de N) e pico de
+# memória (tracemalloc) de cada etapa — leitura/tipagem, ratings, pontes, índices,
+# filtro, agregações por gráfico, termos e figuras.
+# Uso: python benchmarks/bench_suite.py --rows 10000 100000 1000000 --json baseline.json
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from netflix_core import (  # noqa: E402
+    FilterState,
+    build_bridges,
+    build_incidences,
+    build_term_matrix,
+    build_title_index,
+    compute_aggregates,
+    facet_counts,
+    heatmap_counts,
+    index_from_bridge,
+    join_ratings,
+    prepare_catalog,
+    read_ratings,
+    score_histogram_figure,
+    score_year_figure,
+)
+from netflix_core.aggregations import score_histogram, score_year_grid, top_by_score  # noqa: E402
+from netflix_core.io import read_csv  # noqa: E402
+from synthetic import write_synthetic_catalog  # noqa: E402
+
+STATES = {
+    "padrão": FilterState(),
+    "1 país": FilterState.from_selection(["Brazil"]),
+    "2 países × 2 gêneros": FilterState.from_selection(["United States", "India"], ["Dramas", "Comedies"]),
+    "anos 2015–2021": FilterState.from_selection(year_range=(2015, 2021)),
+}
+
+
+def measure(fn, repeat: int, mem: bool):
+    # melhor tempo de `repeat` chamadas; pico de memória numa chamada extra com tracemalloc
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    peak = None
+    if mem:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return out, best * 1e3, peak
+
+
+def run_size(n_rows: int, repeat: int, mem: bool, seed: int):
+    tmp = tempfile.mkdtemp(prefix="nx_suite_")
+    results = []
+
+    def stage(name, fn, rows=None, rep=repeat):
+        out, ms, peak = measure(fn, rep, mem)
+        results.append({"rows": n_rows, "stage": name, "ms": round(ms, 2),
+                        "peak_mb": None if peak is None else round(peak / 2**20, 1)})
+        mb = "" if peak is None else f"{peak / 2**20:>10.1f}"
+        print(f"{n_rows:>9,} {name:<34} {ms:>11.1f} {mb}", flush=True)
+        return out
+
+    try:
+        netflix_path, ratings_path = write_synthetic_catalog(n_rows, tmp, seed)
+        df = stage("leitura + tipagem (CSV)", lambda: prepare_catalog(read_csv(netflix_path)), rep=1)
+        index = stage("ratings: índice de títulos", lambda: build_title_index(*read_ratings(ratings_path)), rep=1)
+        df = stage("ratings: join", lambda: join_ratings(df.copy(), index))
+        bridges = stage("pontes (país/gênero/elenco/direção)", lambda: build_bridges(df), rep=1)
+        indexes = stage("índices de filtro", lambda: {c: index_from_bridge(bridges[c], len(df))
+                                                       for c in ["country", "listed_in"]})
+        incidences = stage("incidências (coocorrência)", lambda: build_incidences(df, bridges))
+
+        for label, state in STATES.items():
+            mask = stage(f"filtro: {label}", lambda: state.mask(df, indexes))
+            stage(f"agregações: {label}", lambda: compute_aggregates(df, bridges, mask, state, incidences))
+
+        mask = np.ones(len(df), dtype=bool)
+        scores = df["score"].dropna().to_numpy(dtype=float)
+        pts = df.dropna(subset=["score", "release_year"])
+        stage("gráfico: contagem por país", lambda: facet_counts(bridges["country"], mask))
+        stage("gráfico: contagem por gênero", lambda: facet_counts(bridges["listed_in"], mask))
+        stage("gráfico: heatmap país × gênero", lambda: heatmap_counts(incidences, mask))
+        stage("gráfico: lançamentos por ano", lambda: df.groupby("release_year").size())
+        stage("gráfico: top 10 por score", lambda: top_by_score(df))
+        hist = stage("gráfico: histograma de score", lambda: score_histogram(scores))
+        grid = stage("gráfico: grade score × ano", lambda: score_year_grid(pts["release_year"].to_numpy(dtype=float),
+                                                                         pts["score"].to_numpy(dtype=float)))
+        stage("figuras: histograma + score × ano", lambda: (score_histogram_figure(hist),
+                                                           score_year_figure(pts.iloc[:0], grid)))
+        terms = stage("termos das descrições", lambda: build_term_matrix(df["description"]), rep=1)
+        stage("nuvem: frequências do recorte", lambda: terms.frequencies(mask))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--no-mem", action="store_true", help="sem tracemalloc (mais rápido)")
+    ap.add_argument("--json", help="grava os resultados (linha de base para comparar depois)")
+    args = ap.parse_args()
+
+    print(f"{'linhas':>9} {'etapa':<34} {'tempo (ms)':>11} {'pico (MB)':>10}")
+    results = []
+    for n in args.rows:
+        results += run_size(n, args.repeat, not args.no_mem, args.seed)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# benchmarks/synthetic.py
+#
+# Catálogo sintético no formato de netflix_titles.csv + ratings.csv, de 10 mil a
+# 1 milhão de linhas. Distribuições aproximadas às do Kaggle: país/gênero com
+# cauda longa (Zipf), 1–3 gêneros, elenco de 0–15 nomes, descrições de ~25 palavras.
+# Determinístico pela seed. Uso direto: python benchmarks/synthetic.py 100000 /tmp/nx
+
+import os
+import sys
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+COUNTRIES = [
+    "United States", "India", "United Kingdom", "Canada", "France", "Japan", "Spain", "South Korea",
+    "Germany", "Mexico", "China", "Australia", "Egypt", "Turkey", "Hong Kong", "Nigeria", "Italy",
+    "Brazil", "Argentina", "Belgium", "Indonesia", "Taiwan", "Philippines", "Thailand", "South Africa",
+    "Colombia", "Netherlands", "Denmark", "Sweden", "Poland", "Ireland", "Israel", "Lebanon", "Norway",
+    "Chile", "Russia", "New Zealand", "Malaysia", "Singapore", "Portugal", "Switzerland", "Austria",
+    "United Arab Emirates", "Saudi Arabia", "Peru", "Romania", "Ghana", "Kenya", "Czech Republic", "Greece",
+]
+GENRES_MOVIE = [
+    "International Movies", "Dramas", "Comedies", "Documentaries", "Action & Adventure", "Independent Movies",
+    "Children & Family Movies", "Romantic Movies", "Thrillers", "Music & Musicals", "Horror Movies",
+    "Stand-Up Comedy", "Sci-Fi & Fantasy", "Sports Movies", "Classic Movies", "LGBTQ Movies", "Cult Movies",
+    "Anime Features", "Faith & Spirituality", "Movies",
+]
+GENRES_TV = [
+    "International TV Shows", "TV Dramas", "TV Comedies", "Crime TV Shows", "Kids' TV", "Docuseries",
+    "Romantic TV Shows", "Reality TV", "British TV Shows", "Anime Series", "Spanish-Language TV Shows",
+    "TV Action & Adventure", "Korean TV Shows", "Science & Nature TV", "TV Mysteries", "TV Sci-Fi & Fantasy",
+    "TV Horror", "Teen TV Shows", "TV Thrillers", "Stand-Up Comedy & Talk Shows", "Classic & Cult TV", "TV Shows",
+]
+RATINGS = ["TV-MA", "TV-14", "TV-PG", "R", "PG-13", "TV-Y7", "TV-Y", "PG", "TV-G", "NR", "G", "NC-17"]
+RATING_WEIGHTS = [36, 25, 10, 9, 5, 4, 3.5, 3.3, 2.5, 0.9, 0.5, 0.1]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+          "October", "November", "December"]
+SYLLABLES = ["ka", "ri", "mo", "ta", "el", "an", "sa", "lu", "ve", "do", "ni", "ra", "be", "co", "mi", "jo", "th", "or"]
+COMMON_WORDS = ["a", "the", "his", "her", "and", "of", "to", "in", "with", "when", "young", "family", "life",
+                "friends", "love", "world", "secret", "must", "new", "after", "their", "finds", "woman", "man"]
+
+
+def _zipf_choice(rng: np.random.Generator, n_items: int, size: int, a: float = 1.1) -> np.ndarray:
+    w = 1.0 / np.arange(1, n_items + 1) ** a
+    return rng.choice(n_items, size=size, p=w / w.sum())
+
+
+def _words(rng: np.random.Generator, n: int) -> np.ndarray:
+    # vocabulário artificial: 2–3 sílabas
+    a, b, c = (rng.integers(0, len(SYLLABLES), n) for _ in range(3))
+    three = rng.random(n) < 0.5
+    syl = np.asarray(SYLLABLES, dtype=object)
+    return np.where(three, syl[a] + syl[b] + syl[c], syl[a] + syl[b])
+
+
+def _join_lists(tokens: np.ndarray, counts: np.ndarray, sep: str = ", ") -> np.ndarray:
+    # tokens achatados + nº por linha → uma string por linha ("" quando 0)
+    out = np.full(counts.size, "", dtype=object)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    for i in np.flatnonzero(counts):
+        out[i] = sep.join(tokens[starts[i]:ends[i]])
+    return out
+
+
+def _multi(rng, labels, n_rows, count_p, zipf_a=1.1) -> np.ndarray:
+    counts = rng.choice(len(count_p), size=n_rows, p=count_p)
+    idx = _zipf_choice(rng, len(labels), int(counts.sum()), zipf_a)
+    return _join_lists(np.asarray(labels, dtype=object)[idx], counts)
+
+
+def synthetic_catalog(n_rows: int, seed: int = 0, n_people: int = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    is_movie = rng.random(n_rows) < 0.70
+    n_people = n_people or max(2000, n_rows * 4)
+    people = pd.unique(pd.Series(_words(rng, n_people)).str.title() + " " + pd.Series(_words(rng, n_people)).str.title())
+
+    # países: 9% sem país, maioria com 1, cauda até 5
+    country = _multi(rng, COUNTRIES, n_rows, [0.09, 0.76, 0.10, 0.03, 0.015, 0.005], zipf_a=1.3)
+    g_movie = _multi(rng, GENRES_MOVIE, n_rows, [0, 0.30, 0.45, 0.25], zipf_a=0.9)
+    g_tv = _multi(rng, GENRES_TV, n_rows, [0, 0.30, 0.45, 0.25], zipf_a=0.9)
+    listed_in = np.where(is_movie, g_movie, g_tv)
+    cast = _multi(rng, people, n_rows, np.r_[0.09, np.full(15, 0.91 / 15)], zipf_a=0.6)
+    director = _multi(rng, people, n_rows, [0.30, 0.65, 0.05], zipf_a=0.6)
+
+    n_desc = rng.integers(18, 32, n_rows)
+    vocab = np.concatenate([np.asarray(COMMON_WORDS, dtype=object), _words(rng, 5000)])
+    desc_tokens = vocab[_zipf_choice(rng, vocab.size, int(n_desc.sum()), 1.0)]
+    description = _join_lists(desc_tokens, n_desc, sep=" ")
+
+    title_words = _words(rng, n_rows * 2).reshape(n_rows, 2)
+    titles = (pd.Series(title_words[:, 0]).str.title() + " " + pd.Series(title_words[:, 1]) +
+              " " + pd.Series(np.arange(n_rows)).astype(str))
+
+    release_year = np.clip(np.round(2021 - rng.gamma(1.4, 5.0, n_rows)), 1925, 2021).astype(int)
+    added_year = np.clip(np.maximum(release_year, 2008) + rng.integers(0, 4, n_rows), 2008, 2021)
+    date_added = (pd.Series(np.asarray(MONTHS, dtype=object)[rng.integers(0, 12, n_rows)]) + " " +
+                  pd.Series(rng.integers(1, 29, n_rows)).astype(str) + ", " + pd.Series(added_year).astype(str))
+    date_added[rng.random(n_rows) < 0.01] = None
+    duration = np.where(is_movie, pd.Series(rng.integers(60, 180, n_rows)).astype(str) + " min",
+                        pd.Series(rng.integers(1, 6, n_rows)).astype(str) + " Season")
+    rating_p = np.asarray(RATING_WEIGHTS) / sum(RATING_WEIGHTS)
+
+    titles_df = pd.DataFrame({
+        "show_id": "s" + pd.Series(np.arange(1, n_rows + 1)).astype(str),
+        "type": np.where(is_movie, "Movie", "TV Show"),
+        "title": titles,
+        "director": director,
+        "cast": cast,
+        "country": country,
+        "date_added": date_added,
+        "release_year": release_year,
+        "rating": np.asarray(RATINGS, dtype=object)[rng.choice(len(RATINGS), n_rows, p=rating_p)],
+        "duration": duration,
+        "listed_in": listed_in,
+        "description": description,
+    })
+    for col in ["director", "cast", "country"]:
+        titles_df.loc[titles_df[col] == "", col] = None
+
+    # ratings.csv: ~95% dos títulos, alguns com caixa/espaço diferentes e duplicados
+    rated = titles_df["title"][rng.random(n_rows) < 0.95]
+    noisy = rng.random(rated.size) < 0.05
+    rated = rated.where(~noisy, rated.str.upper() + " ")
+    ratings_df = pd.DataFrame({"title": rated.to_numpy(), "score": np.round(np.clip(rng.normal(6.5, 1.2, rated.size), 1, 10), 1)})
+    dup = ratings_df.sample(frac=0.01, random_state=seed)
+    ratings_df = pd.concat([ratings_df, dup], ignore_index=True)
+    return titles_df, ratings_df
+
+
+def write_synthetic_catalog(n_rows: int, out_dir: str, seed: int = 0) -> Tuple[str, str]:
+    titles_df, ratings_df = synthetic_catalog(n_rows, seed)
+    os.makedirs(out_dir, exist_ok=True)
+    netflix_path = os.path.join(out_dir, "netflix_titles.csv")
+    ratings_path = os.path.join(out_dir, "ratings.csv")
+    titles_df.to_csv(netflix_path, index=False)
+    ratings_df.to_csv(ratings_path, index=False)
+    return netflix_path, ratings_path
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(write_synthetic_catalog(n, sys.argv[2] if len(sys.argv) > 2 else "synthetic"))
@@ -1,14 +1,57 @@
 # -*- coding: utf-8 -*-
 # dashboard_netflix.py
 
+import base64
+import functools
+import html
 import os
-from typing import Optional, Tuple
+import re
+import sqlite3
+import tempfile
+from typing import Hashable, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
-from wordcloud import WordCloud, STOPWORDS
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from netflix_core import (
+    CatalogDiff,
+    CatalogStore,
+    DashboardAggregates,
+    FigureCache,
+    FilterState,
+    ImageAsset,
+    PerfRecorder,
+    PresetStore,
+    Snapshot,
+    SnapshotSwap,
+    TOP_GENRES,
+    WarmView,
+    WarmupTask,
+    build_image_variant,
+    build_store,
+    build_title_index,
+    catalog_sources,
+    compute_aggregates,
+    country_map_figure,
+    default_filter_state,
+    figure_from_json,
+    genre_bar_figure,
+    genre_treemap_figure,
+    heatmap_counts,
+    heatmap_figure,
+    mark_cache_miss,
+    read_ratings,
+    refresh_ingested,
+    render_wordcloud,
+    score_histogram_figure,
+    score_year_figure,
+    strategic_bullets,
+    top_titles_figure,
+    yearly_figure,
+)
 
 # =========================
 # Configuração de página/UI
@@ -40,13 +83,14 @@ h1, h2, h3, h4 {{ font-weight: 700; }}
 /* remove ícones de âncora dos títulos */
 h1 a, h2 a, h3 a {{ display: none !important; }}
 
-/* Tabs */
-.stTabs [data-baseweb="tab-list"]{{ gap: 8px; margin-top: 6px; padding-bottom: 6px; }}
-.stTabs [data-baseweb="tab"]{{
+/* Navegação (radio horizontal com cara de abas) */
+.main div[role="radiogroup"]{{ gap: 8px; margin-top: 6px; padding-bottom: 6px; }}
+.main div[role="radiogroup"] > label{{
   background:#1a1a1a;border:1px solid #2a2a2a;border-radius:12px;padding:10px 14px;
   color:#cfcfcf;font-weight:600;
 }}
-.stTabs [data-baseweb="tab"][aria-selected="true"]{{ background:#E50914;color:#fff;border-color:#E50914; }}
+.main div[role="radiogroup"] > label > div:first-child{{ display:none; }}
+.main div[role="radiogroup"] > label:has(input:checked){{ background:#E50914;color:#fff;border-color:#E50914; }}
 
 /* KPI cards */
 .kpi-card{{
@@ -95,6 +139,22 @@ h1 a, h2 a, h3 a {{ display: none !important; }}
 .persona-box ul {{ padding-left: 20px; margin: 0; }}
 .persona-box li {{ margin-bottom: 6px; font-size: 14px; }}
 
+/* Persona/Empatia — fullscreen só imagem */
+.fullscreen-wrap {{
+    background-color: #121212;
+    width: 100%;
+    height: 100vh;  /* ocupa a tela inteira */
+    display: flex;
+    align-items: center;
+    justify-content: center;
+}}
+.fullscreen-img {{
+    max-width: 95%;
+    max-height: 95%;
+    border-radius: 10px;
+    box-shadow: 0px 6px 25px rgba(0,0,0,0.6);
+}}
+
 @media(max-width:1100px){{ .persona-grid{{grid-template-columns:1fr 1fr;}} }}
 @media(max-width:680px){{ .persona-card{{flex-direction:column;}} .persona-grid{{grid-template-columns:1fr;}} }}
 </style>
@@ -116,16 +176,23 @@ def kpi_card(icon: str, label: str, value: str, foot: str = ""):
     </div>
     """
 
+def count_section_run(name: str):
+    # instrumentação: quantas vezes cada seção executou nesta sessão
+    runs = st.session_state.setdefault("section_runs", {})
+    runs[name] = runs.get(name, 0) + 1
+
 def center_plot(fig, caption: Optional[str] = None):
     left, mid, right = st.columns([0.07, 0.86, 0.07])
     with mid:
-        st.plotly_chart(fig, use_container_width=True)
+        with PERF.stage("render"):
+            st.plotly_chart(fig, use_container_width=True)
         if caption:
-            st.markdown(f"<div class='chart-caption'>{caption}</div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='chart-caption'>{html.escape(caption)}</div>", unsafe_allow_html=True)
 
-# Plotly defaults
-px.defaults.template = "plotly_white"
-px.defaults.color_continuous_scale = "Reds"
+def md_text(text: str) -> str:
+    # texto digitado/vindo dos dados em st.markdown/st.caption: escapa HTML e a sintaxe de markdown
+    # (dentro de <div> com unsafe_allow_html não há markdown: lá basta html.escape)
+    return re.sub(r"([\\`*_{}\[\]()#+\-.!|~])", r"\\\1", html.escape(str(text), quote=False))
 
 # ================= Constantes/dados
 DATA_DIR = "data"
@@ -133,425 +200,479 @@ NETFLIX_FILENAME = "netflix_titles.csv"
 NETFLIX_PATH = os.path.join(DATA_DIR, NETFLIX_FILENAME)
 RATINGS_PATH = os.path.join(DATA_DIR, "ratings.csv")
 PERSONA_IMG = os.path.join(DATA_DIR, "reed_persona.png")
-
-# ================= Helpers de dados
-def _split_and_strip(series: pd.Series) -> pd.Series:
-    return (
-        series.fillna("")
-        .astype(str)
-        .apply(lambda x: [s.strip() for s in x.split(",") if s.strip()])
-    )
-
-def explode_column(df: pd.DataFrame, col: str) -> pd.DataFrame:
-    if col not in df.columns:
-        return df.assign(**{col: []})
-    temp = df.copy()
-    temp[col] = _split_and_strip(temp[col])
-    temp = temp.explode(col)
-    temp[col] = temp[col].fillna("").astype(str).str.strip()
-    return temp
+EMPATIA_IMG = os.path.join(DATA_DIR, "empatia.png")
+# static serving do Streamlit: ./static/ (ao lado do script) → app/static/
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_IMG_DIR = os.path.join(STATIC_DIR, "img")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+# Presets de filtros + snapshots dos resultados (fora de .cache/: apagar o cache não perde os presets)
+PRESETS_PATH = os.environ.get("NETFLIX_PRESETS") or os.path.join(DATA_DIR, "presets.sqlite")
+# Match aproximado de títulos com ratings.csv (ex.: NETFLIX_FUZZY_MATCH=90); vazio = só match exato
+FUZZY_MATCH = float(os.environ.get("NETFLIX_FUZZY_MATCH") or 0) or None
+# Aquecimento da visão padrão a cada snapshot, em segundo plano: process (padrão; forkserver/spawn), thread ou off
+WARMUP = os.environ.get("NETFLIX_WARMUP", "process")
+# Painel de desempenho oculto: NETFLIX_PERF=1 ou ?perf=1 na URL
+PERF_ENABLED = os.environ.get("NETFLIX_PERF") == "1" or st.query_params.get("perf") == "1"
+
+# ================= Instrumentação (tempo por etapa)
+def get_perf() -> PerfRecorder:
+    # um ring buffer por sessão; desligado, as etapas custam um if
+    perf = st.session_state.setdefault("perf", PerfRecorder(maxlen=2000))
+    perf.enabled = PERF_ENABLED
+    return perf
+
+PERF = get_perf()
+PERF.new_run()
+
+def fragment_rerun() -> bool:
+    # rerun só de um fragmento (widget dentro de uma seção): o topo do script, e o new_run(), não executou
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+def render_perf_panel(box):
+    if not PERF.enabled:
+        return
+    with box.expander("⏱️ Perf", expanded=False):
+        last = PERF.last_run()
+        st.caption(f"Rerun #{PERF.run} — {len(PERF.records)} medições no buffer.")
+        if warmup is not None and warmup.running:
+            st.caption("Aquecimento da visão padrão em andamento.")
+        elif warm is not None:
+            st.caption(f"Aquecimento da visão padrão ({warm.mode}): {warm.timings['total']:,.0f} ms — agregação "
+                       f"{warm.timings['agregacao']:,.0f} ms, {len(warm.figures)} figuras + nuvem {warm.timings['figuras']:,.0f} ms.")
+        st.dataframe(last[["stage", "ms", "rows", "cache"]].round(2), hide_index=True, use_container_width=True)
+        st.markdown("**Resumo por etapa**")
+        st.dataframe(PERF.summary(), hide_index=True, use_container_width=True)
+        fc = FIGURES.stats()
+        st.caption(f"Cache de figuras: {fc['hits']:,} acertos / {fc['misses']:,} faltas ({fc['hit_rate']:.0%}), "
+                   f"{fc['entries']} figuras, {fc['bytes'] / 2**20:.1f} MB, {fc['evictions']} descartes.")
+        runs = st.session_state.get("section_runs", {})
+        st.caption("Execuções por seção: " + (" · ".join(f"{k}: {v}" for k, v in sorted(runs.items())) or "nenhuma"))
+        c1, c2 = st.columns(2)
+        c1.download_button("JSON", PERF.to_json(), "perf.json", "application/json")
+        c2.download_button("CSV", PERF.to_csv(), "perf.csv", "text/csv")
+
+# ================= Imagens (Persona/Empatia)
+@st.cache_data(show_spinner=False)
+def load_image_asset(src: str, mtime: float, max_width: int = 1600) -> Optional[ImageAsset]:
+    # variante WebP reduzida, gerada uma vez por processo (mtime invalida)
+    try:
+        return build_image_variant(src, STATIC_IMG_DIR, max_width=max_width)
+    except OSError:
+        return None
 
 @st.cache_data(show_spinner=False)
-def load_netflix_data() -> pd.DataFrame:
+def image_src(src: str, mtime: float) -> str:
+    asset = load_image_asset(src, mtime)
+    if asset is None:
+        with open(src, "rb") as f:
+            return "data:image/png;base64," + base64.b64encode(f.read()).decode("utf-8")
+    if st.get_option("server.enableStaticServing"):
+        return asset.url(STATIC_DIR)
+    return asset.data_uri()
+
+def fullscreen_image(path: str, alt: str):
+    # URL estática + loading="lazy": aba oculta não baixa a imagem e rerun não reenvia bytes
+    if not os.path.exists(path):
+        st.error(f"⚠️ Não encontrei `{path}`. Coloque a imagem na pasta /data.")
+        return
+    src = image_src(path, os.path.getmtime(path))
+    st.markdown(f"""
+    <div class="fullscreen-wrap">
+      <img src="{src}" class="fullscreen-img" alt="{alt}" loading="lazy" decoding="async">
+    </div>
+    """, unsafe_allow_html=True)
+
+# ================= Helpers de dados
+def data_signature() -> Tuple:
+    # (tamanho, mtime) das fontes: muda a chave dos caches em memória quando um CSV é trocado
+    return tuple((p, os.path.getsize(p), os.path.getmtime(p)) for p in catalog_sources(NETFLIX_PATH, RATINGS_PATH))
+
+def build_catalog_store(signature: Tuple, previous: Optional[Tuple] = None) -> Tuple[CatalogStore, Optional[CatalogDiff], Optional[WarmupTask]]:
+    # Catálogo, pontes, índices, incidências, termos e opções (arrays somente leitura). Com CSV novo,
+    # refresh incremental contra a última ingestão em disco: só as linhas inseridas/alteradas/removidas
+    # (por show_id) são reprocessadas, inclusive no índice da busca do snapshot anterior (previous).
+    # description/cast/director ficam no Arrow em disco (memory-map).
+    # Por último, dispara o aquecimento (agregados, figuras e nuvem da visão padrão) numa thread: o snapshot
+    # vai ao ar sem esperá-lo, e a visão padrão "Ficha da Persona" não precisa dos agregados
+    try:
+        result = refresh_ingested(NETFLIX_PATH, RATINGS_PATH, CACHE_DIR, fuzzy_threshold=FUZZY_MATCH)
+    except OSError:
+        # data/ só-leitura: ingere no diretório temporário
+        result = refresh_ingested(NETFLIX_PATH, RATINGS_PATH, os.path.join(tempfile.gettempdir(), "netflix_dashboard_cache"),
+                                  fuzzy_threshold=FUZZY_MATCH)
+    # o índice de ratings só serve às estatísticas de match; não fica residente
+    store = build_store(result.catalog, build_title_index(*read_ratings(RATINGS_PATH)),
+                        previous=None if previous is None else previous[0], delta=result.delta)
+    return store, result.diff, None if WARMUP == "off" else WarmupTask(store, mode=WARMUP)
+
+@st.cache_resource(show_spinner=False)
+def get_snapshots() -> SnapshotSwap:
+    # Um por processo, o mesmo snapshot para todas as sessões (sem cópia por rerun). Quando as fontes
+    # mudam, o snapshot atual continua servindo e o próximo é montado numa thread; troca atômica ao fim
+    return SnapshotSwap(build_catalog_store)
+
+def load_snapshot(signature: Tuple) -> Optional[Snapshot]:
     if not os.path.exists(NETFLIX_PATH):
         st.error(f"❌ Arquivo não encontrado: {NETFLIX_PATH}. Coloque '{NETFLIX_FILENAME}' na pasta '{DATA_DIR}/'.")
-        return pd.DataFrame()
+        return None
     try:
-        df = pd.read_csv(NETFLIX_PATH)
-    except UnicodeDecodeError:
-        df = pd.read_csv(NETFLIX_PATH, encoding="latin-1")
+        return get_snapshots().get(signature)
     except Exception as e:
         st.error(f"Erro ao ler {NETFLIX_PATH}: {e}")
-        return pd.DataFrame()
-
-    for col in ["country", "listed_in", "cast", "director", "title", "type", "description"]:
-        if col in df.columns:
-            df[col] = df[col].fillna("").astype(str)
-    if "release_year" in df.columns:
-        df["release_year"] = pd.to_numeric(df["release_year"], errors="coerce")
-    if "date_added" in df.columns:
-        df["date_added"] = pd.to_datetime(df["date_added"], errors="coerce")
-
-    df["n_countries"] = df["country"].apply(lambda x: 0 if not x else len([c.strip() for c in str(x).split(",") if c.strip()])) if "country" in df.columns else 0
-    df["n_genres"] = df["listed_in"].apply(lambda x: 0 if not x else len([g.strip() for g in str(x).split(",") if g.strip()])) if "listed_in" in df.columns else 0
-    return df
-
-@st.cache_data(show_spinner=False)
-def load_ratings() -> Tuple[pd.DataFrame, Optional[str]]:
-    if not os.path.exists(RATINGS_PATH):
-        return pd.DataFrame(), None
-    try:
-        r = pd.read_csv(RATINGS_PATH)
-    except UnicodeDecodeError:
-        r = pd.read_csv(RATINGS_PATH, encoding="latin-1")
-    r.columns = [c.strip() for c in r.columns]
-    candidates = ["score", "imdb_score", "tmdb_score", "rating", "averageRating", "vote_average"]
-    score_col = next((c for c in candidates if c in r.columns), None)
-    if score_col is None:
-        numeric_cols = r.select_dtypes(include=[np.number]).columns.tolist()
-        for c in numeric_cols:
-            s = r[c].dropna()
-            if s.empty: continue
-            lo, hi = s.quantile(0.01), s.quantile(0.99)
-            if (0 <= lo <= 10 and 0 <= hi <= 10) or (0 <= lo <= 100 and 0 <= hi <= 100):
-                score_col = c; break
-    return r, score_col
-
-def ensure_year_range(df: pd.DataFrame) -> Tuple[int, int]:
-    if "release_year" not in df.columns or df["release_year"].dropna().empty:
-        return (1950, 2025)
-    years = df["release_year"].dropna().astype(int)
-    return (int(years.min()), int(years.max()))
+        return None
 
 # =========== Carrega dados
-df_raw = load_netflix_data()
-if df_raw.empty:
+with PERF.stage("carga") as st_load:
+    snapshot = load_snapshot(data_signature())
+    st_load.set_rows(snapshot.value[0].n_rows if snapshot is not None else 0)
+if snapshot is None or snapshot.value[0].df.empty:
     st.stop()
-
-ratings_df, ratings_col = load_ratings()
-df = df_raw.copy()
-if not ratings_df.empty and ratings_col:
-    df["title_norm"] = df["title"].str.strip().str.lower()
-    ratings_df["title_norm"] = ratings_df["title"].astype(str).str.strip().str.lower()
-    df = df.merge(ratings_df[["title_norm", ratings_col]], on="title_norm", how="left")
-    df.rename(columns={ratings_col: "score"}, inplace=True)
-    if "score" in df.columns and df["score"].dropna().max() > 10:
-        df["score"] = df["score"] / 10.0
+store, refresh_diff, warmup = snapshot.value
+# visão padrão aquecida, se o aquecimento em segundo plano já terminou
+warm = warmup.view if warmup is not None else None
+# chave dos memos: a assinatura do snapshot servido (durante um refresh, ainda a anterior)
+signature = snapshot.signature
+# chave dos snapshots de presets: o conteúdo das fontes (tocar um CSV sem mudá-lo não os invalida)
+content_key = store.content_id or signature
+df = store.df  # compartilhado entre sessões: só leitura
+
+# =========== Presets
+@st.cache_resource(show_spinner=False)
+def get_presets() -> Optional[PresetStore]:
+    # um por processo; data/ só-leitura: SQLite no diretório temporário
+    for path in (PRESETS_PATH, os.path.join(tempfile.gettempdir(), "netflix_dashboard_presets.sqlite")):
+        try:
+            return PresetStore(path)
+        except (OSError, sqlite3.Error):
+            continue
+    return None
+
+presets = get_presets()
+if presets is not None:
+    # snapshots de presets feitos com outro conteúdo das fontes: refeitos numa thread, uma vez por versão
+    presets.ensure_fresh(store, content_key)
+
+def apply_preset(state: FilterState, countries, genres, year_bounds):
+    # callback: põe o recorte do preset nos widgets antes do rerun (opções que sumiram do catálogo saem)
+    st.session_state["f_countries"] = [c for c in state.countries if c in countries]
+    st.session_state["f_genres"] = [g for g in state.genres if g in genres]
+    lo, hi = state.year_range or year_bounds
+    st.session_state["f_years"] = (max(lo, year_bounds[0]), min(hi, year_bounds[1]))
+    if state.score_range is not None:
+        st.session_state["f_score"] = state.score_range
+    st.session_state["f_query"] = state.query
+    if state.query:
+        st.session_state["f_prefix"] = state.prefix
+
+def delete_preset(preset_store: PresetStore, name: str):
+    preset_store.delete(name)
+    st.session_state.pop("preset_pick", None)
+
+def save_preset(preset_store: PresetStore, state: FilterState, catalog: CatalogStore, sig: Hashable):
+    name = st.session_state.get("preset_name", "").strip()
+    if not name:
+        return
+    preset_store.save(name, state)
+    preset_store.refresh_async(catalog, sig, [name])  # snapshot do preset em segundo plano
+    st.session_state["preset_name"] = ""
+    st.session_state["preset_pick"] = name
 
 # =========== Sidebar / Filtros
+# Estado da sessão: só as seleções abaixo (e as máscaras derivadas delas)
 with st.sidebar:
     st.markdown("### 🎬 Netflix Exec Dashboard")
     st.caption("Persona: **Reed Hastings (CEO)** — foco em decisões de catálogo e expansão.")
 
-    min_y, max_y = ensure_year_range(df)
-
-    df_c = explode_column(df, "country") if "country" in df.columns else pd.DataFrame(columns=["country"])
-    countries = sorted([c for c in df_c["country"].dropna().unique() if c])
-
-    df_g = explode_column(df, "listed_in") if "listed_in" in df.columns else pd.DataFrame(columns=["listed_in"])
-    genres = sorted([g for g in df_g["listed_in"].dropna().unique() if g])
-
-    sel_countries = st.multiselect("🌍 País", options=countries, default=[])
-    sel_genres = st.multiselect("🎭 Gênero", options=genres, default=[])
-    year_range = st.slider("📅 Ano de lançamento", min_value=min_y, max_value=max_y, value=(min_y, max_y), step=1)
-
-    score_available = "score" in df.columns and df["score"].notna().any()
-    if score_available:
-        lo = float(np.nanpercentile(df["score"], 1))
-        hi = float(np.nanpercentile(df["score"], 99))
-        score_range = st.slider("⭐ Faixa de avaliação (score)", 0.0, 10.0, (max(0.0, round(lo,1)), min(10.0, round(hi,1))), 0.1)
+    min_y, max_y = store.year_range
+    default_state = default_filter_state(store)  # o recorte que o aquecimento já montou
+    # valores dos widgets em session_state (chaves f_*): presets escrevem neles antes do rerun
+    st.session_state.setdefault("f_countries", [])
+    st.session_state.setdefault("f_genres", [])
+    years = st.session_state.get("f_years")
+    if not years or years[0] < min_y or years[1] > max_y:
+        st.session_state["f_years"] = (min_y, max_y)
+    sel_countries = st.multiselect("🌍 País", options=store.countries, key="f_countries")
+    sel_genres = st.multiselect("🎭 Gênero", options=store.genres, key="f_genres")
+    year_range = st.slider("📅 Ano de lançamento", min_value=min_y, max_value=max_y, step=1, key="f_years")
+    query = st.text_input("🔎 Buscar", placeholder="título, elenco, direção ou descrição",
+                          disabled=store.search is None, key="f_query")
+    prefix = st.checkbox("Completar último termo (prefixo)", value=True, disabled=store.search is None, key="f_prefix")
+
+    if store.score_range is not None:
+        st.session_state.setdefault("f_score", default_state.score_range)
+        score_range = st.slider("⭐ Faixa de avaliação (score)", 0.0, 10.0, step=0.1, key="f_score")
+        stats = store.match
+        st.caption(f"Score disponível para {stats['matched']:,} de {stats['titles']:,} títulos ({stats['match_rate']:.0%}).")
     else:
         score_range = None
 
-def apply_filters(df_in: pd.DataFrame) -> pd.DataFrame:
-    d = df_in.copy()
-
-    if "release_year" in d.columns and isinstance(year_range, (list, tuple)) and len(year_range) == 2:
-        y0, y1 = year_range
-        d = d[(d["release_year"] >= y0) & (d["release_year"] <= y1)]
-
-    if sel_countries and "country" in d.columns:
-        d = d[d["country"].apply(lambda x: any(c in [s.strip() for s in str(x).split(",") if s.strip()] for c in sel_countries))]
-
-    if sel_genres and "listed_in" in d.columns:
-        d = d[d["listed_in"].apply(lambda x: any(g in [s.strip() for s in str(x).split(",") if s.strip()] for g in sel_genres))]
-
-    if ("score" in d.columns) and isinstance(score_range, (list, tuple)) and len(score_range) == 2:
-        s0, s1 = score_range
-        d = d[d["score"].between(s0, s1, inclusive="both")]
-
-    return d
-
-df_f = apply_filters(df)
-
-# =========== Abas
-tab1, tab2, tab4= st.tabs([
-    "Ficha da Persona", "Empatia", "Dashboard"
-])
-
-# ===== Ficha da Persona — Dark elegante
-# ===== Ficha da Persona — Fullscreen só imagem =====
-with tab1:
-    import base64
-
-    def _img_to_base64(path: str) -> str:
-        with open(path, "rb") as f:
-            return base64.b64encode(f.read()).decode("utf-8")
-
-    img_path = os.path.join("data", "reed_persona.png")
-
-    st.markdown("""
-    <style>
-      .persona-fullscreen {
-        background-color: #121212;
-        width: 100%;
-        height: 100vh;  /* ocupa a tela inteira */
-        display: flex;
-        align-items: center;
-        justify-content: center;
-      }
-      .persona-img {
-        max-width: 95%;
-        max-height: 95%;
-        border-radius: 10px;
-        box-shadow: 0px 6px 25px rgba(0,0,0,0.6);
-      }
-    </style>
-    """, unsafe_allow_html=True)
-
-    if os.path.exists(img_path):
-        img_b64 = _img_to_base64(img_path)
-        st.markdown(f"""
-        <div class="persona-fullscreen">
-          <img src="data:image/png;base64,{img_b64}" class="persona-img" alt="Ficha da Persona">
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.error("⚠️ Não encontrei `data/reed_persona.png`. Coloque a imagem na pasta /data.")
-
-
-
-# ===== Etapa 2 — Empatia
-# ===== Etapa 2 — Empatia (fullscreen só imagem) =====
-with tab2:
-    import base64
-
-    def _img_to_base64(path: str) -> str:
-        with open(path, "rb") as f:
-            return base64.b64encode(f.read()).decode("utf-8")
-
-    img_path = os.path.join("data", "empatia.png")
-
-    st.markdown("""
-    <style>
-      .empatia-fullscreen {
-        background-color: #121212;
-        width: 100%;
-        height: 100vh;  /* ocupa a tela inteira */
-        display: flex;
-        align-items: center;
-        justify-content: center;
-      }
-      .empatia-img {
-        max-width: 95%;
-        max-height: 95%;
-        border-radius: 10px;
-        box-shadow: 0px 6px 25px rgba(0,0,0,0.6);
-      }
-    </style>
-    """, unsafe_allow_html=True)
-
-    if os.path.exists(img_path):
-        img_b64 = _img_to_base64(img_path)
-        st.markdown(f"""
-        <div class="empatia-fullscreen">
-          <img src="data:image/png;base64,{img_b64}" class="empatia-img" alt="Mapa de Empatia">
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.error("⚠️ Não encontrei `data/empatia.png`. Coloque a imagem na pasta /data.")
-# ===== Etapa 4 — Dashboard (UX executivo refinado)
-
-# ================= Etapa 4 — Dashboard Executivo (reformulado) =================
-# ================= Helpers de layout =================
-
-# ===== Etapa 4 — Dashboard (reformulado, claro e centralizado)
-with tab4:
-    # --------- CSS leve para centralizar e melhorar contraste ---------
-    st.markdown("""
-        <style>
-        :root { --bg:#ffffff; --text:#111418; --sub:#5f6b7a; --card:#f7f8fa; --border:#dfe3ea; --red:#E50914; }
-        .nx-wrap { max-width:1100px; margin:0 auto; }
-        .nx-subtle { color:var(--sub); font-size:.95rem; }
-        .nx-block { background:var(--card); border:1px solid var(--border); border-radius:16px; padding:18px 20px; margin:18px 0; }
-        .nx-kpi h1{ font-size:2.1rem; margin:2px 0; color:var(--red); }
-        .nx-kpi .label{ color:var(--sub); font-size:.92rem; }
-        .nx-divider { border-top:1px solid var(--border); margin:18px 0; }
-        </style>
-    """, unsafe_allow_html=True)
-
-    # ---------- Cabeçalho e filtros ativos ----------
-    filtros_text = []
-    if sel_countries: filtros_text.append(f"País: {', '.join(sel_countries)}")
-    if sel_genres: filtros_text.append(f"Gênero: {', '.join(sel_genres)}")
-    filtros_text.append(f"Ano: {year_range[0]}–{year_range[1]}")
-    if "score" in df.columns and isinstance(score_range, (list, tuple)) and df["score"].notna().any():
-        filtros_text.append(f"Score: {score_range[0]:.1f}–{score_range[1]:.1f}")
-
-    st.markdown("<div class='nx-wrap'>", unsafe_allow_html=True)
-    st.markdown("<h2>📊 Dashboard Netflix</h2>", unsafe_allow_html=True)
-    st.markdown(f"<div class='nx-subtle'>Visão com filtros ativos — {' | '.join(filtros_text)}</div>", unsafe_allow_html=True)
-
-    # ---------- Guard-clause ----------
-    if df_f.empty:
-        st.info("🧭 Nenhum título atende aos critérios atuais. **Amplie os filtros** (país/ano/gênero/score) para obter insights.")
-        st.markdown("</div>", unsafe_allow_html=True)  # fecha .nx-wrap
-        st.stop()
-
-    # ---------- KPIs (centralizados) ----------
-    total_titles = int(df_f.shape[0])
-    n_countries = explode_column(df_f, "country")["country"].nunique() if "country" in df_f.columns else 0
-    n_genres = explode_column(df_f, "listed_in")["listed_in"].nunique() if "listed_in" in df_f.columns else 0
-
+    filter_state = FilterState.from_selection(sel_countries, sel_genres, year_range, score_range, query, prefix)
+
+    if presets is not None:
+        with st.expander("💾 Presets", expanded=False):
+            saved = {p.name: p for p in presets.list()}
+            if saved:
+                pick = st.selectbox("Preset salvo", list(saved), key="preset_pick")
+                ready = presets.view(saved[pick].state.key(), content_key) is not None
+                st.caption("⚡ Resultado pronto — abre sem recalcular." if ready else
+                           "🔄 Resultado em preparo; abrir agora calcula na hora.")
+                c1, c2 = st.columns(2)
+                c1.button("Abrir", on_click=apply_preset, use_container_width=True,
+                          args=(saved[pick].state, store.countries, store.genres, store.year_range))
+                c2.button("Excluir", on_click=delete_preset, args=(presets, pick), use_container_width=True)
+            st.text_input("Salvar visão atual como", key="preset_name", placeholder="ex.: Board — Brasil 2015+")
+            st.button("Salvar preset", on_click=save_preset, args=(presets, filter_state, store, content_key),
+                      use_container_width=True)
+
+    snapshots = get_snapshots()
+    if snapshots.refreshing:
+        st.caption("🔄 Nova versão do catálogo em preparo; os dados atuais seguem no ar.")
+    elif snapshots.error is not None:
+        st.caption(f"⚠️ Falha ao atualizar o catálogo ({snapshots.error}); seguindo com a versão anterior.")
+    elif refresh_diff is not None and refresh_diff.changed:
+        st.caption(f"Catálogo atualizado: {refresh_diff.inserted:,} novos, {refresh_diff.updated:,} alterados, "
+                   f"{refresh_diff.deleted:,} removidos.")
+
+    # preenchido no fim do script, depois que todas as etapas do rerun foram medidas
+    perf_box = st.container()
+
+@st.cache_data(show_spinner=False, max_entries=128, ttl=3600)
+def get_aggregates(signature: Tuple, state_key: str, _state: FilterState, _store: CatalogStore) -> DashboardAggregates:
+    # Memo por (snapshot, estado canônico dos filtros): LRU de 128 recortes, expira em 1h.
+    # Sem PERF aqui dentro: o corpo só roda na falta; quem chama mede (PERF.cached)
+    mark_cache_miss()
+    mask = _state.mask(_store.df, _store.indexes, _store.search)
+    # KPIs, barras e linha anual por roll-up do cubo; top 10/foco pelas listas pré-ordenadas do ranking
+    return compute_aggregates(_store.df, _store.bridges, mask, _state, incidences=_store.incidences, cube=_store.cube,
+                              ranking=_store.ranking)
+
+def ready_view(state: FilterState) -> Optional[WarmView]:
+    # recortes já prontos: visão padrão (aquecimento) e snapshots de presets destas fontes
+    if warm is not None and state.key() == warm.state_key:
+        return warm
+    return presets.view(state.key(), content_key) if presets is not None else None
+
+ready = ready_view(filter_state)
+
+def aggregates_for(state: FilterState) -> DashboardAggregates:
+    # recorte pronto: os agregados dele, o mesmo objeto para todas as sessões (só leitura)
+    if ready is not None and state.key() == ready.state_key:
+        return ready.aggregates
+    return PERF.cached("compute", get_aggregates, signature, state.key(), state, store, rows=lambda a: a.total_titles)
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache() -> FigureCache:
+    # um por processo: JSON compacto por (gráfico, hash dos dados agregados), LRU de 64 MB
+    return FigureCache()
+
+FIGURES = get_figure_cache()
+
+def chart(name: str, agg: DashboardAggregates, build, *values, rows: Optional[int] = None) -> go.Figure:
+    # recorte pronto (visão padrão/preset): JSON guardado; senão o cache de figuras (monta só na falta)
+    if ready is not None and agg is ready.aggregates and name in ready.figures:
+        return figure_from_json(ready.figures[name])
+    with PERF.stage(f"figura:{name}", rows=rows):
+        return FIGURES.figure(name, build, *values)
+
+# Pares de facetas do heatmap (linhas, colunas); o primeiro já vem em DashboardAggregates.heatmap
+HEATMAP_PAIRS = {
+    "País × Gênero": ("country", "listed_in"),
+    "Classificação × Gênero": ("rating", "listed_in"),
+    "País × Tipo": ("country", "type"),
+}
+
+@st.cache_data(show_spinner=False, max_entries=128, ttl=3600)
+def get_heatmap(signature: Tuple, state_key: str, pair: str, _state: FilterState, _store: CatalogStore) -> pd.DataFrame:
+    mark_cache_miss()
+    rows, cols = HEATMAP_PAIRS[pair]
+    return heatmap_counts(_store.incidences, _state.mask(_store.df, _store.indexes, _store.search), rows, cols)
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def get_wordcloud_png(signature: Tuple, state_key: str, _state: FilterState, _store: CatalogStore) -> Optional[bytes]:
+    # PNG da nuvem por recorte; 32 entradas × ~200 KB limitam a memória
+    mark_cache_miss()
+    if _store.terms is None:
+        return None
+    # termos por título (descrições), tokenizados uma vez durante a ingestão
+    freqs = _store.terms.frequencies(_state.mask(_store.df, _store.indexes, _store.search))
+    return render_wordcloud(freqs) if freqs else None
+
+SEARCH_RESULTS = 20
+
+@st.cache_data(show_spinner=False, max_entries=128, ttl=3600)
+def get_search_results(signature: Tuple, state_key: str, _state: FilterState, _store: CatalogStore) -> pd.DataFrame:
+    # Títulos mais relevantes (BM25) da busca entre os que passam nos filtros da sidebar
+    mark_cache_miss()
+    rows, relevance = _store.search.search(_state.query, _state.prefix, mask=_state.mask(_store.df, _store.indexes),
+                                           limit=SEARCH_RESULTS)
+    cols = [c for c in ("title", "type", "release_year", "country", "score") if c in _store.df.columns]
+    out = _store.df.iloc[rows, _store.df.columns.get_indexer(cols)].reset_index(drop=True)
+    if _store.text is not None and "description" in _store.text.columns:
+        out["description"] = _store.text.take("description", rows).to_numpy()
+    out["relevância"] = np.round(relevance.astype(float), 2)
+    return out
+
+# =========== Navegação
+# Só a visão escolhida executa (st.tabs rodava as três a cada rerun)
+VIEWS = ["Ficha da Persona", "Empatia", "Dashboard"]
+view = st.radio("Visão", VIEWS, horizontal=True, key="view", label_visibility="collapsed")
+
+# ================= Seções do Dashboard =================
+# Cada seção é um fragmento: um widget interno (ex.: toggle) reexecuta só ela.
+# As agregações vêm memoizadas (get_aggregates), então rerun sem mudança de filtro não recalcula nada.
+def dashboard_section(name: str):
+    def deco(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            if fragment_rerun():
+                PERF.new_run()  # etapas do fragmento não entram na conta do último rerun completo
+            count_section_run(name)
+            with PERF.stage(f"secao:{name}"):
+                return fn(*args, **kwargs)
+        return st.fragment(run)
+    return deco
+
+@dashboard_section("kpis")
+def section_kpis(agg: DashboardAggregates):
     c1, c2, c3 = st.columns([1,1,1], gap="large")
     with c1:
         st.markdown("<div class='nx-block nx-kpi'>", unsafe_allow_html=True)
         st.markdown("**🎬 Títulos**")
-        st.markdown(f"<h1>{total_titles:,}</h1>", unsafe_allow_html=True)
+        st.markdown(f"<h1>{agg.total_titles:,}</h1>", unsafe_allow_html=True)
         st.markdown("<div class='label'>Catálogo filtrado</div>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
     with c2:
         st.markdown("<div class='nx-block nx-kpi'>", unsafe_allow_html=True)
         st.markdown("**🌍 Países**")
-        st.markdown(f"<h1>{n_countries:,}</h1>", unsafe_allow_html=True)
+        st.markdown(f"<h1>{agg.n_countries:,}</h1>", unsafe_allow_html=True)
         st.markdown("<div class='label'>Cobertura geográfica</div>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
     with c3:
         st.markdown("<div class='nx-block nx-kpi'>", unsafe_allow_html=True)
         st.markdown("**🎭 Gêneros**")
-        st.markdown(f"<h1>{n_genres:,}</h1>", unsafe_allow_html=True)
+        st.markdown(f"<h1>{agg.n_genres:,}</h1>", unsafe_allow_html=True)
         st.markdown("<div class='label'>Variedade de conteúdo</div>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
     st.markdown("<div class='nx-divider'></div>", unsafe_allow_html=True)
 
-    # ========= 1) Onde estamos? =========
+@dashboard_section("busca")
+def section_search(results: pd.DataFrame, query: str, n_found: int):
+    st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
+    st.markdown("### 🔎 Resultados da busca")
+    st.caption(f"**{n_found:,}** títulos para “{md_text(query)}” com os filtros atuais; os {len(results)} mais relevantes abaixo.")
+    st.dataframe(results.rename(columns={"title": "Título", "type": "Tipo", "release_year": "Ano", "country": "País",
+                                         "score": "Score", "description": "Descrição", "relevância": "Relevância"}),
+                 hide_index=True, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+@dashboard_section("onde_estamos")
+def section_where(agg: DashboardAggregates):
+    country_cnt = agg.country_counts
     st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
     st.markdown("### 🌍 Onde estamos?")
     top_ctry_caption = "Concentração de títulos por país."
-    if "country" in df_f.columns:
-        _c = explode_column(df_f, "country")
-        if not _c.empty:
-            tops = _c["country"].value_counts().head(3).index.tolist()
-            if tops: top_ctry_caption = f"Concentração maior em **{', '.join(tops)}** — priorize presença/marketing."
+    tops = [md_text(c) for c in country_cnt.head(3).index]
+    if tops: top_ctry_caption = f"Concentração maior em **{', '.join(tops)}** — priorize presença/marketing."
     st.caption(top_ctry_caption)
 
-    if "country" in df_f.columns:
-        df_country = explode_column(df_f, "country")
-        df_country = df_country[df_country["country"].astype(str).str.len() > 0]
-        if not df_country.empty:
-            cnt = df_country.groupby("country").size().reset_index(name="qtd").sort_values("qtd", ascending=False)
-            fig_map = px.choropleth(cnt, locations="country", locationmode="country names",
-                                    color="qtd", hover_name="country", color_continuous_scale="Reds")
-            fig_map.update_coloraxes(colorbar_title="# de títulos")
-            fig_map.update_traces(hovertemplate="<b>%{hovertext}</b><br>Qtd: %{z}<extra></extra>")
-            center_plot(fig_map)
+    if not country_cnt.empty:
+        center_plot(chart("mapa", agg, country_map_figure, country_cnt, rows=len(country_cnt)))
     st.markdown("</div>", unsafe_allow_html=True)
 
-    # Foco quando há único país
-    if len(sel_countries) == 1:
-        pais = sel_countries[0]
-        st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
-        st.markdown(f"#### 🎯 Foco em {pais}")
-        colA, colB = st.columns([0.60, 0.40], gap="large")
-
-        with colA:
-            df_gen_pais = explode_column(df_f[df_f["country"].str.contains(pais, na=False)], "listed_in")
-            vc = df_gen_pais["listed_in"].value_counts().head(15) if not df_gen_pais.empty else pd.Series(dtype=int)
-            if not vc.empty:
-                gen_cnt = pd.DataFrame({"Gênero": vc.index.astype(str), "Qtd": vc.values}).sort_values("Qtd", ascending=True)
-                fig_pais_gen = px.bar(gen_cnt, x="Qtd", y="Gênero", orientation="h", labels={"Qtd":"Qtd","Gênero":"Gênero"})
-                fig_pais_gen.update_layout(yaxis={"categoryorder":"total ascending"})
-                fig_pais_gen.update_traces(text=gen_cnt["Qtd"], textposition="outside", cliponaxis=False)
-                center_plot(fig_pais_gen, caption=f"Em **{pais}**, gêneros mais frequentes orientam promoções locais.")
-
-        with colB:
-            if "score" in df_f.columns and df_f["score"].notna().any():
-                top_local = (df_f[df_f["country"].str.contains(pais, na=False)]
-                             .dropna(subset=["score"]).sort_values("score", ascending=False).head(10))
-                if not top_local.empty:
-                    fig_top_local = px.bar(top_local.iloc[::-1], x="score", y="title", orientation="h",
-                                           labels={"score":"Score","title":"Título"})
-                    fig_top_local.update_traces(text=top_local.iloc[::-1]["score"].round(1),
-                                                textposition="outside", cliponaxis=False)
-                    leader = top_local.iloc[0]["title"]
-                    center_plot(fig_top_local, caption=f"Top avaliados em **{pais}** — liderança: **{leader}**.")
-        st.markdown("</div>", unsafe_allow_html=True)
+@dashboard_section("foco_pais")
+def section_focus(agg: DashboardAggregates, pais: str):
+    st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
+    st.markdown(f"#### 🎯 Foco em {md_text(pais)}")
+    colA, colB = st.columns([0.60, 0.40], gap="large")
+
+    with colA:
+        vc = agg.focus_genres
+        if not vc.empty:
+            center_plot(chart("foco_generos", agg, genre_bar_figure, vc),
+                        caption=f"Em **{pais}**, gêneros mais frequentes orientam promoções locais.")
+
+    with colB:
+        top_local = agg.focus_top
+        if not top_local.empty:
+            leader = top_local.iloc[0]["title"]
+            center_plot(chart("foco_top", agg, top_titles_figure, top_local),
+                        caption=f"Top avaliados em **{pais}** — liderança: **{leader}**.")
+    st.markdown("</div>", unsafe_allow_html=True)
 
-    # ========= 2) O que o público consome? =========
+@dashboard_section("consumo")
+def section_consume(agg: DashboardAggregates):
     st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
     st.markdown("### 🎭 O que o público consome?")
-    if "listed_in" in df_f.columns:
-        df_gen = explode_column(df_f, "listed_in")
-        df_gen = df_gen[df_gen["listed_in"].astype(str).str.len() > 0]
-        if not df_gen.empty:
-            vc = df_gen["listed_in"].value_counts().head(20)
-            gen_cnt = pd.DataFrame({"Gênero": vc.index.astype(str), "Qtd": vc.values}).sort_values("Qtd", ascending=True)
-
-            c1, c2 = st.columns([0.62, 0.38], gap="large")
-            with c1:
-                st.markdown("**Gêneros mais frequentes (Top 20)**")
-                fig_barh = px.bar(gen_cnt, x="Qtd", y="Gênero", orientation="h", labels={"Qtd":"Qtd","Gênero":"Gênero"})
-                fig_barh.update_layout(yaxis={"categoryorder":"total ascending"})
-                fig_barh.update_traces(text=gen_cnt["Qtd"], textposition="outside", cliponaxis=False)
-                leaders = ", ".join(gen_cnt.sort_values("Qtd", ascending=False)["Gênero"].head(3))
-                center_plot(fig_barh, caption=f"**Líderes globais:** {leaders} — priorizar aquisição/destaque.")
-
-            with c2:
-                st.markdown("**Participação por gênero (Treemap)**")
-                fig_tree = px.treemap(gen_cnt.sort_values("Qtd", ascending=False),
-                                      path=["Gênero"], values="Qtd", labels={"Qtd":"Qtd"})
-                center_plot(fig_tree, caption="Proporções evidenciam o peso de cada cluster.")
-
-    # Heatmap País × Gênero
+    if not agg.genre_counts.empty:
+        vc = agg.genre_counts.head(TOP_GENRES)
+
+        c1, c2 = st.columns([0.62, 0.38], gap="large")
+        with c1:
+            st.markdown(f"**Gêneros mais frequentes (Top {TOP_GENRES})**")
+            leaders = ", ".join(vc.index[:3].astype(str))  # já em ordem decrescente
+            center_plot(chart("generos", agg, genre_bar_figure, vc),
+                        caption=f"**Líderes globais:** {leaders} — priorizar aquisição/destaque.")
+
+        with c2:
+            st.markdown("**Participação por gênero (Treemap)**")
+            center_plot(chart("treemap", agg, genre_treemap_figure, vc),
+                        caption="Proporções evidenciam o peso de cada cluster.")
+
+@dashboard_section("heatmap")
+def section_heatmap(agg: DashboardAggregates, signature: Tuple, state: FilterState, store: CatalogStore):
     st.markdown("<div class='nx-divider'></div>", unsafe_allow_html=True)
     st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
-    st.markdown("**País × Gênero (Top 15 × Top 15)**")
-    if {"country","listed_in"}.issubset(df_f.columns):
-        tmp = df_f.copy()
-        tmp["country"] = _split_and_strip(tmp["country"]); tmp = tmp.explode("country")
-        tmp["listed_in"] = _split_and_strip(tmp["listed_in"]); tmp = tmp.explode("listed_in")
-        tmp = tmp[(tmp["country"].astype(str)!="") & (tmp["listed_in"].astype(str)!="")]
-        if not tmp.empty:
-            top_c = tmp["country"].value_counts().head(15).index
-            top_g = tmp["listed_in"].value_counts().head(15).index
-            pv = tmp[tmp["country"].isin(top_c) & tmp["listed_in"].isin(top_g)] \
-                    .pivot_table(index="country", columns="listed_in", aggfunc="size", fill_value=0).sort_index()
-            if not pv.empty:
-                fig_heat = px.imshow(pv, aspect="auto", labels=dict(color="# de títulos"))
-                center_plot(fig_heat, caption="Quadrantes escuros = maior incidência; foque nesses cruzamentos.")
+    pair = st.selectbox("Cruzamento", list(HEATMAP_PAIRS), key="heatmap_pair")
+    st.markdown(f"**{pair} (Top 15 × Top 15)**")
+    # sob demanda: desligado, a figura nem é montada
+    if st.toggle("Exibir heatmap", value=True, key="show_heatmap"):
+        first = pair == next(iter(HEATMAP_PAIRS))
+        pv = agg.heatmap if first else PERF.cached("heatmap", get_heatmap, signature, state.key(), pair, state, store,
+                                                   rows=lambda p: p.size)
+        if not pv.empty:
+            fig_heat = chart("heatmap" if first else f"heatmap:{pair}", agg, heatmap_figure, pv, rows=pv.size)
+            center_plot(fig_heat, caption="Quadrantes escuros = maior incidência; foque nesses cruzamentos.")
     st.markdown("</div>", unsafe_allow_html=True)
 
-    # ========= 3) Como evoluímos? =========
+@dashboard_section("evolucao")
+def section_evolution(agg: DashboardAggregates):
     st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
     st.markdown("### 📈 Como evoluímos?")
-    if "release_year" in df_f.columns and df_f["release_year"].notna().any():
-        yr = df_f.groupby("release_year").size().reset_index(name="Lançamentos").sort_values("release_year")
-        if not yr.empty:
-            fig_line = px.line(yr, x="release_year", y="Lançamentos", markers=True, labels={"release_year":"Ano"})
-            fig_line.update_traces(hovertemplate="Ano %{x}<br>Qtd: %{y}<extra></extra>")
-            trend = "crescimento recente" if yr["Lançamentos"].tail(3).is_monotonic_increasing else "volatilidade recente"
-            center_plot(fig_line, caption=f"Tendência geral: **{trend}**. Ajuste aquisições ao calendário.")
+    yr = agg.yearly
+    if not yr.empty:
+        trend = "crescimento recente" if yr["Lançamentos"].tail(3).is_monotonic_increasing else "volatilidade recente"
+        center_plot(chart("anual", agg, yearly_figure, yr),
+                    caption=f"Tendência geral: **{trend}**. Ajuste aquisições ao calendário.")
     st.markdown("</div>", unsafe_allow_html=True)
 
-    # ========= 4) Quem se destaca? =========
-    if "score" in df_f.columns and df_f["score"].notna().any():
+@dashboard_section("destaques")
+def section_highlights(agg: DashboardAggregates):
+    if agg.n_scored:
         st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
         st.markdown("### ⭐ Quem se destaca?")
-        top10 = df_f.dropna(subset=["score"]).sort_values("score", ascending=False).head(10)
-        base_hist = df_f.dropna(subset=["score"])
+        top10 = agg.top10
 
         c1, c2 = st.columns([0.56, 0.44], gap="large")
         with c1:
             if not top10.empty:
-                fig_top = px.bar(top10.iloc[::-1], x="score", y="title", orientation="h",
-                                 labels={"score":"Score","title":"Título"})
-                fig_top.update_traces(text=top10.iloc[::-1]["score"].round(1), textposition="outside", cliponaxis=False)
                 cap = f"Média do Top 10: **{top10['score'].mean():.1f}** (faixa {top10['score'].min():.1f}–{top10['score'].max():.1f})."
-                center_plot(fig_top, caption=cap)
+                center_plot(chart("top10", agg, top_titles_figure, top10), caption=cap)
 
         with c2:
-            if not base_hist.empty:
-                fig_hist = px.histogram(base_hist, x="score", nbins=25, labels={"score":"Score"})
-                cap = f"Mediana do portfólio **{base_hist['score'].median():.1f}**; caudas indicam riscos/outliers."
-                center_plot(fig_hist, caption=cap)
-
-        if "release_year" in df_f.columns:
-            base_scatter = df_f.dropna(subset=["score","release_year"])
-            if not base_scatter.empty:
-                fig_scatter = px.scatter(base_scatter, x="release_year", y="score", hover_name="title",
-                                         labels={"release_year":"Ano","score":"Score"})
-                center_plot(fig_scatter, caption="Score ao longo do tempo revela safras fortes e quedas.")
+            # bins calculados no servidor: uma contagem por faixa de 0,25 do recorte, não os scores crus
+            fig_hist = chart("histograma", agg, score_histogram_figure, agg.score_hist, rows=len(agg.score_hist))
+            cap = f"Mediana do portfólio **{agg.score_median:.1f}**; caudas indicam riscos/outliers."
+            center_plot(fig_hist, caption=cap)
+
+        if not (agg.scatter.empty and agg.score_grid.empty):
+            fig_scatter = chart("score_ano", agg, score_year_figure, agg.scatter, agg.score_grid,
+                                rows=len(agg.scatter) or agg.score_grid.size)
+            cap = "Score ao longo do tempo revela safras fortes e quedas."
+            if agg.scatter.empty:
+                cap += " Densidade por ano/faixa — refine os filtros para ver cada título."
+            center_plot(fig_scatter, caption=cap)
         st.markdown("</div>", unsafe_allow_html=True)
     else:
         st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
@@ -559,47 +680,97 @@ with tab4:
         st.caption("Inclua um arquivo de avaliações (ex.: `data/ratings.csv`) para desbloquear análises de qualidade.")
         st.markdown("</div>", unsafe_allow_html=True)
 
-    # ========= 5) O que comunicamos? =========
+@dashboard_section("nuvem")
+def section_wordcloud(signature: Tuple, state: FilterState, store: CatalogStore):
     st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
     st.markdown("### 📝 O que comunicamos?")
-    if "description" in df_f.columns and df_f["description"].notna().any():
-        text = " ".join(df_f["description"].dropna().astype(str).tolist())
-        if text.strip():
-            extra_stop = set(["film","series","movie","netflix","season","year","story","one","two","new","set","based","life"])
-            wc = WordCloud(width=1000, height=360, background_color="white", stopwords=STOPWORDS.union(extra_stop))
-            img = wc.generate(text).to_image()
-            st.image(img, caption="Termos dominantes nas descrições do catálogo.", use_column_width=True)
-    else:
-        st.caption("Sem descrições disponíveis no recorte atual.")
+    if st.toggle("Exibir nuvem de palavras", value=True, key="show_wordcloud"):
+        if ready is not None and state.key() == ready.state_key:
+            wc_png = ready.wordcloud  # recorte pronto: PNG guardado
+        else:
+            wc_png = PERF.cached("wordcloud", get_wordcloud_png, signature, state.key(), state, store)
+        if wc_png:
+            st.image(wc_png, caption="Termos dominantes nas descrições do catálogo.", use_column_width=True)
+        else:
+            st.caption("Sem descrições disponíveis no recorte atual.")
     st.markdown("</div>", unsafe_allow_html=True)
 
-    # ========= 6) Decisões estratégicas =========
+@dashboard_section("decisoes")
+def section_decisions(agg: DashboardAggregates):
     st.markdown("<div class='nx-block'>", unsafe_allow_html=True)
     st.markdown("### 🧭 Decisões estratégicas")
-    bullets = []
-    if "listed_in" in df_f.columns:
-        _g = explode_column(df_f, "listed_in")
-        if not _g.empty:
-            topg = _g["listed_in"].value_counts().head(3).index.tolist()
-            if topg: bullets.append(f"🔍 **Gêneros líderes**: {', '.join(topg)} — priorizar licenciamento/destaque editorial.")
-    if "country" in df_f.columns:
-        _c = explode_column(df_f, "country")
-        if not _c.empty:
-            topc = _c["country"].value_counts().head(3).index.tolist()
-            if topc: bullets.append(f"🌐 **Praças prioritárias**: {', '.join(topc)} — campanhas locais e bundles.")
-    if "release_year" in df_f.columns and df_f["release_year"].notna().any():
-        yr = df_f.groupby("release_year").size().reset_index(name="qtd").sort_values("release_year")
-        if not yr.empty:
-            trend = "crescimento recente" if yr["qtd"].tail(3).is_monotonic_increasing else "variação nos últimos anos"
-            bullets.append(f"📈 **Lançamentos**: {trend} — alinhar aquisições ao calendário.")
-    if "score" in df_f.columns and df_f["score"].notna().any():
-        bullets.append(f"⭐ **Qualidade média**: {df_f['score'].mean():.1f} — revisar long tail de baixo score.")
+    bullets = strategic_bullets(agg, label=md_text)
 
     if bullets:
         for b in bullets: st.markdown(f"- {b}")
     else:
         st.markdown("- Ajuste os filtros para revelar **prioridades de licenciamento** e **campanhas regionais**.")
-    st.caption("Dica: salve visões filtradas como presets para reuniões executivas.")
+    st.caption("Dica: salve esta visão em **💾 Presets** (sidebar) para abri-la instantaneamente em reuniões executivas.")
     st.markdown("</div>", unsafe_allow_html=True)  # fecha .nx-wrap
 
+# ===== Ficha da Persona — Fullscreen só imagem =====
+if view == "Ficha da Persona":
+    count_section_run("persona")
+    fullscreen_image(PERSONA_IMG, "Ficha da Persona")
 
+# ===== Etapa 2 — Empatia (fullscreen só imagem) =====
+elif view == "Empatia":
+    count_section_run("empatia")
+    fullscreen_image(EMPATIA_IMG, "Mapa de Empatia")
+
+# ===== Etapa 4 — Dashboard (reformulado, claro e centralizado)
+else:
+    # --------- CSS leve para centralizar e melhorar contraste ---------
+    st.markdown("""
+        <style>
+        :root { --bg:#ffffff; --text:#111418; --sub:#5f6b7a; --card:#f7f8fa; --border:#dfe3ea; --red:#E50914; }
+        .nx-wrap { max-width:1100px; margin:0 auto; }
+        .nx-subtle { color:var(--sub); font-size:.95rem; }
+        .nx-block { background:var(--card); border:1px solid var(--border); border-radius:16px; padding:18px 20px; margin:18px 0; }
+        .nx-kpi h1{ font-size:2.1rem; margin:2px 0; color:var(--red); }
+        .nx-kpi .label{ color:var(--sub); font-size:.92rem; }
+        .nx-divider { border-top:1px solid var(--border); margin:18px 0; }
+        </style>
+    """, unsafe_allow_html=True)
+
+    # ---------- Cabeçalho e filtros ativos ----------
+    filtros_text = []
+    if sel_countries: filtros_text.append(f"País: {', '.join(sel_countries)}")
+    if sel_genres: filtros_text.append(f"Gênero: {', '.join(sel_genres)}")
+    filtros_text.append(f"Ano: {year_range[0]}–{year_range[1]}")
+    if filter_state.query: filtros_text.append(f"Busca: “{query.strip()}”")
+    if "score" in df.columns and isinstance(score_range, (list, tuple)) and df["score"].notna().any():
+        filtros_text.append(f"Score: {score_range[0]:.1f}–{score_range[1]:.1f}")
+
+    st.markdown("<div class='nx-wrap'>", unsafe_allow_html=True)
+    st.markdown("<h2>📊 Dashboard Netflix</h2>", unsafe_allow_html=True)
+    # países/gêneros vêm dos dados e a busca é digitada: nada disso entra como HTML
+    st.markdown(f"<div class='nx-subtle'>Visão com filtros ativos — {html.escape(' | '.join(filtros_text))}</div>",
+                unsafe_allow_html=True)
+
+    with PERF.stage("agregacao"):
+        agg = aggregates_for(filter_state)
+
+    # ---------- Guard-clause ----------
+    if agg.total_titles == 0:
+        st.info("🧭 Nenhum título atende aos critérios atuais. **Amplie os filtros** (país/ano/gênero/score/busca) para obter insights.")
+        st.markdown("</div>", unsafe_allow_html=True)  # fecha .nx-wrap
+        render_perf_panel(perf_box)
+        st.stop()
+
+    section_kpis(agg)                                   # KPIs (centralizados)
+    if filter_state.query and store.search is not None:
+        section_search(PERF.cached("busca", get_search_results, signature, filter_state.key(), filter_state, store,
+                                   rows=len),
+                       query.strip(), agg.total_titles)  # Busca textual (ranking BM25)
+    section_where(agg)                                  # 1) Onde estamos?
+    if len(sel_countries) == 1:
+        section_focus(agg, sel_countries[0])            # Foco quando há único país
+    section_consume(agg)                                # 2) O que o público consome?
+    section_heatmap(agg, signature, filter_state, store) # Heatmap País × Gênero (e outros cruzamentos)
+    section_evolution(agg)                              # 3) Como evoluímos?
+    section_highlights(agg)                             # 4) Quem se destaca?
+    section_wordcloud(signature, filter_state, store)   # 5) O que comunicamos?
+    section_decisions(agg)                              # 6) Decisões estratégicas
+
+render_perf_panel(perf_box)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# export_reports.py
+#
+# Relatórios em lote, sem abrir o Dashboard: um HTML autocontido por país (mesmos
+# gráficos, KPIs e decisões da aba Dashboard) + index.html, via netflix_core/report.py.
+# Uso:
+#   python export_reports.py                                  # todos os países da sidebar
+#   python export_reports.py --countries Brazil India --out relatorios/semana-42
+#   python export_reports.py --images --plotlyjs directory    # + PNG por figura (kaleido)
+# Mesmos dados e variáveis de ambiente do app (data/, NETFLIX_FUZZY_MATCH).
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from netflix_core import (
+    StoreSource,
+    build_store,
+    build_title_index,
+    country_states,
+    export_reports,
+    facet_counts,
+    read_ratings,
+    refresh_ingested,
+)
+from netflix_core.report import PLOTLYJS_MODES
+from netflix_core.warmup import WARM_WORKERS
+
+DATA_DIR = "data"
+NETFLIX_PATH = os.path.join(DATA_DIR, "netflix_titles.csv")
+RATINGS_PATH = os.path.join(DATA_DIR, "ratings.csv")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+FUZZY_MATCH = float(os.environ.get("NETFLIX_FUZZY_MATCH") or 0) or None
+
+
+def load_store():
+    # o store e de onde os processos do pool o recarregam (a mesma ingestão em disco)
+    cache_dir = CACHE_DIR
+    try:
+        result = refresh_ingested(NETFLIX_PATH, RATINGS_PATH, cache_dir, fuzzy_threshold=FUZZY_MATCH)
+    except OSError:
+        cache_dir = os.path.join(tempfile.gettempdir(), "netflix_dashboard_cache")
+        result = refresh_ingested(NETFLIX_PATH, RATINGS_PATH, cache_dir, fuzzy_threshold=FUZZY_MATCH)
+    store = build_store(result.catalog, build_title_index(*read_ratings(RATINGS_PATH)))
+    return store, StoreSource(NETFLIX_PATH, RATINGS_PATH, cache_dir, FUZZY_MATCH)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Exporta relatórios HTML por país.")
+    ap.add_argument("--countries", nargs="+", help="países (padrão: todos os da sidebar)")
+    ap.add_argument("--top", type=int, help="só os N países com mais títulos")
+    ap.add_argument("--out", default=os.path.join("reports", time.strftime("%Y-%m-%d")))
+    ap.add_argument("--workers", type=int, default=WARM_WORKERS)
+    ap.add_argument("--mode", choices=("process", "thread", "serial"), default="process")
+    ap.add_argument("--plotlyjs", choices=PLOTLYJS_MODES, default="inline",
+                    help="inline = HTML autocontido (~5 MB cada, plotly.js embutido); cdn/directory = arquivos leves")
+    ap.add_argument("--images", action="store_true", help="PNG de cada figura (requer kaleido)")
+    args = ap.parse_args()
+
+    if not os.path.exists(NETFLIX_PATH):
+        sys.exit(f"Arquivo não encontrado: {NETFLIX_PATH}")
+    t0 = time.perf_counter()
+    store, source = load_store()
+    t_store = time.perf_counter() - t0
+
+    countries = args.countries
+    if args.top:
+        countries = facet_counts(store.bridges["country"]).index.tolist()[: args.top]
+    states = country_states(store, countries)
+    if args.countries:
+        missing = sorted(set(args.countries) - {label for label, _ in states})
+        if missing:
+            print(f"Ignorados (fora da lista de países): {', '.join(missing)}", file=sys.stderr)
+    if not states:
+        sys.exit("Nenhum país para exportar.")
+
+    result = export_reports(store, states, args.out, workers=args.workers, mode=args.mode,
+                            plotlyjs=args.plotlyjs, images=args.images, source=source)
+    print(f"{len(result.paths)} relatórios em {args.out}/ — {result.seconds:,.1f} s "
+          f"({result.reports_per_minute:,.1f} relatórios/min, {result.mode}, {args.workers} workers; "
+          f"snapshot {t_store:,.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
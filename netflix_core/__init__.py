@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# netflix_core — camada de dados do dashboard (sem dependência de Streamlit)
+
+from .aggregations import DashboardAggregates, FilterState, compute_aggregates, heatmap_counts
+from .assets import ImageAsset, build_image_variant
+from .bridges import (
+    BRIDGE_COLUMNS,
+    build_bridge,
+    build_bridges,
+    facet_counts,
+    facet_mask,
+    facet_nunique,
+    facet_pairs,
+)
+from .cache import read_cached_frame, write_cached_frame
+from .catalog import build_catalog, catalog_sources, load_catalog, prepare_catalog
+from .charts import (
+    DASHBOARD_FIGURES,
+    TOP_GENRES,
+    country_map_figure,
+    dashboard_figures,
+    genre_bar_figure,
+    genre_frame,
+    genre_treemap_figure,
+    heatmap_figure,
+    score_histogram_figure,
+    score_year_figure,
+    top_titles_figure,
+    yearly_figure,
+)
+from .cooccurrence import (
+    Incidence,
+    build_incidences,
+    cooccurrence_counts,
+    cooccurrence_matrix,
+    incidence_from_bridge,
+    incidence_from_column,
+)
+from .cube import SCORE_BUCKET, CatalogCube, CellFacets, CubeSlice, build_cube, score_buckets
+from .figcache import FigureCache, compact_json, figure_from_json, figure_key
+from .fuzzy import apply_fuzzy_mapping, build_fuzzy_mapping, fold_titles, fuzzy_match
+from .index import TokenIndex, build_token_index, filter_mask, index_from_bridge
+from .ingest import IngestedCatalog, TextStore, ingest_catalog, load_ingested, read_ingested
+from .perf import PerfRecorder, StageTiming, mark_cache_miss
+from .presets import PRESET_VERSION, Preset, PresetStore
+from .ranking import ScoreRanking, build_ranking
+from .ratings import TitleKeyIndex, build_title_index, join_ratings, match_stats, normalize_titles, read_ratings
+from .refresh import CatalogDiff, RefreshResult, RowDelta, Snapshot, SnapshotSwap, refresh_ingested
+from .report import ExportResult, StoreSource, country_states, export_reports, render_report_html, strategic_bullets
+from .search import SearchIndex, SearchIndexBuilder, build_search_index, query_tokens, update_search_index
+from .store import CatalogStore, build_store, freeze_frame, freeze_store
+from .terms import EXTRA_STOPWORDS, TermMatrix, TermMatrixBuilder, build_term_matrix, render_wordcloud
+from .warmup import WarmView, WarmupTask, default_filter_state, default_score_range, warm_default_view, warm_view
+
+__all__ = [
+    "BRIDGE_COLUMNS",
+    "CatalogCube",
+    "CatalogDiff",
+    "CatalogStore",
+    "CellFacets",
+    "CubeSlice",
+    "DASHBOARD_FIGURES",
+    "DashboardAggregates",
+    "EXTRA_STOPWORDS",
+    "ExportResult",
+    "FigureCache",
+    "FilterState",
+    "ImageAsset",
+    "Incidence",
+    "IngestedCatalog",
+    "PRESET_VERSION",
+    "PerfRecorder",
+    "Preset",
+    "PresetStore",
+    "RefreshResult",
+    "RowDelta",
+    "SCORE_BUCKET",
+    "ScoreRanking",
+    "SearchIndex",
+    "SearchIndexBuilder",
+    "Snapshot",
+    "SnapshotSwap",
+    "StageTiming",
+    "StoreSource",
+    "TOP_GENRES",
+    "TermMatrix",
+    "TermMatrixBuilder",
+    "TextStore",
+    "TitleKeyIndex",
+    "TokenIndex",
+    "WarmView",
+    "WarmupTask",
+    "apply_fuzzy_mapping",
+    "build_bridge",
+    "build_bridges",
+    "build_catalog",
+    "build_cube",
+    "build_fuzzy_mapping",
+    "build_image_variant",
+    "build_incidences",
+    "build_ranking",
+    "build_search_index",
+    "build_store",
+    "build_term_matrix",
+    "build_title_index",
+    "build_token_index",
+    "catalog_sources",
+    "compact_json",
+    "compute_aggregates",
+    "cooccurrence_counts",
+    "cooccurrence_matrix",
+    "country_map_figure",
+    "country_states",
+    "dashboard_figures",
+    "default_filter_state",
+    "default_score_range",
+    "export_reports",
+    "facet_counts",
+    "facet_mask",
+    "facet_nunique",
+    "facet_pairs",
+    "figure_from_json",
+    "figure_key",
+    "filter_mask",
+    "fold_titles",
+    "freeze_frame",
+    "freeze_store",
+    "fuzzy_match",
+    "genre_bar_figure",
+    "genre_frame",
+    "genre_treemap_figure",
+    "heatmap_counts",
+    "heatmap_figure",
+    "incidence_from_bridge",
+    "incidence_from_column",
+    "index_from_bridge",
+    "ingest_catalog",
+    "join_ratings",
+    "load_catalog",
+    "load_ingested",
+    "mark_cache_miss",
+    "match_stats",
+    "normalize_titles",
+    "prepare_catalog",
+    "query_tokens",
+    "read_cached_frame",
+    "read_ingested",
+    "read_ratings",
+    "refresh_ingested",
+    "render_report_html",
+    "render_wordcloud",
+    "score_buckets",
+    "score_histogram_figure",
+    "score_year_figure",
+    "strategic_bullets",
+    "top_titles_figure",
+    "warm_default_view",
+    "warm_view",
+    "write_cached_frame",
+    "yearly_figure",
+]
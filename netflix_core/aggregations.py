@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+# netflix_core/aggregations.py
+#
+# Estado canônico dos filtros + todas as agregações do Dashboard em uma passada.
+# O dashboard memoiza compute_aggregates() pela chave do estado (LRU/TTL do
+# st.cache_data); voltar a um recorte já visto não toca no frame base.
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .bridges import facet_counts, facet_mask
+from .cooccurrence import Incidence, build_incidences, cooccurrence_matrix
+from .cube import SCORE_BUCKET, CatalogCube, CubeSlice, score_buckets
+from .index import filter_mask
+from .ranking import ScoreRanking
+from .search import SearchIndex, query_tokens
+
+HEATMAP_TOP = 15
+# acima disso o scatter vira grade de densidade (ano × faixa de score) calculada no servidor
+SCATTER_MAX_POINTS = 3000
+
+
+@dataclass(frozen=True)
+class FilterState:
+    countries: Tuple[str, ...] = ()
+    genres: Tuple[str, ...] = ()
+    year_range: Optional[Tuple[int, int]] = None
+    score_range: Optional[Tuple[float, float]] = None
+    query: str = ""          # busca textual (título/elenco/direção/descrição)
+    prefix: bool = False     # último termo da busca como prefixo
+
+    @classmethod
+    def from_selection(
+        cls,
+        sel_countries: Sequence[str] = (),
+        sel_genres: Sequence[str] = (),
+        year_range: Optional[Sequence[int]] = None,
+        score_range: Optional[Sequence[float]] = None,
+        query: str = "",
+        prefix: bool = False,
+    ) -> "FilterState":
+        # ordem de seleção não muda o recorte; scores arredondados ao passo do slider;
+        # busca pelos termos normalizados ("Pokémon!" e "pokemon" são o mesmo recorte); sem termo
+        # indexável (ex.: só stopwords), a consulta fica como veio e não casa com nada
+        query = (query or "").strip()
+        tokens = query_tokens(query)
+        return cls(
+            countries=tuple(sorted(set(sel_countries or ()))),
+            genres=tuple(sorted(set(sel_genres or ()))),
+            year_range=tuple(int(y) for y in year_range) if year_range else None,
+            score_range=tuple(round(float(s), 1) for s in score_range) if score_range else None,
+            query=" ".join(tokens) if tokens else query,
+            prefix=bool(prefix and tokens),
+        )
+
+    def key(self) -> str:
+        payload = json.dumps([self.countries, self.genres, self.year_range, self.score_range, self.query, self.prefix],
+                             ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def mask(self, df: pd.DataFrame, indexes: dict, search: Optional[SearchIndex] = None) -> np.ndarray:
+        mask = filter_mask(df, indexes, self.countries, self.genres, self.year_range, self.score_range)
+        if self.query and search is not None:
+            # conjunto de linhas da busca, em E com os filtros da sidebar
+            mask &= search.mask(self.query, self.prefix)
+        return mask
+
+    def cells(self, cube: CatalogCube) -> Optional[CubeSlice]:
+        # mesmo recorte sobre as células do cubo; None com filtro de país/gênero ou busca (linha a linha)
+        if self.countries or self.genres or self.query:
+            return None
+        return cube.select(self.year_range, self.score_range)
+
+    def rows(self, df: pd.DataFrame, indexes: dict, search: Optional[SearchIndex] = None) -> np.ndarray:
+        # posições das linhas do recorte; o frame base nunca é copiado
+        return np.flatnonzero(self.mask(df, indexes, search))
+
+
+@dataclass
+class DashboardAggregates:
+    total_titles: int = 0
+    n_countries: int = 0
+    n_genres: int = 0
+    country_counts: pd.Series = field(default_factory=lambda: pd.Series(dtype=int))
+    genre_counts: pd.Series = field(default_factory=lambda: pd.Series(dtype=int))
+    heatmap: pd.DataFrame = field(default_factory=pd.DataFrame)
+    yearly: pd.DataFrame = field(default_factory=pd.DataFrame)       # release_year, Lançamentos
+    top10: pd.DataFrame = field(default_factory=pd.DataFrame)        # title, score
+    n_scored: int = 0
+    score_mean: Optional[float] = None
+    score_median: Optional[float] = None
+    score_std: Optional[float] = None
+    score_hist: pd.DataFrame = field(default_factory=pd.DataFrame)   # start, end, count
+    scatter: pd.DataFrame = field(default_factory=pd.DataFrame)      # release_year, score, title (recorte pequeno)
+    score_grid: pd.DataFrame = field(default_factory=pd.DataFrame)   # linhas = faixa de score, colunas = ano
+    focus_genres: pd.Series = field(default_factory=lambda: pd.Series(dtype=int))
+    focus_top: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+
+def heatmap_counts(
+    incidences: Dict[str, Incidence],
+    mask: np.ndarray,
+    rows: str = "country",
+    cols: str = "listed_in",
+    top: int = HEATMAP_TOP,
+) -> pd.DataFrame:
+    # Top N × top N da coocorrência entre duas facetas (País × Gênero por padrão)
+    if not {rows, cols}.issubset(incidences):
+        return pd.DataFrame()
+    return cooccurrence_matrix(incidences[rows], incidences[cols], mask, top, top)
+
+
+def score_histogram(scores: np.ndarray, step: float = SCORE_BUCKET, weights: Optional[np.ndarray] = None) -> pd.DataFrame:
+    # barras = faixas de score do cubo (mesmo resultado nos dois caminhos);
+    # weights: títulos por faixa (roll-up do cubo, scores = início da faixa); sem pesos, um por título
+    b = score_buckets(scores, step)
+    b0 = int(b.min())
+    counts = np.bincount(b - b0, weights=weights)
+    start = np.round((b0 + np.arange(counts.size)) * step, 6)
+    return pd.DataFrame({"start": start, "end": start + step, "count": counts.astype(np.int64)})
+
+
+def score_year_grid(
+    years: np.ndarray, scores: np.ndarray, step: float = SCORE_BUCKET, weights: Optional[np.ndarray] = None
+) -> pd.DataFrame:
+    # contagem por (faixa de score, ano); colunas = anos inteiros, índice = centro da faixa
+    years = np.asarray(years, dtype=float).astype(np.int64)
+    y0, y1 = int(years.min()), int(years.max())
+    b = score_buckets(scores, step)
+    b0 = int(b.min())
+    n_s, n_y = int(b.max()) - b0 + 1, y1 - y0 + 1
+    grid = np.bincount((b - b0) * n_y + (years - y0), weights=weights, minlength=n_s * n_y).reshape(n_s, n_y)
+    return pd.DataFrame(grid.astype(np.int32), index=np.round((b0 + np.arange(n_s) + 0.5) * step, 3),
+                        columns=np.arange(y0, y1 + 1))
+
+
+def take_rows(df: pd.DataFrame, rows: np.ndarray, cols: Sequence[str]) -> pd.DataFrame:
+    # só as colunas pedidas das linhas pedidas (df.iloc[rows] copiaria o frame largo inteiro)
+    return df.iloc[rows, df.columns.get_indexer(list(cols))]
+
+
+def top_by_score(df: pd.DataFrame, rows: Optional[np.ndarray] = None, n: int = 10) -> pd.DataFrame:
+    score = df["score"].to_numpy(dtype=float, na_value=np.nan)
+    if rows is None:
+        rows = np.arange(len(df))
+    else:
+        score = score[rows]
+    ok = np.flatnonzero(~np.isnan(score))
+    best = ok[np.argsort(-score[ok], kind="stable")[:n]]
+    return take_rows(df, rows[best], ["title", "score"])
+
+
+def _facets(agg: DashboardAggregates, bridges: Dict[str, pd.DataFrame], mask: np.ndarray,
+            cube: Optional[CatalogCube] = None, sl: Optional[CubeSlice] = None) -> None:
+    # países/gêneros (multivalorados): títulos por token, do CSR por célula do cubo ou das pontes;
+    # distintos = tokens com título
+    for col, counts, n in (("country", "country_counts", "n_countries"), ("listed_in", "genre_counts", "n_genres")):
+        if sl is not None and col in cube.facets:
+            per_token = pd.Series(cube.facet_rollup(col, sl), index=cube.facets[col].labels, name="qtd")
+            vc = per_token[per_token > 0].sort_values(ascending=False, kind="stable")
+        elif col in bridges:
+            vc = facet_counts(bridges[col], mask)
+        else:
+            continue
+        setattr(agg, counts, vc)
+        setattr(agg, n, int(vc.size))
+
+
+def _rollup_rows(agg: DashboardAggregates, df: pd.DataFrame, rows: np.ndarray) -> int:
+    # Caminho linha a linha (sem cubo); devolve quantos títulos têm score e ano (pontos do scatter)
+    years = df["release_year"].iloc[rows] if "release_year" in df.columns else None
+    if years is not None and years.notna().any():
+        agg.yearly = years.value_counts().sort_index().rename_axis("release_year").reset_index(name="Lançamentos")
+
+    score = df["score"].to_numpy(dtype=float, na_value=np.nan)[rows] if "score" in df.columns else None
+    if score is None or np.isnan(score).all():
+        return 0
+    scored = ~np.isnan(score)
+    scores = score[scored]
+    agg.n_scored = int(scores.size)
+    agg.score_mean = float(scores.mean())
+    agg.score_median = float(np.median(scores))
+    agg.score_std = float(scores.std())
+    agg.score_hist = score_histogram(scores)
+    if years is None:
+        return 0
+    y = years.to_numpy(dtype=float, na_value=np.nan)
+    pts = scored & ~np.isnan(y)
+    if pts.sum() > SCATTER_MAX_POINTS:
+        agg.score_grid = score_year_grid(y[pts], score[pts])
+    return int(pts.sum())
+
+
+def _rollup_cube(agg: DashboardAggregates, cube: CatalogCube, sl: CubeSlice) -> int:
+    # Linha anual e estatísticas/histograma/grade de score por roll-up das células do recorte
+    has_year = len(cube.values["release_year"]) > 0
+    if has_year:
+        per_year = cube.rollup("release_year", sl)
+        if per_year.any():
+            yearly = pd.Series(per_year, index=cube.values["release_year"])
+            agg.yearly = yearly[yearly > 0].rename_axis("release_year").reset_index(name="Lançamentos")
+
+    stats = cube.score_stats(sl)
+    if stats["n"] == 0:
+        return 0
+    agg.n_scored = stats["n"]
+    agg.score_mean, agg.score_median, agg.score_std = stats["mean"], stats["median"], stats["std"]
+    per_bucket = cube.rollup("score_bucket", sl)
+    seen = np.flatnonzero(per_bucket)
+    agg.score_hist = score_histogram(seen * cube.step, cube.step, weights=per_bucket[seen])
+    if not has_year:
+        return 0
+    grid = cube.rollup2("score_bucket", "release_year", sl)
+    n_points = int(grid.sum())
+    if n_points > SCATTER_MAX_POINTS:
+        b, y = np.nonzero(grid)
+        years = cube.values["release_year"].to_numpy(dtype=float)
+        agg.score_grid = score_year_grid(years[y], b * cube.step, cube.step, weights=grid[b, y])
+    return n_points
+
+
+def compute_aggregates(
+    df: pd.DataFrame,
+    bridges: Dict[str, pd.DataFrame],
+    mask: np.ndarray,
+    state: FilterState,
+    incidences: Optional[Dict[str, Incidence]] = None,
+    cube: Optional[CatalogCube] = None,
+    ranking: Optional[ScoreRanking] = None,
+) -> DashboardAggregates:
+    # Com cubo (recortes só de ano/score): barras de país/gênero, linha anual e estatísticas de score
+    # saem das células; com país/gênero ou busca textual, das pontes e das linhas.
+    # Heatmap e listas de títulos (top 10, scatter, foco) continuam nas linhas da máscara.
+    # Com ranking, os tops percorrem listas pré-ordenadas por score em vez de ordenar o recorte
+    rows = np.flatnonzero(mask)
+    agg = DashboardAggregates(total_titles=int(rows.size))
+    if agg.total_titles == 0:
+        return agg
+
+    sl = state.cells(cube) if cube is not None else None
+    _facets(agg, bridges, mask, cube, sl)
+    if sl is not None:
+        n_points = _rollup_cube(agg, cube, sl)
+    else:
+        n_points = _rollup_rows(agg, df, rows)
+    if incidences is None:
+        incidences = build_incidences(df, bridges, ["country", "listed_in"])
+    agg.heatmap = heatmap_counts(incidences, mask)
+
+    has_score = agg.n_scored > 0
+    if has_score:
+        if ranking is not None:
+            agg.top10 = take_rows(df, ranking.top(mask, 10, {"country": state.countries, "listed_in": state.genres}),
+                                  ["title", "score"])
+        else:
+            agg.top10 = top_by_score(df, rows)
+        if 0 < n_points <= SCATTER_MAX_POINTS:
+            score = df["score"].to_numpy(dtype=float, na_value=np.nan)[rows]
+            year = df["release_year"].to_numpy(dtype=float, na_value=np.nan)[rows]
+            agg.scatter = take_rows(df, rows[~np.isnan(score) & ~np.isnan(year)], ["release_year", "score", "title"])
+
+    if len(state.countries) == 1 and "country" in bridges:
+        pais = state.countries[0]
+        mask_pais = mask & facet_mask(bridges["country"], [pais], len(df))
+        if "listed_in" in bridges:
+            agg.focus_genres = facet_counts(bridges["listed_in"], mask_pais).head(15)
+        if has_score and ranking is not None:
+            agg.focus_top = take_rows(df, ranking.top(mask_pais, 10, {"country": [pais]}), ["title", "score"])
+        elif has_score:
+            agg.focus_top = top_by_score(df, np.flatnonzero(mask_pais))
+    return agg
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# netflix_core/assets.py
+#
+# Imagens estáticas das abas Persona/Empatia: variante reduzida (WebP por padrão)
+# gerada uma vez e servida por URL (static serving do Streamlit, com ?v=<hash>
+# para cache longo no navegador). data URI fica só como fallback.
+
+import base64
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from PIL import Image
+
+MIME_TYPES = {"webp": "image/webp", "png": "image/png", "jpeg": "image/jpeg"}
+
+
+@dataclass(frozen=True)
+class ImageAsset:
+    path: str      # arquivo gerado (variante)
+    version: str   # hash curto do conteúdo — muda a URL quando a imagem muda
+    mime: str
+    width: int
+    height: int
+
+    def url(self, static_dir: str, prefix: str = "app/static") -> str:
+        rel = os.path.relpath(self.path, static_dir).replace(os.sep, "/")
+        return f"{prefix}/{rel}?v={self.version}"
+
+    def data_uri(self) -> str:
+        with open(self.path, "rb") as f:
+            return f"data:{self.mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+
+def _digest(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+def build_image_variant(
+    src: str,
+    out_dir: str,
+    max_width: Optional[int] = 1600,
+    fmt: str = "webp",
+    quality: int = 82,
+) -> ImageAsset:
+    # Reaproveita a variante se já existir e for mais nova que a origem
+    stem = os.path.splitext(os.path.basename(src))[0]
+    suffix = f"_{max_width}w" if max_width else ""
+    out = os.path.join(out_dir, f"{stem}{suffix}.{fmt}")
+    if not (os.path.exists(out) and os.path.getmtime(out) >= os.path.getmtime(src)):
+        os.makedirs(out_dir, exist_ok=True)
+        with Image.open(src) as im:
+            im = im.convert("RGBA" if fmt == "webp" and im.mode in ("RGBA", "LA", "P") else "RGB")
+            if max_width and im.width > max_width:
+                im = im.resize((max_width, round(im.height * max_width / im.width)), Image.LANCZOS)
+            tmp = out + ".tmp"
+            params = {"quality": quality, "optimize": True}
+            if fmt == "webp":
+                params["method"] = 6
+            im.save(tmp, format=fmt.upper(), **params)
+        os.replace(tmp, out)
+    with Image.open(out) as im:
+        width, height = im.size
+    return ImageAsset(path=out, version=_digest(out), mime=MIME_TYPES.get(fmt, f"image/{fmt}"),
+                      width=width, height=height)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# netflix_core/bridges.py
+#
+# Tabelas-ponte em forma longa (title_id ↔ token) para as colunas multivaloradas.
+# São construídas uma vez no carregamento; as agregações do dashboard viram
+# groupbys/joins sobre os title_id filtrados, sem copiar nem explodir o frame largo.
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+BRIDGE_COLUMNS = ("country", "listed_in", "cast", "director")
+
+
+def split_tokens(series: pd.Series) -> Tuple[np.ndarray, pd.Series]:
+    # Forma longa (row_id, token) sem lambda por linha; tokens vazios e repetidos saem
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return _split_categorical(series)
+    s = pd.Series(series.fillna("").astype(str).to_numpy(), index=np.arange(len(series)))
+    long = s.str.split(",").explode().str.strip()
+    long = long[long.notna() & (long != "")]
+    long = long[~pd.MultiIndex.from_arrays([long.index, long.to_numpy()]).duplicated()]
+    return long.index.to_numpy(dtype=np.int64), long.reset_index(drop=True)
+
+
+def _split_categorical(series: pd.Series) -> Tuple[np.ndarray, pd.Series]:
+    # Coluna categórica: divide cada combinação distinta uma vez e repete pelos códigos
+    cat_ids, cat_tokens = split_tokens(pd.Series(series.cat.categories.astype(str)))
+    n_cats = len(series.cat.categories)
+    per_cat = np.bincount(cat_ids, minlength=n_cats)
+    starts = np.cumsum(per_cat) - per_cat
+    codes = series.cat.codes.to_numpy()
+    deg = np.where(codes >= 0, per_cat[codes], 0)
+    row_ids = np.repeat(np.arange(len(series), dtype=np.int64), deg)
+    offset = np.arange(deg.sum()) - np.repeat(np.cumsum(deg) - deg, deg)
+    pos = np.repeat(starts[np.maximum(codes, 0)], deg) + offset
+    return row_ids, pd.Series(cat_tokens.to_numpy()[pos])
+
+
+def build_bridge(series: pd.Series, col: str) -> pd.DataFrame:
+    # title_id = posição da linha no catálogo; token como categórico (categorias ordenadas)
+    row_ids, tokens = split_tokens(series)
+    id_dtype = np.int32 if len(series) < 2**31 else np.int64
+    return pd.DataFrame({
+        "title_id": row_ids.astype(id_dtype),
+        col: pd.Categorical(tokens.to_numpy()),
+    })
+
+
+def build_bridges(df: pd.DataFrame, cols: Iterable[str] = BRIDGE_COLUMNS) -> Dict[str, pd.DataFrame]:
+    return {col: build_bridge(df[col], col) for col in cols if col in df.columns}
+
+
+def _codes_in_mask(bridge: pd.DataFrame, mask: Optional[np.ndarray]) -> np.ndarray:
+    codes = bridge.iloc[:, 1].cat.codes.to_numpy()
+    if mask is None:
+        return codes
+    return codes[mask[bridge["title_id"].to_numpy()]]
+
+
+def facet_counts(bridge: pd.DataFrame, mask: Optional[np.ndarray] = None) -> pd.Series:
+    # Títulos por token entre as linhas da máscara, do maior para o menor
+    cats = bridge.iloc[:, 1].cat.categories
+    counts = np.bincount(_codes_in_mask(bridge, mask), minlength=len(cats))
+    out = pd.Series(counts, index=pd.Index(cats, name=bridge.columns[1]), name="qtd")
+    return out[out > 0].sort_values(ascending=False, kind="stable")
+
+
+def facet_mask(bridge: pd.DataFrame, tokens: Iterable[str], n_rows: int) -> np.ndarray:
+    # Linhas que têm algum dos tokens (igualdade exata: "Niger" não casa com "Nigeria")
+    col = bridge.iloc[:, 1]
+    codes = col.cat.categories.get_indexer(list(tokens))
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[bridge["title_id"].to_numpy()[np.isin(col.cat.codes.to_numpy(), codes[codes >= 0])]] = True
+    return mask
+
+
+def facet_nunique(bridge: pd.DataFrame, mask: Optional[np.ndarray] = None) -> int:
+    return int(np.unique(_codes_in_mask(bridge, mask)).size)
+
+
+def facet_pairs(left: pd.DataFrame, right: pd.DataFrame, mask: Optional[np.ndarray] = None) -> pd.DataFrame:
+    # Join das duas pontes pelo title_id, restrito às linhas da máscara
+    if mask is not None:
+        left = left[mask[left["title_id"].to_numpy()]]
+        right = right[mask[right["title_id"].to_numpy()]]
+    return left.merge(right, on="title_id", how="inner")
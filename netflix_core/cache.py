@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# netflix_core/cache.py
+#
+# Cache colunar em disco (Arrow/Feather, sem compressão → memory-map).
+# Cada entrada guarda a assinatura das fontes (tamanho, mtime, sha256); se só o
+# mtime mudar, o hash confirma que o conteúdo é o mesmo e o cache continua válido.
+
+import hashlib
+import json
+import os
+from typing import Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow vem com o streamlit
+    pa = None
+    feather = None
+
+# Incrementar quando o formato do frame cacheado mudar
+CACHE_VERSION = 5
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_stat(path: str) -> dict:
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _paths(cache_dir: str, name: str):
+    return os.path.join(cache_dir, f"{name}.feather"), os.path.join(cache_dir, f"{name}.json")
+
+
+def _sources_match(saved: Sequence[dict], sources: Sequence[str]) -> Optional[list]:
+    # Devolve a lista de metadados atualizada se as fontes não mudaram, senão None
+    if len(saved) != len(sources):
+        return None
+    current = []
+    for meta, path in zip(saved, sources):
+        if not os.path.exists(path):
+            return None
+        stat = file_stat(path)
+        if stat["path"] != meta.get("path") or stat["size"] != meta.get("size"):
+            return None
+        if stat["mtime_ns"] != meta.get("mtime_ns") and file_sha256(path) != meta.get("sha256"):
+            return None
+        current.append({**stat, "sha256": meta.get("sha256")})
+    return current
+
+
+def _read_meta(data_path: str, meta_path: str) -> Optional[dict]:
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION else None
+
+
+def cached_path(cache_dir: str, name: str, sources: Sequence[str]) -> Optional[str]:
+    # Caminho do arquivo da entrada se ela existe e as fontes não mudaram, senão None
+    data_path, meta_path = _paths(cache_dir, name)
+    meta = _read_meta(data_path, meta_path)
+    if meta is None:
+        return None
+    current = _sources_match(meta.get("sources", []), sources)
+    if current is None:
+        return None
+    if current != meta["sources"]:
+        # só o mtime mudou (ex.: checkout/cópia): atualiza para não re-hashear no próximo start
+        _write_meta(meta_path, current)
+    return data_path
+
+
+def read_cached_frame(cache_dir: str, name: str, sources: Sequence[str]) -> Optional[pd.DataFrame]:
+    if feather is None:
+        return None
+    data_path = cached_path(cache_dir, name, sources)
+    if data_path is None:
+        return None
+    try:
+        return read_feather(data_path)
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def read_stale_frame(cache_dir: str, name: str) -> Optional[pd.DataFrame]:
+    # Última versão gravada da entrada, mesmo que as fontes tenham mudado (base do refresh incremental)
+    if feather is None:
+        return None
+    data_path, meta_path = _paths(cache_dir, name)
+    if _read_meta(data_path, meta_path) is None:
+        return None
+    try:
+        return read_feather(data_path)
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def read_feather(path: str) -> pd.DataFrame:
+    # memory-map; strings continuam no buffer Arrow (string[pyarrow]) em vez de virar objetos Python.
+    # Sem os metadados pandas do arquivo: eles gravam só "string" e venceriam o types_mapper
+    # (categorias, inteiros e datas vêm do próprio schema Arrow; o índice é sempre RangeIndex)
+    table = feather.read_table(path, memory_map=True)
+    return table.replace_schema_metadata(None).to_pandas(
+        types_mapper=lambda t: pd.StringDtype("pyarrow") if t in (pa.string(), pa.large_string()) else None)
+
+
+def _write_meta(meta_path: str, sources: list) -> None:
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "sources": sources}, f, indent=1)
+    os.replace(tmp, meta_path)
+
+
+def content_id(name: str, hashes: Sequence[str]) -> str:
+    # identidade do conteúdo de uma entrada: nome (inclui variantes, ex.: fuzzy) + sha256 das fontes
+    return hashlib.sha256("\n".join([name, *hashes]).encode("utf-8")).hexdigest()
+
+
+def cached_content_id(cache_dir: str, name: str) -> Optional[str]:
+    # content_id das fontes da última gravação da entrada, pelos sha256 do metadado (sem reler as fontes)
+    meta = _read_meta(*_paths(cache_dir, name))
+    if meta is None or not all(m.get("sha256") for m in meta.get("sources", [])):
+        return None
+    return content_id(name, [m["sha256"] for m in meta["sources"]])
+
+
+def cache_data_path(cache_dir: str, name: str) -> str:
+    # para quem grava o arquivo da entrada por conta própria (ex.: em streaming) e depois chama write_cache_meta
+    return _paths(cache_dir, name)[0]
+
+
+def drop_cache_entry(cache_dir: str, name: str) -> None:
+    # remove só o metadado: a entrada passa a ser inválida mesmo que o arquivo fique
+    meta_path = _paths(cache_dir, name)[1]
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+
+def write_cache_meta(cache_dir: str, name: str, sources: Sequence[str]) -> None:
+    _write_meta(_paths(cache_dir, name)[1], [{**file_stat(p), "sha256": file_sha256(p)} for p in sources])
+
+
+def write_cached_frame(df: pd.DataFrame, cache_dir: str, name: str, sources: Sequence[str]) -> bool:
+    if feather is None:
+        return False
+    data_path = cache_data_path(cache_dir, name)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = data_path + ".tmp"
+        feather.write_feather(df.reset_index(drop=True), tmp, compression="uncompressed")
+        os.replace(tmp, data_path)
+        write_cache_meta(cache_dir, name, sources)
+    except OSError:
+        # diretório só-leitura etc.: o app segue funcionando sem cache em disco
+        return False
+    return True
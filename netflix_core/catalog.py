@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# netflix_core/catalog.py
+#
+# Leitura e tipagem do catálogo (netflix_titles.csv) e das avaliações (ratings.csv).
+# O frame final — tipado, com n_countries/n_genres e score já unidos — vai para o
+# cache colunar em disco; o CSV só é relido quando alguma fonte muda.
+
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - habilita o dtype "string[pyarrow]"
+    ARROW_STRING = "string[pyarrow]"
+except ImportError:  # pragma: no cover - pyarrow vem com o streamlit
+    ARROW_STRING = None
+
+from .bridges import split_tokens
+from .cache import read_cached_frame, write_cached_frame
+from .fuzzy import apply_fuzzy_mapping, build_fuzzy_mapping
+from .io import read_csv
+from .ratings import build_title_index, join_ratings, read_ratings
+
+TEXT_COLUMNS = ["country", "listed_in", "cast", "director", "title", "type", "description"]
+CATEGORY_COLUMNS = ["type", "rating"]
+# combinações repetidas ("United States, India"): dicionário de códigos em vez de uma string por linha
+DICT_COLUMNS = ["country", "listed_in", "duration"]
+# alta cardinalidade: strings contíguas em buffer Arrow, sem um objeto Python por célula
+STRING_COLUMNS = ["show_id", "title", "title_norm", "description", "cast", "director"]
+DATE_FORMAT = "%B %d, %Y"  # "September 25, 2021"
+CACHE_NAME = "catalog"
+
+
+def count_tokens(series: pd.Series) -> np.ndarray:
+    row_ids, _ = split_tokens(series)
+    return np.bincount(row_ids, minlength=len(series))
+
+
+def prepare_catalog(df: pd.DataFrame) -> pd.DataFrame:
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna("").astype(str)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    if "release_year" in df.columns:
+        df["release_year"] = pd.to_numeric(df["release_year"], errors="coerce")
+    if "date_added" in df.columns:
+        df["date_added"] = pd.to_datetime(df["date_added"].astype(str).str.strip(), format=DATE_FORMAT, errors="coerce")
+
+    df["n_countries"] = count_tokens(df["country"]) if "country" in df.columns else 0
+    df["n_genres"] = count_tokens(df["listed_in"]) if "listed_in" in df.columns else 0
+    return df
+
+
+def compact_catalog(df: pd.DataFrame) -> pd.DataFrame:
+    # Representação enxuta do frame final: categorias, strings Arrow e inteiros reduzidos
+    for col in CATEGORY_COLUMNS + DICT_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    if ARROW_STRING:
+        for col in STRING_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype(ARROW_STRING)
+    if "release_year" in df.columns and df["release_year"].notna().all():
+        df["release_year"] = pd.to_numeric(df["release_year"], downcast="integer")
+    for col in ["n_countries", "n_genres"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast="unsigned")
+    return df
+
+
+def build_catalog(
+    netflix_path: str,
+    ratings_path: str,
+    fuzzy_threshold: Optional[float] = None,
+    cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    df = prepare_catalog(read_csv(netflix_path))
+    ratings_df, ratings_col = read_ratings(ratings_path)
+    index = build_title_index(ratings_df, ratings_col)
+    df = join_ratings(df, index)
+    if fuzzy_threshold and index is not None:
+        df = apply_fuzzy_mapping(df, index, load_fuzzy_mapping(df, index, fuzzy_threshold,
+                                                               catalog_sources(netflix_path, ratings_path), cache_dir))
+    return compact_catalog(df)
+
+
+def load_fuzzy_mapping(df, index, threshold: float, sources: List[str], cache_dir: Optional[str]) -> pd.DataFrame:
+    # tabela de matches aproximados persistida ao lado do catálogo (uma por threshold)
+    name = f"fuzzy_map_t{threshold:g}"
+    mapping = read_cached_frame(cache_dir, name, sources) if cache_dir else None
+    if mapping is None:
+        mapping = build_fuzzy_mapping(df, index, threshold)
+        if cache_dir:
+            write_cached_frame(mapping, cache_dir, name, sources)
+    return mapping
+
+
+def catalog_sources(netflix_path: str, ratings_path: str) -> List[str]:
+    return [p for p in (netflix_path, ratings_path) if os.path.exists(p)]
+
+
+def load_catalog(
+    netflix_path: str,
+    ratings_path: str,
+    cache_dir: Optional[str] = None,
+    fuzzy_threshold: Optional[float] = None,
+) -> pd.DataFrame:
+    # Lê do cache colunar se as fontes não mudaram; senão reconstrói a partir do CSV
+    sources = catalog_sources(netflix_path, ratings_path)
+    name = CACHE_NAME if not fuzzy_threshold else f"{CACHE_NAME}_fuzzy_t{fuzzy_threshold:g}"
+    if cache_dir:
+        cached = read_cached_frame(cache_dir, name, sources)
+        if cached is not None:
+            return cached
+    df = build_catalog(netflix_path, ratings_path, fuzzy_threshold, cache_dir)
+    if cache_dir:
+        write_cached_frame(df, cache_dir, name, sources)
+    return df
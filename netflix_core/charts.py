@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# netflix_core/charts.py
+#
+# Construtores de figuras Plotly a partir das agregações (sem Streamlit).
+# Histograma e score × ano chegam ao navegador já agregados: contagens por faixa
+# e, acima de SCATTER_MAX_POINTS, uma grade de densidade em vez dos pontos crus.
+# Os padrões do Plotly Express ficam aqui (e não no app) para que figuras montadas
+# em outro processo (netflix_core/warmup.py) saiam iguais às do script. Rótulos e hover
+# apontam para os próprios valores (%{x}, %{location}) em vez de repetir os dados em
+# text/hovertext: o JSON de cada figura leva cada número uma vez só.
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+px.defaults.template = "plotly_white"
+px.defaults.color_continuous_scale = "Reds"
+
+TOP_GENRES = 20
+
+
+def country_map_figure(country_counts: pd.Series) -> go.Figure:
+    cnt = country_counts.reset_index()
+    fig = px.choropleth(cnt, locations="country", locationmode="country names",
+                        color="qtd", color_continuous_scale="Reds")
+    fig.update_coloraxes(colorbar_title="# de títulos")
+    fig.update_traces(hovertemplate="<b>%{location}</b><br>Qtd: %{z}<extra></extra>")
+    return fig
+
+
+def genre_frame(counts: pd.Series) -> pd.DataFrame:
+    # contagens por gênero na ordem das barras horizontais (maior embaixo → em cima)
+    return pd.DataFrame({"Gênero": counts.index.astype(str), "Qtd": counts.values}).sort_values("Qtd", ascending=True)
+
+
+def genre_bar_figure(counts: pd.Series) -> go.Figure:
+    gen_cnt = genre_frame(counts)
+    fig = px.bar(gen_cnt, x="Qtd", y="Gênero", orientation="h", labels={"Qtd": "Qtd", "Gênero": "Gênero"})
+    fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    fig.update_traces(texttemplate="%{x}", textposition="outside", cliponaxis=False)
+    return fig
+
+
+def genre_treemap_figure(counts: pd.Series) -> go.Figure:
+    return px.treemap(genre_frame(counts).sort_values("Qtd", ascending=False),
+                      path=["Gênero"], values="Qtd", labels={"Qtd": "Qtd"})
+
+
+def heatmap_figure(pv: pd.DataFrame) -> go.Figure:
+    return px.imshow(pv, aspect="auto", labels=dict(color="# de títulos"))
+
+
+def yearly_figure(yearly: pd.DataFrame) -> go.Figure:
+    fig = px.line(yearly, x="release_year", y="Lançamentos", markers=True, labels={"release_year": "Ano"})
+    fig.update_traces(hovertemplate="Ano %{x}<br>Qtd: %{y}<extra></extra>")
+    return fig
+
+
+def top_titles_figure(top: pd.DataFrame) -> go.Figure:
+    # maior score em cima
+    fig = px.bar(top.iloc[::-1], x="score", y="title", orientation="h", labels={"score": "Score", "title": "Título"})
+    fig.update_traces(texttemplate="%{x:.1f}", textposition="outside", cliponaxis=False)
+    return fig
+
+
+def score_histogram_figure(hist: pd.DataFrame) -> go.Figure:
+    width = float(hist["end"].iloc[0] - hist["start"].iloc[0])
+    centers = ((hist["start"] + hist["end"]) / 2).round(3)
+    fig = px.bar(x=centers, y=hist["count"], labels={"x": "Score", "y": "count"})
+    fig.update_traces(width=width, hovertemplate="Score %{x:.2f}<br>Qtd: %{y}<extra></extra>")
+    fig.update_layout(bargap=0)
+    return fig
+
+
+def score_year_figure(scatter: pd.DataFrame, grid: pd.DataFrame) -> go.Figure:
+    if not scatter.empty:
+        return px.scatter(scatter, x="release_year", y="score", hover_name="title",
+                          labels={"release_year": "Ano", "score": "Score"})
+    # células vazias como None ficam transparentes
+    z = grid.to_numpy(dtype=float)
+    z[z == 0] = np.nan
+    fig = go.Figure(go.Heatmap(
+        z=np.where(np.isnan(z), None, z).tolist(), x=grid.columns.tolist(), y=grid.index.tolist(),
+        colorscale="Reds", colorbar={"title": "# de títulos"},
+        hovertemplate="Ano %{x}<br>Score ~%{y}<br>Qtd: %{z}<extra></extra>",
+    ))
+    fig.update_layout(template="plotly_white", xaxis_title="Ano", yaxis_title="Score")
+    return fig
+
+
+# Figuras de cada recorte do Dashboard: nome → (construtor, campos de DashboardAggregates).
+# Só entram as que não dependem de widgets (o foco por país e os outros cruzamentos do heatmap
+# seguem montados sob demanda)
+DASHBOARD_FIGURES = {
+    "mapa": (country_map_figure, ("country_counts",)),
+    "generos": (genre_bar_figure, ("genre_counts",)),
+    "treemap": (genre_treemap_figure, ("genre_counts",)),
+    "heatmap": (heatmap_figure, ("heatmap",)),
+    "anual": (yearly_figure, ("yearly",)),
+    "top10": (top_titles_figure, ("top10",)),
+    "histograma": (score_histogram_figure, ("score_hist",)),
+    "score_ano": (score_year_figure, ("scatter", "score_grid")),
+}
+
+
+def figure_inputs(agg, name: str) -> tuple:
+    # só os campos que a figura usa (é o que atravessa para o processo do pool); None = sem dados
+    values = tuple(getattr(agg, f) for f in DASHBOARD_FIGURES[name][1])
+    if name in ("generos", "treemap"):
+        values = (values[0].head(TOP_GENRES),)
+    if all(v.empty for v in values):
+        return None
+    return values
+
+
+def build_figure(name: str, *values) -> go.Figure:
+    return DASHBOARD_FIGURES[name][0](*values)
+
+
+def dashboard_figures(agg) -> Dict[str, go.Figure]:
+    # todas as figuras do recorte, em série (referência para o warm-up paralelo)
+    out = {}
+    for name in DASHBOARD_FIGURES:
+        values = figure_inputs(agg, name)
+        if values is not None:
+            out[name] = build_figure(name, *values)
+    return out
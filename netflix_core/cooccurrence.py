@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# netflix_core/cooccurrence.py
+#
+# Coocorrência entre facetas (País × Gênero, Classificação × Gênero, País × Tipo...)
+# a partir de matrizes de incidência esparsas título × token em CSR.
+# A contagem é o produto Aᵀ·diag(máscara)·B feito só nas linhas filtradas:
+# cada título gera grau_A × grau_B pares (a, b), somados com bincount.
+# O trabalho do produto é Σ grau_A·grau_B de qualquer jeito; a memória não: os títulos
+# são expandidos em blocos de até PAIR_BLOCK pares e somados num acumulador do tamanho
+# da saída (grade densa, ou chaves distintas acima de DENSE_MAX_CELLS).
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# acima disso (labels_A × labels_B) os pares são somados com np.unique em vez de bincount denso
+DENSE_MAX_CELLS = 4_000_000
+# pares (a, b) expandidos por vez; limita a memória da expansão independentemente do recorte
+PAIR_BLOCK = 1_000_000
+
+
+@dataclass(frozen=True)
+class Incidence:
+    labels: np.ndarray   # tokens (categorias da ponte ou valores da coluna)
+    indptr: np.ndarray   # tokens do título i em codes[indptr[i]:indptr[i+1]]
+    codes: np.ndarray
+    n_rows: int
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+
+def incidence_from_bridge(bridge: pd.DataFrame, n_rows: int) -> Incidence:
+    # A ponte já vem ordenada por title_id: indptr sai direto da contagem por título
+    ids = bridge["title_id"].to_numpy()
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=n_rows), out=indptr[1:])
+    tokens = bridge.iloc[:, 1]
+    return Incidence(labels=np.asarray(tokens.cat.categories, dtype=object), indptr=indptr,
+                     codes=tokens.cat.codes.to_numpy(), n_rows=n_rows)
+
+
+def incidence_from_column(series: pd.Series) -> Incidence:
+    # Coluna de valor único (type, rating): no máximo um token por título; vazio/NaN fica sem token
+    cat = series.astype("category") if not isinstance(series.dtype, pd.CategoricalDtype) else series
+    codes = cat.cat.codes.to_numpy()
+    keep = codes >= 0
+    indptr = np.zeros(len(series) + 1, dtype=np.int64)
+    np.cumsum(keep, out=indptr[1:])
+    return Incidence(labels=np.asarray(cat.cat.categories, dtype=object), indptr=indptr,
+                     codes=codes[keep], n_rows=len(series))
+
+
+def build_incidences(
+    df: pd.DataFrame,
+    bridges: Dict[str, pd.DataFrame],
+    cols: Iterable[str] = ("country", "listed_in", "type", "rating"),
+) -> Dict[str, Incidence]:
+    # Multivaloradas vêm das pontes; as demais, da própria coluna
+    out = {}
+    for col in cols:
+        if col in bridges:
+            out[col] = incidence_from_bridge(bridges[col], len(df))
+        elif col in df.columns:
+            out[col] = incidence_from_column(df[col])
+    return out
+
+
+def _expand(a: Incidence, b: Incidence, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Para cada título selecionado, produto cartesiano dos seus tokens em A e em B (sem laço por linha)
+    deg_a, deg_b = a.degrees()[rows], b.degrees()[rows]
+    ok = (deg_a > 0) & (deg_b > 0)
+    rows, deg_a, deg_b = rows[ok], deg_a[ok], deg_b[ok]
+    if rows.size == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    # entradas de A das linhas escolhidas, cada uma repetida grau_B vezes
+    a_start = np.repeat(a.indptr[rows], deg_a)
+    a_off = np.arange(deg_a.sum()) - np.repeat(np.cumsum(deg_a) - deg_a, deg_a)
+    a_codes = a.codes[a_start + a_off]
+    reps = np.repeat(deg_b, deg_a)
+    left = np.repeat(a_codes, reps)
+    # k-ésima repetição aponta para o k-ésimo token de B da mesma linha
+    b_start = np.repeat(np.repeat(b.indptr[rows], deg_a), reps)
+    k = np.arange(reps.sum()) - np.repeat(np.cumsum(reps) - reps, reps)
+    right = b.codes[b_start + k]
+    return left.astype(np.int64), right.astype(np.int64)
+
+
+def _row_blocks(a: Incidence, b: Incidence, rows: np.ndarray) -> Iterable[np.ndarray]:
+    # Fatias consecutivas de rows com até PAIR_BLOCK pares cada (um título maior que isso vai sozinho)
+    pairs = a.degrees()[rows] * b.degrees()[rows]
+    rows = rows[pairs > 0]
+    if rows.size == 0:
+        return
+    cum = np.cumsum(pairs[pairs > 0])
+    starts = np.unique(np.searchsorted(cum, np.arange(0, cum[-1], PAIR_BLOCK), side="right"))
+    for lo, hi in zip(starts, np.append(starts[1:], rows.size)):
+        yield rows[lo:hi]
+
+
+def cooccurrence_counts(
+    a: Incidence,
+    b: Incidence,
+    mask: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Forma esparsa (i, j, qtd) de Aᵀ·diag(máscara)·B, só células não nulas
+    rows = np.arange(a.n_rows) if mask is None else np.flatnonzero(mask)
+    n_b = b.labels.size
+    dense = a.labels.size * n_b <= DENSE_MAX_CELLS
+    flat = np.zeros(a.labels.size * n_b if dense else 0, dtype=np.int64)
+    keys, counts = np.empty(0, np.int64), np.empty(0, np.int64)
+    for block in _row_blocks(a, b, rows):
+        left, right = _expand(a, b, block)
+        if dense:
+            flat += np.bincount(left * n_b + right, minlength=flat.size)
+        else:
+            k, c = np.unique(left * n_b + right, return_counts=True)
+            keys, inverse = np.unique(np.concatenate([keys, k]), return_inverse=True)
+            counts = np.bincount(inverse, weights=np.concatenate([counts, c]), minlength=keys.size).astype(np.int64)
+    if dense:
+        keys = np.flatnonzero(flat)
+        counts = flat[keys]
+    return keys // n_b, keys % n_b, counts
+
+
+def cooccurrence_matrix(
+    a: Incidence,
+    b: Incidence,
+    mask: Optional[np.ndarray] = None,
+    top_a: Optional[int] = 15,
+    top_b: Optional[int] = 15,
+) -> pd.DataFrame:
+    # Top-N de cada eixo pelo total de pares; linhas/colunas em ordem alfabética (como um crosstab)
+    i, j, c = cooccurrence_counts(a, b, mask)
+    if c.size == 0:
+        return pd.DataFrame()
+    keep_a = _top_codes(np.bincount(i, weights=c, minlength=a.labels.size), top_a)
+    keep_b = _top_codes(np.bincount(j, weights=c, minlength=b.labels.size), top_b)
+    sel = np.isin(i, keep_a) & np.isin(j, keep_b)
+    i, j, c = i[sel], j[sel], c[sel]
+    if c.size == 0:
+        return pd.DataFrame()
+    ua, ia = np.unique(i, return_inverse=True)
+    ub, jb = np.unique(j, return_inverse=True)
+    grid = np.zeros((ua.size, ub.size), dtype=np.int64)
+    grid[ia, jb] = c
+    out = pd.DataFrame(grid, index=pd.Index(a.labels[ua].astype(str)), columns=pd.Index(b.labels[ub].astype(str)))
+    return out.sort_index().sort_index(axis=1)
+
+
+def _top_codes(totals: np.ndarray, top: Optional[int]) -> np.ndarray:
+    nz = np.flatnonzero(totals)
+    if top is None or nz.size <= top:
+        return nz
+    return nz[np.argsort(-totals[nz], kind="stable")[:top]]
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# netflix_core/cube.py
+#
+# Cubo pré-calculado para os recortes de ano e score do Dashboard. Cada título cai em
+# exatamente uma célula (ano, faixa de score de SCORE_BUCKET); a célula guarda títulos,
+# soma e soma dos quadrados dos scores e, por faceta multivalorada (país, gênero), um CSR
+# célula → (token, títulos da célula com o token). Como cada título está numa só célula,
+# somar os tokens das células do recorte dá títulos distintos por país/gênero. Com
+# ~100 anos × ~40 faixas, são alguns milhares de células qualquer que seja o catálogo.
+# Escopo: recortes de ano/score (a visão padrão incluída) saem inteiros do cubo — KPIs,
+# barras de país/gênero, linha anual, estatísticas, histograma e grade. Um filtro de
+# país/gênero ou busca textual é calculado linha a linha: a faceta combinada de cada
+# título (conjunto de países × conjunto de gêneros) teria de virar dimensão, e no
+# catálogo real isso dá ~8 250 células para 8 807 títulos, sem ganho sobre as linhas.
+# Faixa de anos seleciona células inteiras. Faixa de score corta no máximo duas faixas
+# de borda: essas células são refeitas a partir dos scores das suas linhas (guardados em
+# ordem de célula, CSR), e as linhas que ficam de fora têm os tokens descontados pela
+# incidência título × token; tudo sai igual ao cálculo linha a linha. -1 = sem valor.
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cooccurrence import Incidence
+
+SCORE_BUCKET = 0.25  # largura da faixa de score (= barras do histograma e linhas da grade score × ano)
+CUBE_COLUMNS = ("release_year",)
+FACET_COLUMNS = ("country", "listed_in")
+
+
+def score_buckets(scores: np.ndarray, step: float = SCORE_BUCKET) -> np.ndarray:
+    # faixa de cada score (NaN → -1); a mesma função serve ao cubo e ao cálculo linha a linha
+    scores = np.asarray(scores, dtype=float)
+    out = np.full(scores.shape, -1, dtype=np.int32)
+    ok = ~np.isnan(scores)
+    out[ok] = np.floor(scores[ok] / step).astype(np.int32)
+    return out
+
+
+@dataclass(frozen=True)
+class CubeSlice:
+    # células de um recorte; count/sum/sumsq já descontam as linhas fora da faixa de score
+    cells: np.ndarray
+    count: np.ndarray
+    sum: np.ndarray
+    sumsq: np.ndarray
+    score_range: Optional[Tuple[float, float]] = None
+    dropped: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))  # linhas fora, nas bordas
+
+    @property
+    def total(self) -> int:
+        return int(self.count.sum())
+
+
+def _spans(indptr: np.ndarray, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # posições das entradas das células pedidas num CSR + célula (ordem em cells) de cada uma
+    lens = indptr[cells + 1] - indptr[cells]
+    start = np.repeat(indptr[cells] - np.cumsum(lens) + lens, lens)
+    return start + np.arange(int(lens.sum())), np.repeat(np.arange(cells.size), lens)
+
+
+@dataclass(frozen=True)
+class CellFacets:
+    # tokens de uma faceta por célula: célula i → codes/counts[indptr[i]:indptr[i+1]]
+    labels: pd.Index               # código → token (categorias da ponte)
+    indptr: np.ndarray
+    codes: np.ndarray
+    counts: np.ndarray             # títulos da célula com o token
+    incidence: Incidence           # título × token (a do store), para descontar as bordas
+
+
+@dataclass(frozen=True)
+class CatalogCube:
+    cells: pd.DataFrame            # códigos de release_year, score_bucket + count, sum, sumsq
+    values: Dict[str, pd.Index]    # código → valor ("release_year")
+    indptr: np.ndarray             # linhas da célula i em rows[indptr[i]:indptr[i+1]]
+    rows: np.ndarray
+    scores: np.ndarray             # score de cada linha em rows (mesma ordem)
+    n_rows: int
+    step: float = SCORE_BUCKET
+    facets: Dict[str, CellFacets] = field(default_factory=dict)
+
+    def _codes(self, col: str) -> np.ndarray:
+        return self.cells[col].to_numpy()
+
+    def _gather(self, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # posições (em rows/scores) das linhas das células pedidas + célula de cada uma
+        return _spans(self.indptr, cells)
+
+    def select(
+        self,
+        year_range: Optional[Tuple[int, int]] = None,
+        score_range: Optional[Tuple[float, float]] = None,
+    ) -> CubeSlice:
+        # mesma comparação de filter_mask: faixa inclusiva, sem valor nunca passa
+        sel = np.ones(len(self.cells), dtype=bool)
+        if year_range is not None and "release_year" in self.values:
+            v = self.values["release_year"].to_numpy(dtype=float, na_value=np.nan)
+            sel &= np.append((v >= year_range[0]) & (v <= year_range[1]), False)[self._codes("release_year")]
+        bucket = self._codes("score_bucket")
+        edge = np.zeros(len(self.cells), dtype=bool)
+        if score_range is not None:
+            lo, hi = score_buckets(np.asarray(score_range, dtype=float), self.step)
+            sel &= (bucket >= lo) & (bucket <= hi)
+            edge = sel & ((bucket == lo) | (bucket == hi))
+        cells = np.flatnonzero(sel)
+        count = self._codes("count")[cells].copy()
+        total = self._codes("sum")[cells].copy()
+        sumsq = self._codes("sumsq")[cells].copy()
+        part = np.flatnonzero(edge[cells])
+        dropped = np.empty(0, dtype=np.int64)
+        if part.size:
+            # faixas de borda: só os scores da célula que caem na faixa pedida
+            pos, owner = self._gather(cells[part])
+            s = self.scores[pos]
+            ok = (s >= score_range[0]) & (s <= score_range[1])
+            count[part] = np.bincount(owner[ok], minlength=part.size)
+            total[part] = np.bincount(owner[ok], weights=s[ok], minlength=part.size)
+            sumsq[part] = np.bincount(owner[ok], weights=s[ok] * s[ok], minlength=part.size)
+            dropped = self.rows[pos[~ok]].astype(np.int64)
+        return CubeSlice(cells, count, total, sumsq, score_range, dropped)
+
+    def rollup(self, col: str, sl: CubeSlice, scored: bool = False) -> np.ndarray:
+        # títulos por código da dimensão (sem valor fica de fora); scored: só os que têm score
+        n = int(self._codes(col).max()) + 1 if col == "score_bucket" else len(self.values[col])
+        codes = self._codes(col)[sl.cells]
+        ok = codes >= 0
+        if scored:
+            ok &= self._codes("score_bucket")[sl.cells] >= 0
+        return np.bincount(codes[ok], weights=sl.count[ok], minlength=max(n, 0)).astype(np.int64)
+
+    def rollup2(self, a: str, b: str, sl: CubeSlice) -> np.ndarray:
+        # matriz (código de a × código de b) de títulos, para a grade score × ano
+        na, nb = int(self._codes(a).max()) + 1, int(self._codes(b).max()) + 1
+        ca, cb = self._codes(a)[sl.cells], self._codes(b)[sl.cells]
+        ok = (ca >= 0) & (cb >= 0)
+        flat = np.bincount(ca[ok] * nb + cb[ok], weights=sl.count[ok], minlength=na * nb)
+        return flat.astype(np.int64).reshape(na, nb)
+
+    def facet_rollup(self, col: str, sl: CubeSlice) -> np.ndarray:
+        # títulos distintos por token da faceta (código → títulos), descontadas as linhas fora das bordas
+        f = self.facets[col]
+        pos, _ = _spans(f.indptr, sl.cells)
+        out = np.bincount(f.codes[pos], weights=f.counts[pos], minlength=len(f.labels))
+        if sl.dropped.size:
+            pos, _ = _spans(f.incidence.indptr, sl.dropped)
+            out -= np.bincount(f.incidence.codes[pos], minlength=len(f.labels))
+        return out.astype(np.int64)
+
+    def score_stats(self, sl: CubeSlice) -> dict:
+        # n, soma, soma dos quadrados, média, desvio (populacional) e mediana exata
+        scored = self._codes("score_bucket")[sl.cells] >= 0
+        n = int(sl.count[scored].sum())
+        if n == 0:
+            return {"n": 0, "sum": 0.0, "sumsq": 0.0, "mean": None, "std": None, "median": None}
+        total, sumsq = float(sl.sum[scored].sum()), float(sl.sumsq[scored].sum())
+        mean = total / n
+        return {"n": n, "sum": total, "sumsq": sumsq, "mean": mean,
+                "std": float(np.sqrt(max(sumsq / n - mean * mean, 0.0))), "median": self._median(sl, n)}
+
+    def _median(self, sl: CubeSlice, n: int) -> float:
+        # faixa(s) que contêm as posições do meio pelas contagens; dentro dela, os scores das linhas
+        per_bucket = self.rollup("score_bucket", sl)
+        cum = np.cumsum(per_bucket)
+        mid = []
+        for k in ((n - 1) // 2, n // 2):
+            b = int(np.searchsorted(cum, k, side="right"))
+            cells = sl.cells[self._codes("score_bucket")[sl.cells] == b]
+            s = self.scores[self._gather(cells)[0]]
+            if sl.score_range is not None:
+                s = s[(s >= sl.score_range[0]) & (s <= sl.score_range[1])]
+            k -= int(cum[b] - per_bucket[b])
+            mid.append(np.partition(s, k)[k])
+        return float(np.mean(mid))
+
+
+def _factorize(s: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    # códigos sobre os valores distintos ordenados, no dtype da coluna; -1 = sem valor
+    codes, uniques = pd.factorize(s, sort=True)
+    return codes.astype(np.int32), pd.Index(uniques, name=s.name)
+
+
+def _cell_facets(inc: Incidence, col: str, cell_of: np.ndarray, n_cells: int) -> CellFacets:
+    # pares (célula, token) da incidência título × token, com a contagem de títulos de cada par
+    n_labels = max(inc.labels.size, 1)
+    key = np.repeat(cell_of.astype(np.int64), inc.degrees()) * n_labels + inc.codes
+    pairs, counts = np.unique(key, return_counts=True)
+    indptr = np.zeros(n_cells + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs // n_labels, minlength=n_cells), out=indptr[1:])
+    return CellFacets(labels=pd.Index(inc.labels, name=col), indptr=indptr, codes=(pairs % n_labels).astype(np.int32),
+                      counts=counts.astype(np.int64), incidence=inc)
+
+
+def build_cube(df: pd.DataFrame, incidences: Optional[Dict[str, Incidence]] = None,
+               step: float = SCORE_BUCKET) -> Optional[CatalogCube]:
+    # incidences: as do store (título × token); as facetas presentes nelas ganham o CSR por célula
+    if "score" not in df.columns:
+        return None
+    score = df["score"].to_numpy(dtype=float, na_value=np.nan)
+    keys: Dict[str, np.ndarray] = {}
+    values: Dict[str, pd.Index] = {}
+    for col in CUBE_COLUMNS:
+        if col in df.columns:
+            keys[col], values[col] = _factorize(df[col])
+        else:
+            keys[col], values[col] = np.full(len(df), -1, dtype=np.int32), pd.Index([], name=col)
+    keys["score_bucket"] = score_buckets(score, step)
+
+    # uma célula por combinação presente de códigos (chave inteira única); linhas agrupadas por célula (CSR)
+    key = np.zeros(len(df), dtype=np.int64)
+    for codes in keys.values():
+        key = key * (int(codes.max(initial=-1)) + 2) + (codes + 1)
+    _, first, cell_of = np.unique(key, return_index=True, return_inverse=True)
+    n_cells = first.size
+    rows = np.argsort(cell_of, kind="stable").astype(np.int32)
+    counts = np.bincount(cell_of, minlength=n_cells)
+    indptr = np.zeros(n_cells + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    cells = pd.DataFrame({c: codes[first] for c, codes in keys.items()})
+    s = np.nan_to_num(score)
+    cells["count"] = counts.astype(np.int64)
+    cells["sum"] = np.bincount(cell_of, weights=s, minlength=n_cells)
+    cells["sumsq"] = np.bincount(cell_of, weights=s * s, minlength=n_cells)
+    facets = {col: _cell_facets(incidences[col], col, cell_of, n_cells)
+              for col in FACET_COLUMNS if incidences and col in incidences}
+    return CatalogCube(cells=cells, values=values, indptr=indptr, rows=rows, scores=score[rows],
+                       n_rows=len(df), step=step, facets=facets)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# netflix_core/figcache.py
+#
+# Cache de figuras Plotly já serializadas: chave = nome do gráfico + hash dos dados
+# agregados que entram nele (mesmo recorte em outro rerun/sessão = mesma chave), valor =
+# JSON compacto. Compactar não muda o desenho: floats arredondados a FLOAT_DIGITS casas,
+# template reduzido aos tipos de trace e subplots que a figura usa (o plotly_white
+# inteiro são ~7 KB por figura) e nada de hover/texto que repete os dados (isso fica nos
+# construtores de netflix_core/charts.py). LRU limitado por bytes e por entradas, com
+# contagem de acertos/faltas. No acerto, a figura é remontada sem revalidar (~2 ms).
+
+import base64
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+FLOAT_DIGITS = 4
+FIGCACHE_BYTES = 64 * 2**20
+FIGCACHE_ENTRIES = 512
+SUBPLOT_KEYS = ("geo", "polar", "ternary", "scene", "map", "mapbox")
+
+
+def figure_key(name: str, *values) -> str:
+    # hash do conteúdo (valores, índice, nomes e dtypes) de cada entrada do gráfico
+    h = hashlib.sha1(name.encode("utf-8"))
+    for v in values:
+        if isinstance(v, (pd.Series, pd.DataFrame)):
+            h.update(pd.util.hash_pandas_object(v, index=True).to_numpy().tobytes())
+            frame = v if isinstance(v, pd.DataFrame) else v.to_frame()
+            h.update(repr((list(frame.columns), list(v.index.names), list(frame.dtypes))).encode("utf-8"))
+        else:
+            h.update(repr(v).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _round(obj):
+    if isinstance(obj, float):
+        return round(obj, FLOAT_DIGITS)
+    if isinstance(obj, np.ndarray):
+        return np.round(obj, FLOAT_DIGITS) if obj.dtype.kind == "f" else obj
+    if isinstance(obj, dict):
+        if "bdata" in obj and np.dtype(obj.get("dtype", "f8")).kind == "f":
+            # plotly ≥ 6 já entrega arrays NumPy como base64 tipado: decodifica, arredonda, recodifica
+            values = np.round(np.frombuffer(base64.b64decode(obj["bdata"]), dtype=obj["dtype"]), FLOAT_DIGITS)
+            return {**obj, "bdata": base64.b64encode(values.tobytes()).decode("ascii")}
+        return {k: _round(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_round(v) for v in obj]
+    return obj
+
+
+def compact_json(fig: go.Figure) -> str:
+    spec = fig.to_plotly_json()
+    layout = spec.get("layout", {})
+    template = layout.get("template")
+    if isinstance(template, dict):
+        used = {trace.get("type", "scatter") for trace in spec.get("data", [])}
+        template = dict(template)
+        template["data"] = {t: v for t, v in template.get("data", {}).items() if t in used}
+        template["layout"] = {k: v for k, v in template.get("layout", {}).items()
+                              if k not in SUBPLOT_KEYS or k in layout}
+        layout["template"] = template
+    return pio.to_json(_round(spec), validate=False, pretty=False)
+
+
+def figure_from_json(payload: str) -> go.Figure:
+    # o JSON saiu de uma figura válida: remonta sem a validação do plotly (~10x mais rápido)
+    return go.Figure(json.loads(payload), _validate=False)
+
+
+class FigureCache:
+    # Compartilhado pelas sessões (threads do Streamlit): get/put sob lock
+    def __init__(self, max_bytes: int = FIGCACHE_BYTES, max_entries: int = FIGCACHE_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            payload = self._items.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: str, payload: str) -> None:
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._items[key] = payload
+            self.nbytes += size
+            while self.nbytes > self.max_bytes or len(self._items) > self.max_entries:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= len(evicted)
+                self.evictions += 1
+
+    def payload(self, name: str, build: Callable[..., go.Figure], *values) -> str:
+        key = figure_key(name, *values)
+        payload = self.get(key)
+        if payload is None:
+            payload = compact_json(build(*values))
+            self.put(key, payload)
+        return payload
+
+    def figure(self, name: str, build: Callable[..., go.Figure], *values) -> go.Figure:
+        return figure_from_json(self.payload(name, build, *values))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._items),
+            "bytes": self.nbytes,
+            "evictions": self.evictions,
+        }
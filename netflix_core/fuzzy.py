@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# netflix_core/fuzzy.py
+#
+# Match aproximado de títulos (rapidfuzz) para o join com ratings.csv.
+# Só os títulos sem match exato entram. Primeiro tenta a chave "dobrada" (sem acento
+# nem pontuação); o resto é comparado dentro de blocos (primeira palavra relevante)
+# com process.cdist em lote, usando várias threads. Quem não casar no bloco da primeira
+# palavra tenta o bloco da última (um erro de digitação só quebra um dos dois).
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # pragma: no cover - rapidfuzz está no requirements.txt
+    fuzz = None
+    process = None
+
+from .ratings import TitleKeyIndex
+
+DEFAULT_THRESHOLD = 90.0
+ARTICLES = r"^(?:the|a|an|o|os|as|um|uma|el|la|los|las|le|les|der|die|das) "
+MAPPING_COLUMNS = ["title_norm", "rating_key", "similarity"]
+
+
+def fold_titles(titles: pd.Series) -> pd.Series:
+    # "Amélie!" → "amelie": remove acentos e pontuação, colapsa espaços
+    s = titles.fillna("").astype(str).str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    return s.str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+
+
+def block_keys(folded: pd.Series, last: bool = False) -> pd.Series:
+    # primeira palavra relevante (sem artigo) ou última palavra do título
+    if last:
+        return folded.str.rsplit(" ", n=1).str[-1]
+    return folded.str.replace(ARTICLES, "", regex=True).str.split(" ", n=1).str[0]
+
+
+def _years_compatible(q_years: Optional[np.ndarray], c_years: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    if q_years is None or c_years is None:
+        return None
+    diff = np.abs(q_years[:, None] - c_years[None, :])
+    # ano ausente em qualquer lado não elimina o par
+    return np.isnan(diff) | (diff <= 1)
+
+
+def fuzzy_match(
+    queries: pd.Series,
+    index: TitleKeyIndex,
+    threshold: float = DEFAULT_THRESHOLD,
+    query_years: Optional[pd.Series] = None,
+    workers: int = -1,
+    chunk_size: int = 2048,
+) -> pd.DataFrame:
+    # Devolve (query_pos, choice_pos, similarity) para cada query com match >= threshold
+    empty = pd.DataFrame({"query_pos": np.empty(0, np.int64), "choice_pos": np.empty(0, np.int64),
+                          "similarity": np.empty(0, float)})
+    if process is None or queries.empty or len(index.keys) == 0:
+        return empty
+
+    q_fold = fold_titles(queries).to_numpy(dtype=object)
+    c_fold = fold_titles(pd.Series(index.titles)).to_numpy(dtype=object)
+    q_years = None if query_years is None else pd.to_numeric(query_years, errors="coerce").to_numpy(dtype=float)
+    c_years = index.years
+
+    # 1) igualdade após dobrar acentos/pontuação
+    c_fold_index = pd.Index(c_fold)
+    first = ~c_fold_index.duplicated(keep="first")
+    exact_keys = pd.Index(c_fold[first])
+    exact_pos = np.flatnonzero(first)
+    hit = exact_keys.get_indexer(q_fold)
+    q_pos = [np.flatnonzero(hit >= 0)]
+    c_pos = [exact_pos[hit[hit >= 0]]]
+    sims = [np.full(q_pos[0].size, 100.0)]
+
+    # 2) blocos pela primeira palavra relevante, depois pela última; cdist em lotes
+    rest = np.flatnonzero((hit < 0) & (q_fold != ""))
+    for last in (False, True):
+        if rest.size == 0:
+            break
+        q_blocks = pd.Series(block_keys(pd.Series(q_fold[rest]), last).to_numpy(), index=rest)
+        c_blocks = block_keys(pd.Series(c_fold), last)
+        c_groups = c_blocks.groupby(c_blocks, sort=False).indices
+        matched = []
+        for key, q_idx in q_blocks.groupby(q_blocks, sort=False).indices.items():
+            cands = c_groups.get(key)
+            if cands is None:
+                continue
+            q_idx = rest[q_idx]
+            choices = list(c_fold[cands])
+            for start in range(0, q_idx.size, chunk_size):
+                qi = q_idx[start:start + chunk_size]
+                scores = process.cdist(list(q_fold[qi]), choices, scorer=fuzz.ratio,
+                                       score_cutoff=threshold, dtype=np.float32, workers=workers)
+                ok = _years_compatible(None if q_years is None else q_years[qi],
+                                       None if c_years is None else c_years[cands])
+                if ok is not None:
+                    scores = np.where(ok, scores, 0)
+                best = scores.argmax(axis=1)
+                best_score = scores[np.arange(qi.size), best]
+                keep = best_score >= threshold
+                q_pos.append(qi[keep]); c_pos.append(cands[best[keep]]); sims.append(best_score[keep].astype(float))
+                matched.append(qi[keep])
+        if matched:
+            rest = np.setdiff1d(rest, np.concatenate(matched), assume_unique=True)
+
+    return pd.DataFrame({"query_pos": np.concatenate(q_pos), "choice_pos": np.concatenate(c_pos),
+                         "similarity": np.concatenate(sims)}) if q_pos else empty
+
+
+def build_fuzzy_mapping(df: pd.DataFrame, index: TitleKeyIndex, threshold: float = DEFAULT_THRESHOLD) -> pd.DataFrame:
+    # Tabela título do catálogo → chave em ratings, só para quem ficou sem score no join exato
+    missing = df[df["score"].isna()] if "score" in df.columns else df
+    titles = missing.drop_duplicates("title_norm")
+    years = titles["release_year"] if "release_year" in titles.columns else None
+    m = fuzzy_match(titles["title"], index, threshold, query_years=years)
+    return pd.DataFrame({
+        "title_norm": titles["title_norm"].to_numpy()[m["query_pos"].to_numpy()],
+        "rating_key": index.keys.to_numpy()[m["choice_pos"].to_numpy()],
+        "similarity": m["similarity"].to_numpy(),
+    }, columns=MAPPING_COLUMNS)
+
+
+def apply_fuzzy_mapping(df: pd.DataFrame, index: TitleKeyIndex, mapping: pd.DataFrame) -> pd.DataFrame:
+    if mapping.empty or "score" not in df.columns:
+        return df
+    key = df["title_norm"].map(pd.Series(mapping["rating_key"].to_numpy(), index=mapping["title_norm"].to_numpy()))
+    pos = index.lookup(key.fillna(""))
+    fill = df["score"].isna().to_numpy() & (pos >= 0)
+    df.loc[fill, "score"] = index.scores[pos[fill]]
+    return df
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# netflix_core/index.py
+#
+# Índice invertido (CSR) para colunas multivaloradas ("United States, India").
+# Construído uma vez no carregamento; os filtros da sidebar viram operações
+# vetorizadas sobre máscaras booleanas em vez de um split por linha a cada rerun.
+
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .bridges import build_bridge
+
+
+@dataclass(frozen=True)
+class TokenIndex:
+    labels: np.ndarray   # tokens únicos, ordenados
+    indptr: np.ndarray   # postings do token i em rows[indptr[i]:indptr[i+1]]
+    rows: np.ndarray     # ids posicionais das linhas (ordenados dentro de cada token)
+    n_rows: int
+
+    def codes_for(self, tokens: Iterable[str]) -> np.ndarray:
+        tokens = [t for t in tokens if t]
+        if not tokens or self.labels.size == 0:
+            return np.empty(0, dtype=np.int64)
+        pos = np.searchsorted(self.labels, tokens)
+        pos = np.clip(pos, 0, self.labels.size - 1)
+        return pos[self.labels[pos] == np.asarray(tokens, dtype=object)]
+
+    def rows_for(self, tokens: Iterable[str]) -> np.ndarray:
+        codes = self.codes_for(tokens)
+        if codes.size == 0:
+            return np.empty(0, dtype=self.rows.dtype)
+        return np.concatenate([self.rows[self.indptr[c]:self.indptr[c + 1]] for c in codes])
+
+    def mask_any(self, tokens: Iterable[str]) -> np.ndarray:
+        # OR dentro da faceta: linha entra se tiver qualquer um dos tokens
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.rows_for(tokens)] = True
+        return mask
+
+    def counts(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+
+def index_from_bridge(bridge: pd.DataFrame, n_rows: int) -> TokenIndex:
+    # A ponte já vem ordenada por title_id; basta reagrupar por código do token
+    tokens = bridge.iloc[:, 1]
+    labels = np.asarray(tokens.cat.categories, dtype=object)
+    codes = tokens.cat.codes.to_numpy()
+    order = np.argsort(codes, kind="stable")
+    indptr = np.zeros(labels.size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=labels.size), out=indptr[1:])
+    rows = bridge["title_id"].to_numpy()[order]
+    return TokenIndex(labels=labels, indptr=indptr, rows=rows, n_rows=n_rows)
+
+
+def build_token_index(series: pd.Series) -> TokenIndex:
+    return index_from_bridge(build_bridge(series, series.name or "token"), len(series))
+
+
+def filter_mask(
+    df: pd.DataFrame,
+    indexes: dict,
+    sel_countries: Sequence[str] = (),
+    sel_genres: Sequence[str] = (),
+    year_range: Optional[Tuple[int, int]] = None,
+    score_range: Optional[Tuple[float, float]] = None,
+) -> np.ndarray:
+    # AND entre facetas, OR dentro de cada faceta
+    mask = np.ones(len(df), dtype=bool)
+
+    if "release_year" in df.columns and isinstance(year_range, (list, tuple)) and len(year_range) == 2:
+        y = df["release_year"].to_numpy(dtype=float, na_value=np.nan)
+        mask &= (y >= year_range[0]) & (y <= year_range[1])
+
+    if sel_countries and "country" in indexes:
+        mask &= indexes["country"].mask_any(sel_countries)
+
+    if sel_genres and "listed_in" in indexes:
+        mask &= indexes["listed_in"].mask_any(sel_genres)
+
+    if "score" in df.columns and isinstance(score_range, (list, tuple)) and len(score_range) == 2:
+        s = df["score"].to_numpy(dtype=float, na_value=np.nan)
+        mask &= (s >= score_range[0]) & (s <= score_range[1])
+
+    return mask
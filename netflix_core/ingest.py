@@ -0,0 +1,501 @@
+# -*- coding: utf-8 -*-
+# netflix_core/ingest.py
+#
+# Ingestão em blocos (chunks) para catálogos maiores que a memória.
+# O CSV é lido em pedaços de CHUNK_ROWS linhas; cada pedaço é tipado, recebe o
+# score e alimenta, de forma incremental, as pontes (país/gênero/elenco/direção)
+# e a matriz de termos das descrições. As colunas de texto pesadas (description,
+# cast, director) não ficam no frame residente: vão, bloco a bloco, para um
+# arquivo Arrow lido sob demanda com memory-map (TextStore).
+# Núcleo e pontes também vão bloco a bloco para arquivos Arrow de rascunho; no fim,
+# são lidos via memory-map direto no formato compacto (categorias e strings Arrow,
+# sem um objeto Python por célula). O que ainda cresce com o arquivo é a matriz de
+# termos (pares linha × termo e vocabulário, com bigramas), que o app mantém residente
+# de qualquer forma; o resto da memória de trabalho é de um chunk por vez.
+#
+# Tudo é gravado em cache_dir; um manifesto (com a assinatura das fontes) é
+# escrito por último e marca a ingestão como completa. Cada ingestão grava uma
+# nova geração de arquivos ({prefix}_g{n}_*): a anterior continua legível até o
+# manifesto novo substituir o antigo, e só a penúltima geração é mantida.
+# Cada linha guarda um hash do conteúdo bruto do CSV (base do refresh incremental).
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow vem com o streamlit
+    pa = None
+    feather = None
+
+from .bridges import BRIDGE_COLUMNS, split_tokens
+from .cache import (
+    cache_data_path,
+    cached_content_id,
+    content_id,
+    drop_cache_entry,
+    file_sha256,
+    read_cached_frame,
+    read_feather,
+    read_stale_frame,
+    write_cached_frame,
+)
+from .catalog import (
+    ARROW_STRING,
+    CACHE_NAME,
+    CATEGORY_COLUMNS,
+    DICT_COLUMNS,
+    catalog_sources,
+    compact_catalog,
+    load_fuzzy_mapping,
+    prepare_catalog,
+)
+from .fuzzy import apply_fuzzy_mapping
+from .ratings import TitleKeyIndex, build_title_index, join_ratings, read_ratings
+from .terms import TermMatrix, TermMatrixBuilder
+
+CHUNK_ROWS = 50_000
+HEAVY_COLUMNS = ("description", "cast", "director")
+
+
+@dataclass(frozen=True)
+class TextStore:
+    # Colunas de texto longas num arquivo Arrow (um record batch por chunk), lidas via memory-map
+    path: str
+
+    def _reader(self) -> "pa.ipc.RecordBatchFileReader":
+        # sem cópia: os buffers apontam para o arquivo mapeado
+        return pa.ipc.open_file(pa.memory_map(self.path))
+
+    @property
+    def columns(self) -> List[str]:
+        return self._reader().schema.names
+
+    @property
+    def schema(self) -> "pa.Schema":
+        return self._reader().schema
+
+    def offsets(self) -> np.ndarray:
+        # linhas do record batch i em offsets[i]:offsets[i+1] (só metadados, nada é lido)
+        reader = self._reader()
+        sizes = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+        return np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)]).astype(np.int64)
+
+    @property
+    def num_rows(self) -> int:
+        return int(self.offsets()[-1])
+
+    def get_batch(self, i: int) -> "pa.RecordBatch":
+        return self._reader().get_batch(i)
+
+    def take_rows(self, rows: Sequence[int], columns: Optional[Sequence[str]] = None) -> "pa.Table":
+        # só os record batches que contêm as linhas pedidas são tocados; saída na ordem de rows
+        rows = np.asarray(rows, dtype=np.int64)
+        reader = self._reader()
+        offsets = self.offsets()
+        owner = np.searchsorted(offsets, rows, side="right") - 1
+        parts = []
+        for b in np.unique(owner):
+            batch = reader.get_batch(int(b))
+            if columns is not None:
+                batch = batch.select(list(columns))
+            parts.append(batch.take(pa.array(rows[owner == b] - offsets[b])))
+        schema = reader.schema if columns is None else pa.schema([reader.schema.field(c) for c in columns])
+        table = pa.Table.from_batches(parts, schema=schema)
+        order = np.argsort(owner, kind="stable")
+        if (np.diff(order) < 0).any():
+            # partes em ordem de batch: volta para a ordem pedida
+            inverse = np.empty_like(order)
+            inverse[order] = np.arange(order.size)
+            table = table.take(pa.array(inverse))
+        return table
+
+    def take(self, column: str, rows: Sequence[int]) -> pd.Series:
+        # só as linhas pedidas viram objetos Python
+        rows = np.asarray(rows, dtype=np.int64)
+        values = self.take_rows(rows, [column]).column(0).to_pandas()
+        return pd.Series(values.to_numpy(), index=rows, name=column)
+
+    def iter_chunks(self, column: str) -> Iterator[pd.Series]:
+        # um bloco por vez, na ordem das linhas do catálogo
+        reader = self._reader()
+        offset = 0
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            col = batch.column(batch.schema.get_field_index(column)).to_pandas()
+            yield pd.Series(col.to_numpy(), index=offset + np.arange(batch.num_rows), name=column)
+            offset += batch.num_rows
+
+    def iter_arrays(self, column: str) -> Iterator[Tuple[int, "pa.Array"]]:
+        # (primeira linha, bloco Arrow): para quem processa o texto com pyarrow.compute, sem objetos Python
+        reader = self._reader()
+        offset = 0
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            yield offset, batch.column(batch.schema.get_field_index(column))
+            offset += batch.num_rows
+
+
+@dataclass
+class IngestedCatalog:
+    core: pd.DataFrame                # colunas tipadas, sem o texto pesado
+    bridges: Dict[str, pd.DataFrame]  # title_id ↔ token (mesmo formato de build_bridges)
+    terms: Optional[TermMatrix]
+    text: Optional[TextStore]
+    row_hash: Optional[np.ndarray] = None  # hash do conteúdo bruto de cada linha do CSV (uint64)
+    generation: int = 0
+    content_id: str = ""                   # sha256 das fontes (muda com o conteúdo, não com o mtime)
+
+
+def _cache_prefix(fuzzy_threshold: Optional[float]) -> str:
+    return CACHE_NAME if not fuzzy_threshold else f"{CACHE_NAME}_fuzzy_t{fuzzy_threshold:g}"
+
+
+def _part_name(prefix: str, generation: int, part: str) -> str:
+    return f"{prefix}_g{generation}_{part}"
+
+
+def _write_part(df: pd.DataFrame, cache_dir: str, name: str) -> None:
+    path = cache_data_path(cache_dir, name)
+    feather.write_feather(df.reset_index(drop=True), path + ".tmp", compression="uncompressed")
+    os.replace(path + ".tmp", path)
+
+
+def _read_part(cache_dir: str, name: str) -> pd.DataFrame:
+    return read_feather(cache_data_path(cache_dir, name))
+
+
+def read_csv_chunks(path: str, chunk_rows: int, encoding: Optional[str]) -> Iterator[pd.DataFrame]:
+    # Tudo como texto: o hash da linha não depende da inferência de tipos de cada bloco
+    # (ex.: release_year 2019 vs 2019.0 num bloco com ano faltando); a tipagem vem depois
+    offset = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, encoding=encoding, dtype=str):
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+
+def row_hashes(chunk: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(chunk, index=False).to_numpy(dtype=np.uint64)
+
+
+def _arrow_table(df: pd.DataFrame) -> "pa.Table":
+    # texto (object/categoria) sempre como string: o esquema não depende do conteúdo de cada bloco
+    arrays = {}
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype) or s.dtype == object:
+            arrays[col] = pa.array(s.astype(object).where(s.notna(), None).to_numpy(), type=pa.string())
+        elif col == "release_year":
+            arrays[col] = pa.array(s.to_numpy(dtype=float))  # int num bloco, float no bloco com ano faltando
+        else:
+            arrays[col] = pa.array(s.to_numpy())
+    return pa.table(arrays)
+
+
+def _categorical(values: "pa.ChunkedArray") -> pd.Categorical:
+    # string Arrow → Categorical com categorias ordenadas (como astype("category")), sem objetos por linha
+    cat = values.dictionary_encode().to_pandas().array
+    return cat.reorder_categories(cat.categories.sort_values())
+
+
+class _SpillFile:
+    # Arquivo Arrow de rascunho: uma tabela por chunk; lido no fim via memory-map e apagado
+    def __init__(self, path: str):
+        self.path = path
+        self.writer = None
+        self.schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        table = _arrow_table(df)
+        if self.writer is None:
+            self.schema = table.schema
+            self.writer = pa.ipc.new_file(self.path, self.schema)
+        self.writer.write_table(table.cast(self.schema))
+
+    def read(self) -> Optional["pa.Table"]:
+        if self.writer is None:
+            return None
+        self.writer.close()
+        self.writer = None
+        return pa.ipc.open_file(pa.memory_map(self.path)).read_all()
+
+    def discard(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class _ChunkSink:
+    # Recebe blocos brutos na ordem final das linhas: núcleo, partes das pontes, termos e texto pesado.
+    # Núcleo e pontes vão para arquivos de rascunho ao lado do texto; só os pares de termos ficam em memória
+    def __init__(self, index: Optional[TitleKeyIndex], text_path: str, heavy_columns: Iterable[str],
+                 bridge_columns: Iterable[str], join: bool = True):
+        self.index, self.text_path, self.join = index, text_path, join
+        self.heavy_columns, self.bridge_columns = list(heavy_columns), list(bridge_columns)
+        self.writer = None
+        self.core_spill = _SpillFile(text_path + ".core")
+        self.bridge_spills: Dict[str, _SpillFile] = {}
+        self.terms = TermMatrixBuilder()
+        self.has_text = False
+        self.n_rows = 0
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        offset = self.n_rows
+        chunk = prepare_catalog(chunk)
+        if self.join:
+            chunk = join_ratings(chunk, self.index)
+        for col in self.bridge_columns:
+            if col in chunk.columns:
+                ids, tokens = split_tokens(chunk[col])
+                spill = self.bridge_spills.setdefault(col, _SpillFile(f"{self.text_path}.bridge_{col}"))
+                spill.write(pd.DataFrame({"title_id": (ids + offset).astype(np.int64), col: tokens.to_numpy()}))
+        if "description" in chunk.columns:
+            self.has_text = True
+            self.terms.add(chunk["description"])
+
+        heavy = [c for c in self.heavy_columns if c in chunk.columns]
+        if heavy:
+            batch = pa.RecordBatch.from_pandas(chunk[heavy].reset_index(drop=True),
+                                               schema=pa.schema([(c, pa.string()) for c in heavy]),
+                                               preserve_index=False)
+            if self.writer is None:
+                self.writer = pa.ipc.new_file(self.text_path + ".tmp", batch.schema)
+            self.writer.write_batch(batch)
+        self.core_spill.write(chunk.drop(columns=heavy))
+        self.n_rows += len(chunk)
+
+    def close(self) -> Optional[TextStore]:
+        if self.writer is None:
+            return None
+        self.writer.close()
+        os.replace(self.text_path + ".tmp", self.text_path)
+        return TextStore(self.text_path)
+
+    def abort(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        for spill in [self.core_spill, *self.bridge_spills.values()]:
+            spill.discard()
+
+    def core(self) -> pd.DataFrame:
+        # colunas de categoria/dicionário já como Categorical e as de texto como strings Arrow;
+        # compact_catalog completa o resto (inteiros reduzidos)
+        table = self.core_spill.read()
+        if table is None:
+            return pd.DataFrame()
+        cols = {}
+        for name, values in zip(table.column_names, table.columns):
+            if name in CATEGORY_COLUMNS or name in DICT_COLUMNS:
+                cols[name] = _categorical(values)
+            elif pa.types.is_string(values.type) and ARROW_STRING:
+                cols[name] = pd.array(values, dtype=ARROW_STRING)
+            else:
+                cols[name] = values.to_pandas()
+        del table
+        self.core_spill.discard()
+        return pd.DataFrame(cols)
+
+    def bridges(self) -> Dict[str, pd.DataFrame]:
+        out = {}
+        for col, spill in self.bridge_spills.items():
+            out[col] = _finish_bridge(col, spill.read())
+            spill.discard()
+        return out
+
+    def term_matrix(self) -> Optional[TermMatrix]:
+        return self.terms.finish() if self.has_text else None
+
+
+def _finish_bridge(col: str, table: Optional["pa.Table"]) -> pd.DataFrame:
+    if table is None:
+        return pd.DataFrame({"title_id": np.empty(0, dtype=np.int32), col: pd.Categorical([])})
+    ids = table.column("title_id").to_numpy()
+    id_dtype = np.int32 if ids.size == 0 or ids.max() < 2**31 else np.int64
+    return pd.DataFrame({"title_id": ids.astype(id_dtype), col: _categorical(table.column(col))})
+
+
+def finish_core(core: pd.DataFrame, index: Optional[TitleKeyIndex], fuzzy_threshold: Optional[float],
+                sources: List[str], cache_dir: str) -> pd.DataFrame:
+    if fuzzy_threshold and index is not None:
+        core = apply_fuzzy_mapping(core, index, load_fuzzy_mapping(core, index, fuzzy_threshold, sources, cache_dir))
+    return compact_catalog(core)
+
+
+def next_generation(cache_dir: str, fuzzy_threshold: Optional[float]) -> int:
+    manifest = read_stale_frame(cache_dir, f"{_cache_prefix(fuzzy_threshold)}_ingest")
+    return 1 if manifest is None else int(manifest["generation"].max()) + 1
+
+
+def text_path_for(cache_dir: str, fuzzy_threshold: Optional[float], generation: int) -> str:
+    return cache_data_path(cache_dir, _part_name(_cache_prefix(fuzzy_threshold), generation, "text"))
+
+
+def write_snapshot(catalog: IngestedCatalog, cache_dir: str, fuzzy_threshold: Optional[float],
+                   sources: List[str]) -> None:
+    # Partes da geração nova e, por último, o manifesto que aponta para elas (troca atômica em disco).
+    # Preenche catalog.content_id com os sha256 que o metadado acabou de gravar
+    prefix, gen = _cache_prefix(fuzzy_threshold), catalog.generation
+    parts = {"core": catalog.core}
+    for col, bridge in catalog.bridges.items():
+        parts[f"bridge_{col}"] = bridge
+    if catalog.terms is not None:
+        vocab = {"term": catalog.terms.vocab}
+        if catalog.terms.left is not None:
+            vocab.update(left=catalog.terms.left, right=catalog.terms.right)
+        parts["terms_vocab"] = pd.DataFrame(vocab)
+        parts["terms"] = pd.DataFrame({"row": catalog.terms.row_ids, "term": catalog.terms.term_ids,
+                                       "count": catalog.terms.counts})
+    if catalog.row_hash is not None:
+        parts["row_hash"] = pd.DataFrame({"row_hash": catalog.row_hash})
+    for part, frame in parts.items():
+        _write_part(frame, cache_dir, _part_name(prefix, gen, part))
+    names = list(parts) + ["text"]
+    manifest = pd.DataFrame({
+        "part": names,
+        "present": [True] * len(parts) + [catalog.text is not None],
+        "rows": [len(catalog.core)] * len(names),
+        "generation": [gen] * len(names),
+    })
+    # sem metadado entre a troca do manifesto e a do .json: ninguém lê manifesto novo com assinatura velha
+    drop_cache_entry(cache_dir, f"{prefix}_ingest")
+    write_cached_frame(manifest, cache_dir, f"{prefix}_ingest", sources)
+    drop_generations(cache_dir, prefix, keep_from=gen - 1)
+    catalog.content_id = cached_content_id(cache_dir, f"{prefix}_ingest") or \
+        content_id(f"{prefix}_ingest", [file_sha256(p) for p in sources])
+
+
+def drop_generations(cache_dir: str, prefix: str, keep_from: int) -> None:
+    # Gerações anteriores à penúltima: quem ainda serve a anterior (troca em andamento) continua lendo
+    pattern = re.compile(rf"^{re.escape(prefix)}_g(\d+)_")
+    for name in os.listdir(cache_dir):
+        m = pattern.match(name)
+        if m and int(m.group(1)) < keep_from:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def _ingest(
+    netflix_path: str,
+    ratings_path: str,
+    cache_dir: str,
+    chunk_rows: int,
+    fuzzy_threshold: Optional[float],
+    encoding: Optional[str],
+    heavy_columns: Iterable[str],
+    bridge_columns: Iterable[str],
+) -> IngestedCatalog:
+    os.makedirs(cache_dir, exist_ok=True)
+    generation = next_generation(cache_dir, fuzzy_threshold)
+
+    ratings_df, ratings_col = read_ratings(ratings_path)
+    index = build_title_index(ratings_df, ratings_col)
+    del ratings_df
+
+    sink = _ChunkSink(index, text_path_for(cache_dir, fuzzy_threshold, generation), heavy_columns, bridge_columns)
+    hashes: List[np.ndarray] = []
+    try:
+        for chunk in read_csv_chunks(netflix_path, chunk_rows, encoding):
+            hashes.append(row_hashes(chunk))
+            sink.add(chunk)
+    except BaseException:
+        sink.abort()
+        raise
+    text = sink.close()
+
+    sources = catalog_sources(netflix_path, ratings_path)
+    catalog = IngestedCatalog(
+        core=finish_core(sink.core(), index, fuzzy_threshold, sources, cache_dir),
+        bridges=sink.bridges(),
+        terms=sink.term_matrix(),
+        text=text,
+        row_hash=np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64),
+        generation=generation,
+    )
+    write_snapshot(catalog, cache_dir, fuzzy_threshold, sources)
+    return catalog
+
+
+def ingest_catalog(
+    netflix_path: str,
+    ratings_path: str,
+    cache_dir: str,
+    chunk_rows: int = CHUNK_ROWS,
+    fuzzy_threshold: Optional[float] = None,
+    heavy_columns: Iterable[str] = HEAVY_COLUMNS,
+    bridge_columns: Iterable[str] = BRIDGE_COLUMNS,
+) -> IngestedCatalog:
+    # UTF-8 primeiro; arquivo em latin-1 só é descoberto no meio da leitura, então recomeça
+    try:
+        return _ingest(netflix_path, ratings_path, cache_dir, chunk_rows, fuzzy_threshold, None,
+                       heavy_columns, bridge_columns)
+    except UnicodeDecodeError:
+        return _ingest(netflix_path, ratings_path, cache_dir, chunk_rows, fuzzy_threshold, "latin-1",
+                       heavy_columns, bridge_columns)
+
+
+def read_ingested(
+    netflix_path: str,
+    ratings_path: str,
+    cache_dir: str,
+    fuzzy_threshold: Optional[float] = None,
+    validate: bool = True,
+) -> Optional[IngestedCatalog]:
+    # validate=False devolve a última ingestão gravada mesmo com as fontes alteradas (refresh incremental)
+    prefix = _cache_prefix(fuzzy_threshold)
+    if validate:
+        manifest = read_cached_frame(cache_dir, f"{prefix}_ingest", catalog_sources(netflix_path, ratings_path))
+    else:
+        manifest = read_stale_frame(cache_dir, f"{prefix}_ingest")
+    if manifest is None:
+        return None
+    present = dict(zip(manifest["part"], manifest["present"]))
+    gen = int(manifest["generation"].max())
+    name = lambda part: _part_name(prefix, gen, part)  # noqa: E731
+    try:
+        core = _read_part(cache_dir, name("core"))
+        bridges = {p[len("bridge_"):]: _read_part(cache_dir, name(p)) for p in present if p.startswith("bridge_")}
+        terms = None
+        if present.get("terms"):
+            vocab = _read_part(cache_dir, name("terms_vocab"))
+            pairs = _read_part(cache_dir, name("terms"))
+            bigrams = "left" in vocab.columns
+            terms = TermMatrix(vocab=vocab["term"].to_numpy(dtype=object), row_ids=pairs["row"].to_numpy(),
+                               term_ids=pairs["term"].to_numpy(), counts=pairs["count"].to_numpy(), n_rows=len(core),
+                               left=vocab["left"].to_numpy() if bigrams else None,
+                               right=vocab["right"].to_numpy() if bigrams else None)
+        row_hash = _read_part(cache_dir, name("row_hash"))["row_hash"].to_numpy() if present.get("row_hash") else None
+    except (OSError, pa.ArrowInvalid):
+        return None
+    text_path = cache_data_path(cache_dir, name("text"))
+    text = TextStore(text_path) if present.get("text") and os.path.exists(text_path) else None
+    return IngestedCatalog(core=core, bridges=bridges, terms=terms, text=text, row_hash=row_hash, generation=gen,
+                           content_id=cached_content_id(cache_dir, f"{prefix}_ingest") or "")
+
+
+def load_ingested(
+    netflix_path: str,
+    ratings_path: str,
+    cache_dir: str,
+    fuzzy_threshold: Optional[float] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> IngestedCatalog:
+    # Reaproveita a ingestão em disco se as fontes não mudaram; senão reprocessa em chunks
+    cached = read_ingested(netflix_path, ratings_path, cache_dir, fuzzy_threshold)
+    if cached is not None:
+        return cached
+    return ingest_catalog(netflix_path, ratings_path, cache_dir, chunk_rows, fuzzy_threshold)
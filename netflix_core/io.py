@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# netflix_core/io.py
+
+import pandas as pd
+
+
+def read_csv(path: str, **kwargs) -> pd.DataFrame:
+    try:
+        return pd.read_csv(path, **kwargs)
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding="latin-1", **kwargs)
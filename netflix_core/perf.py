@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# netflix_core/perf.py
+#
+# Tempo por etapa (carga, merge, filtro, agregação, figura, render) de cada rerun.
+# PerfRecorder guarda as últimas N medições num ring buffer e exporta JSON/CSV.
+# Desligado, stage() devolve um contexto nulo compartilhado e timed() chama a
+# função direto: o custo fica em um if por chamada.
+# Funções memoizadas (st.cache_data) são medidas por quem chama, com cached(): o corpo
+# só roda na falta, então chama mark_cache_miss() e a etapa sai marcada "miss"/"hit".
+
+import functools
+import io
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterator, List, Optional
+
+import pandas as pd
+
+PERF_COLUMNS = ["run", "stage", "ms", "rows", "ts", "cache"]
+
+# falta de cache na thread atual: o corpo memoizado roda na thread de quem o chamou
+_CACHE_MISS = threading.local()
+
+
+def mark_cache_miss() -> None:
+    _CACHE_MISS.missed = True
+
+
+@dataclass
+class StageTiming:
+    run: int
+    stage: str              # etapas aninhadas viram caminho: "secao:heatmap/render"
+    ms: float = 0.0
+    rows: Optional[int] = None
+    ts: float = 0.0         # epoch do início da etapa
+    cache: Optional[str] = None  # "hit"/"miss" nas chamadas de funções memoizadas
+
+    def set_rows(self, rows) -> None:
+        self.rows = None if rows is None else int(rows)
+
+
+class _NullStage:
+    def set_rows(self, rows) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class PerfRecorder:
+    def __init__(self, maxlen: int = 500, enabled: bool = True):
+        self.enabled = enabled
+        self.run = 0
+        self.records: deque = deque(maxlen=maxlen)
+        self._stack: List[str] = []
+
+    def new_run(self) -> int:
+        self.run += 1
+        self._stack.clear()
+        return self.run
+
+    def stage(self, name: str, rows=None):
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._stage(name, rows)
+
+    @contextmanager
+    def _stage(self, name: str, rows=None) -> Iterator[StageTiming]:
+        path = "/".join(self._stack + [name])
+        rec = StageTiming(run=self.run, stage=path, ts=time.time())
+        rec.set_rows(rows)
+        self._stack.append(name)
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec.ms = (time.perf_counter() - t0) * 1e3
+            self._stack.pop()
+            self.records.append(rec)
+
+    def timed(self, name: Optional[str] = None, rows: Optional[Callable] = None):
+        # decorator; rows(resultado) → nº de linhas (ex.: len)
+        def deco(fn):
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            def run(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self._stage(label) as rec:
+                    out = fn(*args, **kwargs)
+                    if rows is not None:
+                        rec.set_rows(rows(out))
+                return out
+            return run
+        return deco
+
+    def cached(self, name: str, fn: Callable, *args, rows: Optional[Callable] = None, **kwargs):
+        # tempo visto pela sessão que chama (acerto ou falta), não só por quem calculou
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        outer = getattr(_CACHE_MISS, "missed", False)
+        _CACHE_MISS.missed = False
+        try:
+            with self._stage(name) as rec:
+                out = fn(*args, **kwargs)
+                rec.cache = "miss" if _CACHE_MISS.missed else "hit"
+                if rows is not None:
+                    rec.set_rows(rows(out))
+        finally:
+            _CACHE_MISS.missed = outer
+        return out
+
+    def clear(self) -> None:
+        self.records.clear()
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([asdict(r) for r in self.records], columns=PERF_COLUMNS)
+
+    def last_run(self) -> pd.DataFrame:
+        d = self.to_frame()
+        return d[d["run"] == d["run"].max()] if not d.empty else d
+
+    def summary(self) -> pd.DataFrame:
+        # por etapa (acertos e faltas de cache separados): chamadas, média, p95 e máximo (ms)
+        d = self.to_frame()
+        if d.empty:
+            return pd.DataFrame(columns=["stage", "cache", "n", "mean_ms", "p95_ms", "max_ms"])
+        g = d.assign(cache=d["cache"].fillna("")).groupby(["stage", "cache"], sort=False)["ms"]
+        return pd.DataFrame({
+            "n": g.size(), "mean_ms": g.mean(), "p95_ms": g.quantile(0.95), "max_ms": g.max(),
+        }).round(2).reset_index().sort_values("mean_ms", ascending=False, kind="stable")
+
+    def to_json(self) -> str:
+        return json.dumps([asdict(r) for r in self.records], ensure_ascii=False)
+
+    def to_csv(self) -> str:
+        buf = io.StringIO()
+        self.to_frame().to_csv(buf, index=False)
+        return buf.getvalue()
+
+    def dump(self, path: str) -> None:
+        # formato pela extensão (.json ou .csv)
+        data = self.to_json() if path.endswith(".json") else self.to_csv()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data)
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+# netflix_core/presets.py
+#
+# Presets de filtros com nome, num SQLite local. Cada preset guarda o recorte
+# (países, gêneros, anos, score e busca) e um snapshot do resultado: agregados,
+# figuras em JSON compacto e o PNG da nuvem (um WarmView de netflix_core/warmup.py).
+# O snapshot é um documento JSON: figuras como já estão, PNG em base64 e as tabelas
+# dos agregados em Arrow IPC (base64), que preserva dtypes e índices; nada de pickle,
+# que quebra entre versões de pandas/numpy. O snapshot vale para o conteúdo das fontes
+# (CatalogStore.content_id, os sha256 da ingestão: tocar um CSV sem mudá-lo não o
+# invalida); quando o catálogo muda, refresh_async() refaz os desatualizados numa
+# thread e, até lá, abrir o preset cai no cálculo normal. Abrir um preset pronto não
+# calcula nada.
+
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow vem com o streamlit
+    pa = None
+
+from .aggregations import DashboardAggregates, FilterState
+from .store import CatalogStore
+from .warmup import WarmView, warm_view
+
+# Incrementar quando WarmView/DashboardAggregates mudarem de formato (snapshots antigos são refeitos)
+PRESET_VERSION = 2
+# Recortes sem snapshot lembrados em memória (reruns não voltam ao SQLite); passou disso, recomeça
+MAX_MISSES = 4096
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS presets (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    name TEXT PRIMARY KEY REFERENCES presets(name) ON DELETE CASCADE,
+    signature TEXT NOT NULL,
+    state_key TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    built_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_lookup ON snapshots (signature, state_key);
+"""
+
+
+def signature_id(signature: Hashable) -> str:
+    # assinatura das fontes (CatalogStore.content_id no app) como texto estável
+    return hashlib.sha1(repr(signature).encode("utf-8")).hexdigest()
+
+
+def _table_bytes(obj: Union[pd.Series, pd.DataFrame]) -> bytes:
+    frame = obj.to_frame("__series__") if isinstance(obj, pd.Series) else obj
+    table = pa.Table.from_pandas(frame)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _table_from(data: bytes, series_name: Optional[str] = None, series: bool = False):
+    table = pa.ipc.open_stream(data).read_all()
+    frame = table.to_pandas()
+    # os metadados pandas gravam só "string": volta ao string[pyarrow] do catálogo
+    for col in frame.columns:
+        if table.schema.field(str(col)).type in (pa.string(), pa.large_string()):
+            frame[col] = frame[col].astype(pd.StringDtype("pyarrow"))
+    if frame.columns.empty:
+        frame.columns = pd.RangeIndex(0)  # tabela vazia dos agregados (pd.DataFrame())
+    return frame["__series__"].rename(series_name) if series else frame
+
+
+def encode_view(view: WarmView) -> str:
+    # WarmView → JSON (escalares como estão; Series/DataFrames dos agregados em Arrow IPC)
+    scalars, tables = {}, {}
+    for f in fields(view.aggregates):
+        value = getattr(view.aggregates, f.name)
+        if isinstance(value, (pd.Series, pd.DataFrame)):
+            tables[f.name] = {"series": isinstance(value, pd.Series), "name": getattr(value, "name", None),
+                              "arrow": base64.b64encode(_table_bytes(value)).decode("ascii")}
+        else:
+            scalars[f.name] = value.item() if isinstance(value, np.generic) else value
+    return json.dumps({
+        "state_key": view.state_key,
+        "aggregates": {"scalars": scalars, "tables": tables},
+        "figures": view.figures,
+        "wordcloud": None if view.wordcloud is None else base64.b64encode(view.wordcloud).decode("ascii"),
+        "mode": view.mode,
+        "timings": view.timings,
+    }, ensure_ascii=False)
+
+
+def decode_view(text: str) -> WarmView:
+    raw = json.loads(text)
+    agg = raw["aggregates"]
+    tables = {name: _table_from(base64.b64decode(t["arrow"]), t["name"], t["series"])
+              for name, t in agg["tables"].items()}
+    return WarmView(
+        state_key=raw["state_key"],
+        aggregates=DashboardAggregates(**agg["scalars"], **tables),
+        figures=raw["figures"],
+        wordcloud=None if raw["wordcloud"] is None else base64.b64decode(raw["wordcloud"]),
+        mode=raw["mode"],
+        timings=raw["timings"],
+    )
+
+
+@dataclass(frozen=True)
+class Preset:
+    name: str
+    state: FilterState
+    created_at: float = 0.0
+
+    @staticmethod
+    def encode(state: FilterState) -> str:
+        return json.dumps(asdict(state), ensure_ascii=False)
+
+    @staticmethod
+    def decode(text: str) -> FilterState:
+        raw = json.loads(text)
+        return FilterState(
+            countries=tuple(raw.get("countries") or ()),
+            genres=tuple(raw.get("genres") or ()),
+            year_range=tuple(raw["year_range"]) if raw.get("year_range") else None,
+            score_range=tuple(raw["score_range"]) if raw.get("score_range") else None,
+            query=raw.get("query") or "",
+            prefix=bool(raw.get("prefix")),
+        )
+
+
+class PresetStore:
+    # Uma conexão por operação (sessões do Streamlit rodam em threads); snapshots já
+    # lidos ficam em memória por (assinatura, recorte), o mesmo objeto a cada rerun, e
+    # os recortes sem snapshot também (só um snapshot novo tira o recorte de _misses)
+    def __init__(self, path: str):
+        self.path = path
+        self._views: Dict[Tuple[str, str], WarmView] = {}
+        self._misses: set = set()
+        self._checked: set = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as con, con:
+            con.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA foreign_keys = ON")
+        return con
+
+    def list(self) -> List[Preset]:
+        with closing(self._connect()) as con:
+            rows = con.execute("SELECT name, state, created_at FROM presets ORDER BY name").fetchall()
+        return [Preset(name, Preset.decode(state), created_at) for name, state, created_at in rows]
+
+    def get(self, name: str) -> Optional[Preset]:
+        with closing(self._connect()) as con:
+            row = con.execute("SELECT name, state, created_at FROM presets WHERE name = ?", (name,)).fetchone()
+        return None if row is None else Preset(row[0], Preset.decode(row[1]), row[2])
+
+    def save(self, name: str, state: FilterState) -> Preset:
+        # sobrescreve o preset de mesmo nome; o snapshot antigo sai junto
+        name = name.strip()
+        if not name:
+            raise ValueError("preset sem nome")
+        preset = Preset(name, state, time.time())
+        with closing(self._connect()) as con, con:
+            con.execute("DELETE FROM snapshots WHERE name = ?", (name,))
+            con.execute("INSERT OR REPLACE INTO presets (name, state, created_at) VALUES (?, ?, ?)",
+                        (name, Preset.encode(state), preset.created_at))
+        return preset
+
+    def delete(self, name: str) -> None:
+        with closing(self._connect()) as con, con:
+            con.execute("DELETE FROM snapshots WHERE name = ?", (name,))
+            con.execute("DELETE FROM presets WHERE name = ?", (name,))
+
+    def build_snapshot(self, name: str, store: CatalogStore, signature: Hashable) -> Optional[WarmView]:
+        preset = self.get(name)
+        if preset is None:
+            return None
+        view = warm_view(store, preset.state, mode="serial")
+        sig = signature_id(signature)
+        with closing(self._connect()) as con, con:
+            # o preset pode ter sido excluído/alterado enquanto o snapshot era montado
+            if con.execute("SELECT state FROM presets WHERE name = ?", (name,)).fetchone() != (Preset.encode(preset.state),):
+                return None
+            con.execute("INSERT OR REPLACE INTO snapshots (name, signature, state_key, version, payload, built_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (name, sig, view.state_key, PRESET_VERSION, encode_view(view), time.time()))
+        with self._lock:
+            self._views[(sig, view.state_key)] = view
+            self._misses.discard((sig, view.state_key))
+        return view
+
+    def stale(self, signature: Hashable) -> List[str]:
+        # presets sem snapshot válido para esta assinatura
+        with closing(self._connect()) as con:
+            rows = con.execute(
+                "SELECT p.name FROM presets p LEFT JOIN snapshots s ON s.name = p.name "
+                "AND s.signature = ? AND s.version = ? WHERE s.name IS NULL ORDER BY p.name",
+                (signature_id(signature), PRESET_VERSION),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def view(self, state_key: str, signature: Hashable) -> Optional[WarmView]:
+        # snapshot pronto para este recorte e estas fontes (de qualquer preset com o mesmo recorte)
+        key = (signature_id(signature), state_key)
+        with self._lock:
+            if key in self._views:
+                return self._views[key]
+            if key in self._misses:
+                return None
+        with closing(self._connect()) as con:
+            row = con.execute("SELECT payload FROM snapshots WHERE signature = ? AND state_key = ? AND version = ? "
+                              "LIMIT 1", (key[0], state_key, PRESET_VERSION)).fetchone()
+        view = None
+        if row is not None:
+            try:
+                view = decode_view(row[0])
+            except (ValueError, KeyError, TypeError, pa.ArrowException):
+                view = None
+        with self._lock:
+            if view is not None or key in self._views:
+                view = self._views.setdefault(key, view)
+            else:
+                if len(self._misses) >= MAX_MISSES:
+                    self._misses.clear()
+                self._misses.add(key)
+        return view
+
+    def ensure_fresh(self, store: CatalogStore, signature: Hashable) -> None:
+        # uma vez por assinatura servida: snapshots desatualizados são refeitos em segundo plano
+        sig = signature_id(signature)
+        with self._lock:
+            if sig in self._checked:
+                return
+            self._checked.add(sig)
+        if self.stale(signature):
+            self.refresh_async(store, signature)
+
+    def refresh(self, store: CatalogStore, signature: Hashable, names: Optional[List[str]] = None) -> int:
+        # refaz os snapshots desatualizados (ou só os de `names`); devolve quantos foram montados
+        built = 0
+        for name in (self.stale(signature) if names is None else names):
+            if self.build_snapshot(name, store, signature) is not None:
+                built += 1
+        with self._lock:
+            sig = signature_id(signature)
+            self._views = {k: v for k, v in self._views.items() if k[0] == sig}
+            self._misses = {k for k in self._misses if k[0] == sig}
+        return built
+
+    def refresh_async(self, store: CatalogStore, signature: Hashable, names: Optional[List[str]] = None) -> None:
+        # uma thread por vez; pedidos durante uma atualização esperam a anterior terminar
+        with self._lock:
+            previous = self._thread
+            self._thread = threading.Thread(target=self._run, args=(previous, store, signature, names), daemon=True,
+                                            name="preset-refresh")
+            self._thread.start()
+
+    def _run(self, previous: Optional[threading.Thread], store: CatalogStore, signature: Hashable,
+             names: Optional[List[str]]) -> None:
+        if previous is not None:
+            previous.join()
+        try:
+            self.refresh(store, signature, names)
+            self.error = None
+        except Exception as e:
+            self.error = e
+
+    @property
+    def refreshing(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        # espera a atualização em andamento (testes/CLI)
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# netflix_core/ranking.py
+#
+# Rankings por score sem ordenar o recorte a cada rerun. No carregamento: a ordem global
+# dos títulos com score (maior primeiro; empate = posição no catálogo, como o argsort
+# estável de top_by_score) e, por país/gênero, os postings do token já nessa ordem (CSR,
+# mesmos tokens exatos das pontes: "Niger" não casa com "Nigeria"). O top N de um recorte
+# percorre a lista mais curta que o contém, em blocos crescentes, contra a máscara, e para
+# ao achar N linhas. Com vários tokens selecionados (OU na faceta), junta os N primeiros de
+# cada token e reordena pelo rank.
+
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .index import TokenIndex
+
+WALK_CHUNK = 256
+RANKING_COLUMNS = ("country", "listed_in")
+
+
+@dataclass(frozen=True)
+class ScoreRanking:
+    order: np.ndarray    # posições com score, do maior para o menor
+    rank: np.ndarray     # rank de cada linha (len(order) = sem score)
+    facets: Dict[str, TokenIndex] = field(default_factory=dict)  # postings de cada token em ordem de rank
+
+    def _walk(self, candidates: np.ndarray, mask: np.ndarray, n: int) -> np.ndarray:
+        # primeiras n linhas da máscara na ordem dos candidatos; blocos dobram a cada passo
+        hits, found, start, chunk = [], 0, 0, WALK_CHUNK
+        while start < candidates.size and found < n:
+            block = candidates[start:start + chunk]
+            hit = block[mask[block]]
+            hits.append(hit)
+            found += hit.size
+            start += chunk
+            chunk *= 2
+        return np.concatenate(hits)[:n] if hits else np.empty(0, dtype=self.order.dtype)
+
+    def top(self, mask: np.ndarray, n: int = 10, selections: Optional[Mapping[str, Sequence[str]]] = None) -> np.ndarray:
+        # posições do top n por score no recorte; selections: tokens escolhidos por faceta
+        # (a máscara já os contém; só indicam a lista mais curta a percorrer)
+        best = None
+        for col, tokens in (selections or {}).items():
+            ix = self.facets.get(col)
+            if not tokens or ix is None:
+                continue
+            codes = ix.codes_for(tokens)
+            size = int((ix.indptr[codes + 1] - ix.indptr[codes]).sum())
+            if best is None or size < best[0]:
+                best = (size, ix, codes)
+        if best is None:
+            return self._walk(self.order, mask, n)
+        _, ix, codes = best
+        if codes.size == 1:
+            c = codes[0]
+            return self._walk(ix.rows[ix.indptr[c]:ix.indptr[c + 1]], mask, n)
+        rows = np.unique(np.concatenate([self._walk(ix.rows[ix.indptr[c]:ix.indptr[c + 1]], mask, n)
+                                         for c in codes] or [np.empty(0, dtype=self.order.dtype)]))
+        return rows[np.argsort(self.rank[rows], kind="stable")[:n]]
+
+
+def _ranked_postings(ix: TokenIndex, rank: np.ndarray, n_scored: int) -> TokenIndex:
+    # mesmos tokens, só linhas com score, cada token em ordem de rank
+    codes = np.repeat(np.arange(ix.labels.size), ix.counts())
+    r = rank[ix.rows]
+    keep = r < n_scored
+    codes, r = codes[keep], r[keep]
+    order = np.lexsort((r, codes))
+    indptr = np.zeros(ix.labels.size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=ix.labels.size), out=indptr[1:])
+    return TokenIndex(labels=ix.labels, indptr=indptr, rows=ix.rows[keep][order], n_rows=ix.n_rows)
+
+
+def build_ranking(df: pd.DataFrame, indexes: Dict[str, TokenIndex]) -> Optional[ScoreRanking]:
+    if "score" not in df.columns:
+        return None
+    score = df["score"].to_numpy(dtype=float, na_value=np.nan)
+    ok = np.flatnonzero(~np.isnan(score))
+    order = ok[np.argsort(-score[ok], kind="stable")]
+    rank = np.full(len(df), order.size, dtype=np.int64)
+    rank[order] = np.arange(order.size)
+    facets = {c: _ranked_postings(indexes[c], rank, order.size) for c in RANKING_COLUMNS if c in indexes}
+    return ScoreRanking(order=order, rank=rank, facets=facets)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# netflix_core/ratings.py
+#
+# Join catálogo × avaliações por título normalizado.
+# O índice de chaves (título normalizado → score) é montado uma vez; o join é um
+# lookup vetorizado (get_indexer) que nunca multiplica linhas do catálogo.
+
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .io import read_csv
+
+YEAR_CANDIDATES = ["release_year", "year", "startYear"]
+SCORE_CANDIDATES = ["score", "imdb_score", "tmdb_score", "rating", "averageRating", "vote_average"]
+
+
+@dataclass(frozen=True)
+class TitleKeyIndex:
+    keys: pd.Index        # títulos normalizados, únicos
+    scores: np.ndarray    # score alinhado a keys (já em 0–10)
+    titles: np.ndarray    # título original da linha escolhida para cada chave
+    n_source_rows: int    # linhas em ratings.csv (antes da deduplicação)
+    n_duplicates: int     # linhas descartadas por chave repetida
+    years: Optional[np.ndarray] = None  # ano de lançamento, se ratings.csv tiver (usado no match aproximado)
+
+    def lookup(self, norm_titles: pd.Series) -> np.ndarray:
+        # posição de cada título em keys (-1 = sem avaliação)
+        return self.keys.get_indexer(norm_titles)
+
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    return titles.fillna("").astype(str).str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+
+
+def read_ratings(path: str) -> Tuple[pd.DataFrame, Optional[str]]:
+    if not os.path.exists(path):
+        return pd.DataFrame(), None
+    r = read_csv(path)
+    r.columns = [c.strip() for c in r.columns]
+    score_col = next((c for c in SCORE_CANDIDATES if c in r.columns), None)
+    if score_col is None:
+        numeric_cols = r.select_dtypes(include=[np.number]).columns.tolist()
+        for c in numeric_cols:
+            s = r[c].dropna()
+            if s.empty: continue
+            lo, hi = s.quantile(0.01), s.quantile(0.99)
+            if (0 <= lo <= 10 and 0 <= hi <= 10) or (0 <= lo <= 100 and 0 <= hi <= 100):
+                score_col = c; break
+    return r, score_col
+
+
+def build_title_index(ratings_df: pd.DataFrame, score_col: Optional[str]) -> Optional[TitleKeyIndex]:
+    if ratings_df.empty or not score_col or "title" not in ratings_df.columns:
+        return None
+    keys = normalize_titles(ratings_df["title"])
+    scores = pd.to_numeric(ratings_df[score_col], errors="coerce")
+    # chave repetida: vale a primeira linha com score (ordem do arquivo), de forma determinística
+    valid = scores.notna() & (keys != "")
+    first = valid & ~keys.where(valid).duplicated(keep="first")
+    scores = scores[first].to_numpy(dtype=float)
+    if scores.size and np.nanmax(scores) > 10:
+        scores = scores / 10.0
+    year_col = next((c for c in YEAR_CANDIDATES if c in ratings_df.columns), None)
+    years = pd.to_numeric(ratings_df[year_col][first], errors="coerce").to_numpy(dtype=float) if year_col else None
+    return TitleKeyIndex(
+        keys=pd.Index(keys[first].to_numpy()),
+        scores=scores,
+        titles=ratings_df["title"][first].astype(str).to_numpy(),
+        n_source_rows=len(ratings_df),
+        n_duplicates=int((valid & ~first).sum()),
+        years=years,
+    )
+
+
+def join_ratings(df: pd.DataFrame, index: Optional[TitleKeyIndex]) -> pd.DataFrame:
+    if index is None or "title" not in df.columns:
+        return df
+    df["title_norm"] = normalize_titles(df["title"])
+    pos = index.lookup(df["title_norm"])
+    df["score"] = np.where(pos >= 0, index.scores[pos], np.nan) if len(index.keys) else np.nan
+    return df
+
+
+def match_stats(df: pd.DataFrame, index: Optional[TitleKeyIndex]) -> dict:
+    n_titles = len(df)
+    if index is None or "score" not in df.columns:
+        return {"titles": n_titles, "matched": 0, "match_rate": 0.0}
+    matched = int(df["score"].notna().sum())
+    used = np.unique(index.lookup(df["title_norm"]))
+    return {
+        "titles": n_titles,
+        "matched": matched,
+        "match_rate": matched / n_titles if n_titles else 0.0,
+        "ratings_rows": index.n_source_rows,
+        "ratings_duplicates": index.n_duplicates,
+        "ratings_unused": int(len(index.keys) - (used >= 0).sum()),
+    }
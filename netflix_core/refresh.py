@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+# netflix_core/refresh.py
+#
+# Refresh incremental do catálogo: um netflix_titles.csv novo (ex.: baixado do Kaggle)
+# é comparado, por show_id e hash do conteúdo bruto da linha, com a última ingestão em
+# disco. Só as linhas inseridas ou alteradas passam por tipagem, tokenização e termos;
+# as demais reaproveitam núcleo, pontes, termos e texto da geração anterior. O score
+# é refeito para todas as linhas (lookup vetorizado), então um ratings.csv novo também
+# entra por aqui. O resultado é igual ao de uma ingestão completa, exceto o vocabulário
+# da nuvem: termos novos são ligados aos existentes pela grafia em minúsculas (e plural
+# simples); apagar data/.cache/ força a normalização do vocabulário inteiro.
+# RefreshResult.delta (linha antiga → nova, linhas alteradas) leva o diff adiante:
+# build_store(previous=...) atualiza o índice da busca (a montagem cara) só nas linhas
+# alteradas. Índices de filtro, incidências e cubo saem das pontes/núcleo já mesclados
+# (poucos ms) e o ranking é reordenado porque o score de todas as linhas foi refeito.
+#
+# SnapshotSwap mantém o snapshot atual servindo enquanto o próximo é montado em
+# segundo plano; a troca é uma única atribuição sob lock.
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow vem com o streamlit
+    pa = None
+
+from .bridges import BRIDGE_COLUMNS
+from .catalog import catalog_sources
+from .ingest import (
+    CHUNK_ROWS,
+    HEAVY_COLUMNS,
+    IngestedCatalog,
+    TextStore,
+    _ChunkSink,
+    finish_core,
+    ingest_catalog,
+    read_csv_chunks,
+    read_ingested,
+    row_hashes,
+    text_path_for,
+    write_snapshot,
+)
+from .ratings import build_title_index, join_ratings, read_ratings
+from .terms import TermMatrix
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CatalogDiff:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+
+@dataclass(frozen=True)
+class RowDelta:
+    base_generation: int  # geração de onde as posições antigas vêm
+    remap: np.ndarray     # posição antiga → posição nova (-1 = removida ou alterada)
+    changed: np.ndarray   # posições novas das linhas inseridas/alteradas
+
+
+@dataclass
+class RefreshResult:
+    catalog: IngestedCatalog
+    diff: Optional[CatalogDiff]  # None: não havia ingestão anterior utilizável, foi completa
+    delta: Optional[RowDelta] = None
+
+
+class _FullReload(Exception):
+    # show_id ausente ou repetido: não dá para casar linhas, volta para a ingestão completa
+    pass
+
+
+def _remap_bridge(col: str, old: Optional[pd.DataFrame], new: Optional[pd.DataFrame],
+                  remap: np.ndarray, changed_pos: np.ndarray) -> pd.DataFrame:
+    ids, tokens = [], []
+    if old is not None:
+        nid = remap[old["title_id"].to_numpy()]
+        keep = nid >= 0
+        ids.append(nid[keep])
+        tokens.append(old[col].array[keep])
+    if new is not None and len(new):
+        ids.append(changed_pos[new["title_id"].to_numpy()])
+        tokens.append(new[col].array)
+    ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+    cat = union_categoricals(tokens, sort_categories=True).remove_unused_categories() if tokens else pd.Categorical([])
+    order = np.argsort(ids, kind="stable")  # tokens de cada título na ordem original
+    id_dtype = np.int32 if ids.size == 0 or ids.max() < 2**31 else np.int64
+    return pd.DataFrame({"title_id": ids[order].astype(id_dtype), col: cat[order]})
+
+
+def _vocab_codes(old_vocab: np.ndarray, vocab: np.ndarray) -> np.ndarray:
+    # termo do bloco alterado → termo existente (mesma grafia em minúsculas ou plural simples); -1 = novo
+    lower_old = pd.Series(old_vocab, dtype=object).str.lower()
+    first = ~lower_old.duplicated()
+    keys = pd.Index(lower_old[first].to_numpy())
+    ids = np.flatnonzero(first.to_numpy())
+    lower = pd.Series(vocab, dtype=object).str.lower()
+    pos = keys.get_indexer(lower)
+    plural = (lower.str.endswith("s") & ~lower.str.endswith("ss")).to_numpy()
+    singular = keys.get_indexer(lower.str[:-1])
+    pos = np.where((pos < 0) & plural & (singular >= 0), singular, pos)
+    return np.where(pos >= 0, ids[np.maximum(pos, 0)], -1)
+
+
+def _merge_terms(old: Optional[TermMatrix], new: Optional[TermMatrix], remap: np.ndarray,
+                 changed_pos: np.ndarray, n_rows: int) -> Optional[TermMatrix]:
+    if old is None and new is None:
+        return None
+    vocab = old.vocab if old is not None else np.empty(0, dtype=object)
+    # componentes dos bigramas acompanham o vocabulário (ids remapeados junto com os termos)
+    left = old.left if old is not None and old.left is not None else np.full(vocab.size, -1, dtype=np.int32)
+    right = old.right if old is not None and old.right is not None else np.full(vocab.size, -1, dtype=np.int32)
+    rows, terms, counts = [], [], []
+    if old is not None:
+        nid = remap[old.row_ids]
+        keep = nid >= 0
+        rows.append(nid[keep])
+        terms.append(old.term_ids[keep])
+        counts.append(old.counts[keep])
+    if new is not None and new.row_ids.size:
+        codes = _vocab_codes(vocab, new.vocab)
+        fresh = np.flatnonzero(codes < 0)
+        codes[fresh] = vocab.size + np.arange(fresh.size)
+        vocab = np.concatenate([vocab, new.vocab[fresh]])
+        if new.left is not None:
+            nl, nr = new.left[fresh], new.right[fresh]
+            left = np.concatenate([left, np.where(nl >= 0, codes[np.maximum(nl, 0)], -1)]).astype(np.int32)
+            right = np.concatenate([right, np.where(nr >= 0, codes[np.maximum(nr, 0)], -1)]).astype(np.int32)
+        else:
+            left = np.concatenate([left, np.full(fresh.size, -1, dtype=np.int32)])
+            right = np.concatenate([right, np.full(fresh.size, -1, dtype=np.int32)])
+        rows.append(changed_pos[new.row_ids])
+        terms.append(codes[new.term_ids])
+        counts.append(new.counts)
+    row = np.concatenate(rows).astype(np.int32)
+    term = np.concatenate(terms).astype(np.int32)
+    count = np.concatenate(counts).astype(np.int32)
+    if row.size == 0:
+        return TermMatrix(vocab, row, term, count, n_rows, left, right)
+    # mesma forma da ingestão: ordenado por (linha, termo), pares repetidos somados
+    order = np.lexsort((term, row))
+    row, term, count = row[order], term[order], count[order]
+    start = np.flatnonzero(np.r_[True, (row[1:] != row[:-1]) | (term[1:] != term[:-1])])
+    return TermMatrix(vocab=vocab, row_ids=row[start], term_ids=term[start],
+                      counts=np.add.reduceat(count, start).astype(np.int32), n_rows=n_rows, left=left, right=right)
+
+
+def _merge_text(old: Optional[TextStore], delta: Optional[TextStore], rows: np.ndarray,
+                path: str, chunk_rows: int) -> Optional[TextStore]:
+    # Texto da geração nova na ordem final, gravado por blocos: rows < linhas da geração anterior vêm
+    # dela, as demais do bloco alterado; cada bloco lê só os record batches que contêm suas linhas
+    stores = [t for t in (old, delta) if t is not None]
+    if not stores:
+        return None
+    n_old = old.num_rows if old is not None else 0
+    with pa.ipc.new_file(path + ".tmp", stores[0].schema) as writer:
+        for start in range(0, rows.size, chunk_rows):
+            part = rows[start:start + chunk_rows]
+            from_old = part < n_old
+            tables = []
+            if from_old.any():
+                tables.append(old.take_rows(part[from_old]))
+            if not from_old.all():
+                tables.append(delta.take_rows(part[~from_old] - n_old))
+            table = pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+            order = np.argsort(~from_old, kind="stable")  # concatenado: antigas, depois alteradas
+            inverse = np.empty_like(order)
+            inverse[order] = np.arange(order.size)
+            for batch in table.take(pa.array(inverse)).to_batches():
+                writer.write_batch(batch)
+    os.replace(path + ".tmp", path)
+    return TextStore(path)
+
+
+def _refresh(
+    old: IngestedCatalog,
+    netflix_path: str,
+    ratings_path: str,
+    cache_dir: str,
+    chunk_rows: int,
+    fuzzy_threshold: Optional[float],
+    encoding: Optional[str],
+    heavy_columns: Iterable[str],
+    bridge_columns: Iterable[str],
+) -> RefreshResult:
+    generation = old.generation + 1
+    index = build_title_index(*read_ratings(ratings_path))
+    old_ids = pd.Index(old.core["show_id"].to_numpy(dtype=object))
+    n_old = len(old_ids)
+
+    # linhas alteradas vão para um sink próprio; score fica para o fim (vale para o frame inteiro)
+    text_path = text_path_for(cache_dir, fuzzy_threshold, generation)
+    sink = _ChunkSink(index, text_path + ".delta", heavy_columns, bridge_columns, join=False)
+    src: List[np.ndarray] = []      # por linha nova: posição na geração antiga ou -(k+1) = k-ésima alterada
+    hashes: List[np.ndarray] = []
+    new_ids: List[np.ndarray] = []
+    n_inserted = n_updated = 0
+    try:
+        for chunk in read_csv_chunks(netflix_path, chunk_rows, encoding):
+            if "show_id" not in chunk.columns:
+                raise _FullReload
+            h = row_hashes(chunk)
+            pos = old_ids.get_indexer(chunk["show_id"])
+            same = pos >= 0
+            same[same] = old.row_hash[pos[same]] == h[same]
+            changed = ~same
+            n_inserted += int((pos < 0).sum())
+            n_updated += int((changed & (pos >= 0)).sum())
+            s = np.where(same, pos, -1)
+            s[changed] = -(sink.n_rows + np.arange(int(changed.sum()))) - 1
+            if changed.any():
+                sink.add(chunk[changed].reset_index(drop=True))
+            src.append(s)
+            hashes.append(h)
+            new_ids.append(chunk["show_id"].to_numpy(dtype=object))
+        if new_ids and pd.Index(np.concatenate(new_ids)).has_duplicates:
+            raise _FullReload
+        src = np.concatenate(src) if src else np.empty(0, dtype=np.int64)
+    except BaseException:
+        sink.abort()
+        raise
+    delta_text = sink.close()
+
+    keep_old = src >= 0
+    changed_pos = np.flatnonzero(~keep_old)  # k-ésima linha alterada → posição final
+    remap = np.full(n_old, -1, dtype=np.int64)
+    remap[src[keep_old]] = np.flatnonzero(keep_old)
+
+    # núcleo na ordem do CSV novo: antigas (sem score/título normalizado) + alteradas, score refeito
+    old_core = old.core.drop(columns=[c for c in ("title_norm", "score") if c in old.core.columns])
+    changed_core = sink.core()
+    combined = pd.concat([old_core, changed_core], ignore_index=True)
+    rows = np.where(keep_old, src, n_old + (-src - 1))
+    core = combined.take(rows).reset_index(drop=True)
+    del combined, old_core, changed_core
+    for col in core.columns:
+        if isinstance(core[col].dtype, pd.CategoricalDtype):
+            core[col] = core[col].cat.remove_unused_categories()
+    sources = catalog_sources(netflix_path, ratings_path)
+    core = finish_core(join_ratings(core, index), index, fuzzy_threshold, sources, cache_dir)
+
+    new_bridges = sink.bridges()
+    bridges = {col: _remap_bridge(col, old.bridges.get(col), new_bridges.get(col), remap, changed_pos)
+               for col in dict.fromkeys(list(old.bridges) + list(new_bridges))}
+    terms = _merge_terms(old.terms, sink.term_matrix(), remap, changed_pos, len(core))
+    text = _merge_text(old.text, delta_text, rows, text_path, chunk_rows)
+    if delta_text is not None:
+        os.remove(delta_text.path)
+
+    catalog = IngestedCatalog(core=core, bridges=bridges, terms=terms, text=text,
+                              row_hash=np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64),
+                              generation=generation)
+    write_snapshot(catalog, cache_dir, fuzzy_threshold, sources)
+    diff = CatalogDiff(inserted=n_inserted, updated=n_updated, deleted=n_old - int(keep_old.sum()) - n_updated,
+                       unchanged=int(keep_old.sum()))
+    return RefreshResult(catalog=catalog, diff=diff, delta=RowDelta(old.generation, remap, changed_pos))
+
+
+def refresh_ingested(
+    netflix_path: str,
+    ratings_path: str,
+    cache_dir: str,
+    fuzzy_threshold: Optional[float] = None,
+    chunk_rows: int = CHUNK_ROWS,
+    heavy_columns: Iterable[str] = HEAVY_COLUMNS,
+    bridge_columns: Iterable[str] = BRIDGE_COLUMNS,
+) -> RefreshResult:
+    # Fontes iguais: a ingestão em disco vale como está. Mudaram: diff contra a última geração gravada
+    current = read_ingested(netflix_path, ratings_path, cache_dir, fuzzy_threshold)
+    if current is not None:
+        n = len(current.core)
+        return RefreshResult(current, CatalogDiff(unchanged=n),
+                             RowDelta(current.generation, np.arange(n), np.empty(0, dtype=np.int64)))
+    old = read_ingested(netflix_path, ratings_path, cache_dir, fuzzy_threshold, validate=False)
+    if old is not None and old.row_hash is not None and "show_id" in old.core.columns \
+            and not old.core["show_id"].duplicated().any():
+        for encoding in (None, "latin-1"):
+            try:
+                return _refresh(old, netflix_path, ratings_path, cache_dir, chunk_rows, fuzzy_threshold,
+                                encoding, heavy_columns, bridge_columns)
+            except UnicodeDecodeError:
+                continue
+            except _FullReload:
+                break
+    catalog = ingest_catalog(netflix_path, ratings_path, cache_dir, chunk_rows, fuzzy_threshold,
+                             heavy_columns, bridge_columns)
+    return RefreshResult(catalog, None)
+
+
+@dataclass(frozen=True)
+class Snapshot(Generic[T]):
+    signature: Hashable
+    value: T
+    built_at: float
+
+
+class SnapshotSwap(Generic[T]):
+    # Serve o snapshot atual enquanto o próximo é montado numa thread; troca atômica ao terminar.
+    # Sem snapshot ainda (primeira carga), get() monta na hora. build recebe também o valor atual
+    # (None na primeira carga) para reaproveitá-lo. Uma assinatura que falhou não é repetida até
+    # as fontes mudarem de novo (o erro fica em .error).
+    def __init__(self, build: Callable[[Hashable, Optional[T]], T]):
+        self._build = build
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.current: Optional[Snapshot[T]] = None
+        self.pending: Optional[Hashable] = None
+        self.failed: Optional[Hashable] = None
+        self.error: Optional[BaseException] = None
+
+    def get(self, signature: Hashable) -> Snapshot[T]:
+        with self._lock:
+            if self.current is None:
+                self.current = Snapshot(signature, self._build(signature, None), time.time())
+            elif signature not in (self.current.signature, self.pending, self.failed) and self.pending is None:
+                self.pending = signature
+                self._thread = threading.Thread(target=self._run, args=(signature,), daemon=True,
+                                                name="catalog-refresh")
+                self._thread.start()
+            return self.current
+
+    def _run(self, signature: Hashable) -> None:
+        try:
+            snap = Snapshot(signature, self._build(signature, self.current.value), time.time())
+        except Exception as e:
+            with self._lock:
+                self.failed, self.error, self.pending = signature, e, None
+            return
+        with self._lock:
+            self.current, self.failed, self.error, self.pending = snap, None, None, None
+
+    @property
+    def refreshing(self) -> bool:
+        return self.pending is not None
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Snapshot[T]]:
+        # espera a troca em andamento (testes/CLI)
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.current
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+# netflix_core/report.py
+#
+# Exportação em lote do Dashboard para HTML estático, sem Streamlit: para cada recorte
+# (ex.: um por país), agregados uma vez (warm_view), as mesmas figuras do app
+# (netflix_core/charts.py), a nuvem em PNG embutido e as decisões estratégicas num
+# arquivo autocontido; opcionalmente um PNG por figura (requer kaleido). Os recortes
+# são repartidos num pool de processos que nascem de um forkserver (ou spawn), nunca de
+# fork direto: cada worker carrega o CatalogStore uma vez, no initializer, a partir da
+# ingestão em disco (StoreSource; Arrow em memory-map). Sem StoreSource ou sem processos,
+# threads. index.html lista os relatórios gerados; rótulos com o mesmo slug viram
+# arquivos -2, -3, ... em vez de sobrescrever o anterior.
+
+import base64
+import html
+import multiprocessing as mp
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
+from importlib.util import find_spec
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+from .aggregations import DashboardAggregates, FilterState
+from .charts import genre_bar_figure, top_titles_figure
+from .figcache import compact_json, figure_from_json
+from .ingest import read_ingested
+from .store import CatalogStore, build_store
+from .warmup import WARM_WORKERS, default_filter_state, warm_view
+
+PLOTLYJS_MODES = ("inline", "cdn", "directory")
+# a versão de plotly.js que o plotly instalado gera (a mesma do modo inline)
+PLOTLYJS_CDN = f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+# Seções do relatório na ordem do Dashboard: (título, [(figura, legenda)])
+REPORT_SECTIONS = [
+    ("🌍 Onde estamos?", [("mapa", "Concentração de títulos por país.")]),
+    ("🎯 Foco no país", [("foco_generos", "Gêneros mais frequentes no país."),
+                        ("foco_top", "Top avaliados no país.")]),
+    ("🎭 O que o público consome?", [("generos", "Gêneros mais frequentes (Top 20)."),
+                                    ("treemap", "Participação por gênero.")]),
+    ("🔥 País × Gênero", [("heatmap", "Quadrantes escuros = maior incidência.")]),
+    ("📈 Como evoluímos?", [("anual", "Lançamentos por ano.")]),
+    ("⭐ Quem se destaca?", [("top10", "Top 10 por score."), ("histograma", "Distribuição de score."),
+                            ("score_ano", "Score ao longo do tempo.")]),
+]
+
+CSS = """
+body { font-family: Inter, system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial; margin: 0; background: #fff; color: #111418; }
+.nx-wrap { max-width: 1100px; margin: 0 auto; padding: 24px; }
+h1 { color: #E50914; margin-bottom: 4px; }
+.nx-subtle { color: #5f6b7a; font-size: .95rem; }
+.nx-block { background: #f7f8fa; border: 1px solid #dfe3ea; border-radius: 16px; padding: 18px 20px; margin: 18px 0; }
+.nx-kpis { display: grid; grid-template-columns: repeat(4, 1fr); gap: 18px; }
+.nx-kpi h2 { font-size: 2.1rem; margin: 2px 0; color: #E50914; }
+.nx-kpi .label { color: #5f6b7a; font-size: .92rem; }
+.caption { color: #5f6b7a; font-size: 12px; margin: 4px 0 14px 0; }
+img.wordcloud { width: 100%; border-radius: 10px; }
+"""
+
+
+def strategic_bullets(agg: DashboardAggregates, label: Callable[[str], str] = str) -> List[str]:
+    # "Decisões estratégicas" (markdown com **negrito**), as mesmas do app; label: escape dos
+    # nomes vindos do catálogo (o app passa o escape de markdown)
+    bullets = []
+    topg = [label(g) for g in agg.genre_counts.head(3).index]
+    if topg:
+        bullets.append(f"🔍 **Gêneros líderes**: {', '.join(topg)} — priorizar licenciamento/destaque editorial.")
+    topc = [label(c) for c in agg.country_counts.head(3).index]
+    if topc:
+        bullets.append(f"🌐 **Praças prioritárias**: {', '.join(topc)} — campanhas locais e bundles.")
+    if not agg.yearly.empty:
+        trend = "crescimento recente" if agg.yearly["Lançamentos"].tail(3).is_monotonic_increasing else "variação nos últimos anos"
+        bullets.append(f"📈 **Lançamentos**: {trend} — alinhar aquisições ao calendário.")
+    if agg.score_mean is not None:
+        bullets.append(f"⭐ **Qualidade média**: {agg.score_mean:.1f} — revisar long tail de baixo score.")
+    return bullets
+
+
+def describe_state(state: FilterState) -> str:
+    parts = []
+    if state.countries:
+        parts.append(f"País: {', '.join(state.countries)}")
+    if state.genres:
+        parts.append(f"Gênero: {', '.join(state.genres)}")
+    if state.year_range:
+        parts.append(f"Ano: {state.year_range[0]}–{state.year_range[1]}")
+    if state.query:
+        parts.append(f"Busca: “{state.query}”")
+    if state.score_range:
+        parts.append(f"Score: {state.score_range[0]:.1f}–{state.score_range[1]:.1f}")
+    return " | ".join(parts)
+
+
+def slugify(label: str) -> str:
+    ascii_ = unicodedata.normalize("NFKD", label).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", ascii_.lower()).strip("-") or "relatorio"
+
+
+def unique_slugs(labels: Sequence[str]) -> List[str]:
+    # rótulos diferentes podem dar o mesmo slug ("Côte d'Ivoire" / "Cote d Ivoire"): a primeira
+    # ocorrência fica com o slug puro, as seguintes ganham -2, -3, ... (sem sobrescrever arquivos)
+    base = [slugify(label) for label in labels]
+    taken = set(base)
+    seen: set = set()
+    out = []
+    for slug in base:
+        if slug in seen:
+            n = 2
+            while f"{slug}-{n}" in taken:
+                n += 1
+            slug = f"{slug}-{n}"
+            taken.add(slug)
+        seen.add(slug)
+        out.append(slug)
+    return out
+
+
+def country_states(store: CatalogStore, countries: Optional[Sequence[str]] = None) -> List[Tuple[str, FilterState]]:
+    # um recorte por país (padrão: todos os da sidebar), demais filtros como na abertura do app
+    base = default_filter_state(store)
+    chosen = store.countries if countries is None else [c for c in countries if c in set(store.countries)]
+    return [(c, replace(base, countries=(c,))) for c in chosen]
+
+
+def _markdown_bold(text: str) -> str:
+    return re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", html.escape(text))
+
+
+def render_report_html(
+    title: str,
+    state: FilterState,
+    agg: DashboardAggregates,
+    figures: Dict[str, str],
+    wordcloud: Optional[bytes] = None,
+    plotlyjs: str = "inline",
+) -> str:
+    # figures: nome → JSON (compacto) da figura; plotlyjs: inline (autocontido), cdn ou directory
+    if plotlyjs == "inline":
+        head_js = f"<script type=\"text/javascript\">{get_plotlyjs()}</script>"
+    elif plotlyjs == "cdn":
+        head_js = f"<script src=\"{PLOTLYJS_CDN}\" charset=\"utf-8\"></script>"
+    else:
+        head_js = "<script src=\"plotly.min.js\" charset=\"utf-8\"></script>"
+
+    out = [f"<div class='nx-wrap'><h1>📊 {html.escape(title)}</h1>",
+           f"<div class='nx-subtle'>{html.escape(describe_state(state))}</div>"]
+    kpis = [("🎬 Títulos", f"{agg.total_titles:,}", "Catálogo filtrado"),
+            ("🌍 Países", f"{agg.n_countries:,}", "Cobertura geográfica"),
+            ("🎭 Gêneros", f"{agg.n_genres:,}", "Variedade de conteúdo"),
+            ("⭐ Score médio", "—" if agg.score_mean is None else f"{agg.score_mean:.1f}", f"{agg.n_scored:,} avaliados")]
+    out.append("<div class='nx-kpis'>" + "".join(
+        f"<div class='nx-block nx-kpi'><b>{k}</b><h2>{v}</h2><div class='label'>{lbl}</div></div>" for k, v, lbl in kpis
+    ) + "</div>")
+
+    for heading, charts in REPORT_SECTIONS:
+        present = [(name, cap) for name, cap in charts if name in figures]
+        if not present:
+            continue
+        out.append(f"<div class='nx-block'><h3>{heading}</h3>")
+        for name, cap in present:
+            out.append(pio.to_html(figure_from_json(figures[name]), full_html=False, include_plotlyjs=False,
+                                   div_id=f"fig-{name}", config={"displaylogo": False}))
+            out.append(f"<div class='caption'>{html.escape(cap)}</div>")
+        out.append("</div>")
+
+    if wordcloud:
+        src = "data:image/png;base64," + base64.b64encode(wordcloud).decode("ascii")
+        out.append(f"<div class='nx-block'><h3>📝 O que comunicamos?</h3>"
+                   f"<img class='wordcloud' src='{src}' alt='Nuvem de palavras'></div>")
+
+    bullets = strategic_bullets(agg) or ["Sem títulos neste recorte."]
+    out.append("<div class='nx-block'><h3>🧭 Decisões estratégicas</h3><ul>"
+               + "".join(f"<li>{_markdown_bold(b)}</li>" for b in bullets) + "</ul></div>")
+    out.append(f"<div class='caption'>Gerado em {time.strftime('%Y-%m-%d %H:%M')}.</div></div>")
+    return (f"<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+            f"<style>{CSS}</style>{head_js}</head><body>{''.join(out)}</body></html>")
+
+
+@dataclass
+class ExportResult:
+    paths: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    mode: str = "serial"
+
+    @property
+    def reports_per_minute(self) -> float:
+        return len(self.paths) / self.seconds * 60 if self.seconds else 0.0
+
+
+@dataclass(frozen=True)
+class StoreSource:
+    # de onde um processo do pool recarrega o CatalogStore: a ingestão gravada em cache_dir
+    netflix_path: str
+    ratings_path: str
+    cache_dir: str
+    fuzzy_threshold: Optional[float] = None
+
+    def load(self, content_id: str = "") -> CatalogStore:
+        # content_id: o do store do processo principal; outra versão em disco não serve
+        catalog = read_ingested(self.netflix_path, self.ratings_path, self.cache_dir, self.fuzzy_threshold)
+        if catalog is None or (content_id and catalog.content_id != content_id):
+            raise RuntimeError(f"ingestão em {self.cache_dir} ausente ou de outra versão das fontes")
+        return build_store(catalog)
+
+
+# CatalogStore do lote em cada processo do pool (preenchido pelo initializer)
+_STORE: Optional[CatalogStore] = None
+
+
+def _init_worker(source: StoreSource, content_id: str) -> None:
+    global _STORE
+    _STORE = source.load(content_id)
+
+
+def _process_context():
+    # forkserver: workers saem de um processo de um só thread, com plotly/pandas já importados; sem ele, spawn
+    if "forkserver" in mp.get_all_start_methods():
+        ctx = mp.get_context("forkserver")
+        ctx.set_forkserver_preload([__name__])
+        return ctx
+    return mp.get_context("spawn")
+
+
+def export_one(label: str, state: FilterState, out_dir: str, plotlyjs: str = "inline", images: bool = False,
+               slug: Optional[str] = None, store: Optional[CatalogStore] = None) -> str:
+    store = _STORE if store is None else store
+    view = warm_view(store, state, mode="serial")
+    figures = dict(view.figures)
+    agg = view.aggregates
+    if len(state.countries) == 1:
+        if not agg.focus_genres.empty:
+            figures["foco_generos"] = compact_json(genre_bar_figure(agg.focus_genres))
+        if not agg.focus_top.empty:
+            figures["foco_top"] = compact_json(top_titles_figure(agg.focus_top))
+    slug = slugify(label) if slug is None else slug
+    path = os.path.join(out_dir, f"{slug}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_report_html(label, state, agg, figures, view.wordcloud, plotlyjs))
+    if images:
+        img_dir = os.path.join(out_dir, slug)
+        os.makedirs(img_dir, exist_ok=True)
+        for name, payload in figures.items():
+            figure_from_json(payload).write_image(os.path.join(img_dir, f"{name}.png"), width=1100, height=500)
+        if view.wordcloud:
+            with open(os.path.join(img_dir, "nuvem.png"), "wb") as f:
+                f.write(view.wordcloud)
+    return path
+
+
+def _write_index(out_dir: str, entries: List[Tuple[str, str]]) -> str:
+    items = "".join(f"<li><a href='{html.escape(os.path.basename(p))}'>{html.escape(label)}</a></li>"
+                    for label, p in sorted(entries, key=lambda e: e[0]))
+    path = os.path.join(out_dir, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'><title>Relatórios</title>"
+                f"<style>{CSS}</style></head><body><div class='nx-wrap'><h1>📊 Relatórios</h1>"
+                f"<div class='nx-subtle'>{len(entries)} recortes — {time.strftime('%Y-%m-%d %H:%M')}</div>"
+                f"<ul>{items}</ul></div></body></html>")
+    return path
+
+
+def export_reports(
+    store: CatalogStore,
+    states: Sequence[Tuple[str, FilterState]],
+    out_dir: str,
+    workers: int = WARM_WORKERS,
+    mode: str = "process",
+    plotlyjs: str = "inline",
+    images: bool = False,
+    source: Optional[StoreSource] = None,
+) -> ExportResult:
+    # mode: process (padrão; requer source, cai para thread sem ele ou sem processos), thread ou serial
+    if plotlyjs not in PLOTLYJS_MODES:
+        raise ValueError(f"plotlyjs deve ser um de {PLOTLYJS_MODES}: {plotlyjs!r}")
+    if images and find_spec("kaleido") is None:
+        raise RuntimeError("exportar PNG requer o pacote kaleido (pip install kaleido)")
+    os.makedirs(out_dir, exist_ok=True)
+    if plotlyjs == "directory":
+        with open(os.path.join(out_dir, "plotly.min.js"), "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+
+    t0 = time.perf_counter()
+    slugs = unique_slugs([label for label, _ in states])
+    args = [(label, state, out_dir, plotlyjs, images, slug) for (label, state), slug in zip(states, slugs)]
+    paths = None
+    if workers <= 1 or len(args) <= 1:
+        mode = "serial"
+    if mode == "process":
+        if source is None:
+            mode = "thread"
+        else:
+            try:
+                with ProcessPoolExecutor(workers, mp_context=_process_context(), initializer=_init_worker,
+                                         initargs=(source, store.content_id)) as pool:
+                    paths = list(pool.map(export_one, *zip(*args)))
+            except (OSError, ImportError, NotImplementedError, BrokenProcessPool):
+                mode = "thread"
+    if paths is None and mode == "thread":
+        with ThreadPoolExecutor(workers, thread_name_prefix="report") as pool:
+            paths = list(pool.map(lambda a: export_one(*a, store=store), args))
+    if paths is None:
+        mode = "serial"
+        paths = [export_one(*a, store=store) for a in args]
+    _write_index(out_dir, [(label, p) for (label, _), p in zip(states, paths)])
+    return ExportResult(paths=paths, seconds=time.perf_counter() - t0, mode=mode)
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+# netflix_core/search.py
+#
+# Busca textual em título, elenco, direção e descrição: índice invertido (CSR por
+# termo) montado uma vez no carregamento, ranking BM25 e prefixo opcional no último
+# termo da consulta (busca enquanto digita). Tokenização em pyarrow.compute, sem
+# objetos Python por linha: minúsculas, sem acentos ("são" = "sao"), separa em
+# tudo que não é letra/dígito, descarta stopwords e tokens de 1 caractere.
+# Campos pesam diferente (BM25F simplificado): o tf de cada termo e o tamanho do
+# documento somam os campos com FIELD_WEIGHTS. Consultas com vários termos exigem
+# todos (E); o resultado é um conjunto de linhas que combina com os filtros da sidebar.
+# No refresh incremental (netflix_core/refresh.py), update_search_index só tokeniza as
+# linhas inseridas/alteradas e remapeia os postings das demais: mesmo índice da montagem completa.
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from wordcloud import STOPWORDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - pyarrow vem com o streamlit
+    pa = None
+    pc = None
+
+from .ingest import TextStore
+
+SEARCH_FIELDS = ("title", "cast", "director", "description")
+FIELD_WEIGHTS = {"title": 3.0, "cast": 1.5, "director": 1.5, "description": 1.0}
+TF_SCALE = 2             # tf ponderado guardado como inteiro (peso × 2 cabe em uint16)
+BM25_K1, BM25_B = 1.2, 0.75
+PREFIX_EXPANSIONS = 64   # prefixo vira no máximo os N termos mais frequentes que começam com ele
+SPLIT_PATTERN = r"[^\pL\pN]+"
+
+
+def _tokenize(values: "pa.Array") -> "pa.ListArray":
+    folded = pc.utf8_normalize(pc.utf8_lower(values.cast(pa.large_string())), "NFKD")
+    return pc.split_pattern_regex(pc.replace_substring_regex(folded, r"\p{Mn}", ""), SPLIT_PATTERN)
+
+
+def _fold(words: Iterable[str]) -> set:
+    tokens = _tokenize(pa.array(list(words), type=pa.large_string()))
+    return set(pc.list_flatten(tokens).to_pylist())
+
+
+STOP_TOKENS = _fold(STOPWORDS) if pa is not None else set()
+
+
+def query_tokens(query: str) -> List[str]:
+    # mesma normalização do índice; ordem preservada, repetidos saem
+    if pa is None or not query:
+        return []
+    words = pc.list_flatten(_tokenize(pa.array([query], type=pa.large_string()))).to_pylist()
+    return list(dict.fromkeys(w for w in words if len(w) > 1 and w not in STOP_TOKENS))
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    vocab: np.ndarray      # termos em ordem lexicográfica (prefixo = faixa contígua)
+    indptr: np.ndarray     # postings do termo i em rows[indptr[i]:indptr[i+1]]
+    rows: np.ndarray       # linhas (crescentes dentro de cada termo)
+    tf: np.ndarray         # tf ponderado pelos campos × TF_SCALE
+    doc_len: np.ndarray    # tamanho ponderado de cada título (tokens indexados)
+    n_rows: int
+
+    def _terms_for(self, token: str, prefix: bool) -> np.ndarray:
+        lo = int(np.searchsorted(self.vocab, token, side="left"))
+        if not prefix:
+            return np.arange(lo, lo + 1) if lo < self.vocab.size and self.vocab[lo] == token else np.empty(0, np.int64)
+        hi = int(np.searchsorted(self.vocab, token + "\U0010ffff", side="left"))
+        terms = np.arange(lo, hi)
+        if terms.size > PREFIX_EXPANSIONS:
+            df = self.indptr[terms + 1] - self.indptr[terms]
+            terms = np.sort(terms[np.argpartition(-df, PREFIX_EXPANSIONS - 1)[:PREFIX_EXPANSIONS]])
+        return terms
+
+    def _token_scores(self, terms: np.ndarray) -> np.ndarray:
+        # BM25 do token em cada linha (denso); com prefixo, o melhor dos termos expandidos
+        best = np.zeros(self.n_rows, dtype=np.float32)
+        avg = max(float(self.doc_len.mean()), 1e-9)
+        for t in terms:
+            a, b = self.indptr[t], self.indptr[t + 1]
+            rows = self.rows[a:b]
+            df = b - a
+            idf = np.log1p((self.n_rows - df + 0.5) / (df + 0.5))
+            tf = self.tf[a:b].astype(np.float32) / TF_SCALE
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[rows] / avg)
+            s = (idf * tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float32)
+            best[rows] = np.maximum(best[rows], s)
+        return best
+
+    def scores(self, query: str, prefix: bool = False) -> Optional[np.ndarray]:
+        # Relevância por linha (0 = não casa); None quando a consulta não tem termos indexáveis
+        tokens = query_tokens(query)
+        if not tokens:
+            return None
+        total = np.zeros(self.n_rows, dtype=np.float32)
+        matched = np.ones(self.n_rows, dtype=bool)
+        for i, token in enumerate(tokens):
+            terms = self._terms_for(token, prefix and i == len(tokens) - 1)
+            if terms.size == 0:
+                return np.zeros(self.n_rows, dtype=np.float32)
+            s = self._token_scores(terms)
+            matched &= s > 0
+            total += s
+        total[~matched] = 0
+        return total
+
+    def mask(self, query: str, prefix: bool = False) -> np.ndarray:
+        # conjunto de linhas da busca como máscara (combina com filter_mask por E)
+        s = self.scores(query, prefix)
+        return np.zeros(self.n_rows, dtype=bool) if s is None else s > 0
+
+    def search(
+        self, query: str, prefix: bool = False, mask: Optional[np.ndarray] = None, limit: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # (linhas, relevância) do mais para o menos relevante, restrito à máscara dos filtros
+        s = self.scores(query, prefix)
+        if s is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        hit = s > 0
+        if mask is not None:
+            hit &= mask
+        rows = np.flatnonzero(hit)
+        if limit is not None and rows.size > limit:
+            rows = rows[np.argpartition(-s[rows], limit - 1)[:limit]]
+            rows.sort()
+        rows = rows[np.argsort(-s[rows], kind="stable")]
+        return rows, s[rows]
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.indptr, self.rows, self.tf, self.doc_len)) + \
+            sum(len(t) + 49 for t in self.vocab)
+
+
+class SearchIndexBuilder:
+    # Acumula (linha, termo, tf) por blocos de cada campo; o vocabulário cresce por bloco
+    def __init__(self, n_rows: int, weights: Optional[Dict[str, float]] = None):
+        self.n_rows = n_rows
+        self.weights = FIELD_WEIGHTS if weights is None else weights
+        self.keys = pd.Index([], dtype=object)
+        self.doc_len = np.zeros(n_rows, dtype=np.float32)
+        self._parts: List[tuple] = []
+
+    def add(self, field: str, offset: int, values: "pa.Array") -> "SearchIndexBuilder":
+        tokens = _tokenize(values)
+        parents = pc.list_parent_indices(tokens).to_numpy()
+        enc = pc.dictionary_encode(pc.list_flatten(tokens))
+        words = enc.dictionary.to_numpy(zero_copy_only=False).astype(object)
+        codes = enc.indices.to_numpy()
+        if codes.size == 0:
+            return self
+        # stopwords e tokens de 1 caractere saem pelo dicionário do bloco (poucos valores distintos)
+        lengths = pc.utf8_length(enc.dictionary).to_numpy()
+        keep_word = (lengths > 1) & ~pd.Index(words).isin(STOP_TOKENS)
+        keep = keep_word[codes]
+        parents, codes = parents[keep], codes[keep]
+
+        new = pd.Index(words[keep_word]).difference(self.keys, sort=False)
+        self.keys = self.keys.append(new)
+        gids = np.full(words.size, -1, dtype=np.int64)
+        gids[keep_word] = self.keys.get_indexer(words[keep_word])
+        if parents.size == 0:
+            return self
+        weight = self.weights.get(field, 1.0)
+        # tamanho do documento: tokens indexados do bloco, ponderados pelo campo
+        per_row = np.bincount(parents, minlength=len(values)).astype(np.float32)
+        self.doc_len[offset:offset + len(values)] += per_row * np.float32(weight)
+        tf = np.full(parents.size, int(round(weight * TF_SCALE)), dtype=np.uint16)
+        self._parts.append(((parents + offset).astype(np.int32), gids[codes].astype(np.int32), tf))
+        return self
+
+    def finish(self) -> SearchIndex:
+        vocab = self.keys.to_numpy(dtype=object)
+        order = np.argsort(vocab)
+        rank = np.empty(vocab.size, dtype=np.int64)
+        rank[order] = np.arange(vocab.size)
+        if not self._parts:
+            return SearchIndex(vocab[order], np.zeros(vocab.size + 1, np.int64), np.empty(0, np.int32),
+                               np.empty(0, np.uint16), self.doc_len, self.n_rows)
+        rows = np.concatenate([p[0] for p in self._parts])
+        terms = np.concatenate([p[1] for p in self._parts])
+        tf = np.concatenate([p[2] for p in self._parts])
+        self._parts = []
+        # (termo, linha) únicos, termo-major: soma o tf de repetições e de campos diferentes
+        key = rank[terms] << 32 | rows.astype(np.int64)
+        del terms
+        order_key = np.argsort(key, kind="stable")
+        key = key[order_key]
+        tf = tf[order_key]
+        del order_key, rows
+        start = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        tf = np.add.reduceat(tf.astype(np.uint32), start)
+        key = key[start]
+        term_of = (key >> 32).astype(np.int64)
+        indptr = np.zeros(vocab.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_of, minlength=vocab.size), out=indptr[1:])
+        return SearchIndex(
+            vocab=vocab[order],
+            indptr=indptr,
+            rows=(key & 0xFFFFFFFF).astype(np.int32),
+            tf=np.minimum(tf, np.iinfo(np.uint16).max).astype(np.uint16),
+            doc_len=self.doc_len,
+            n_rows=self.n_rows,
+        )
+
+
+def _field_arrays(df: pd.DataFrame, text: Optional[TextStore], field: str) -> Iterator[Tuple[int, "pa.Array"]]:
+    # colunas do frame de uma vez; texto pesado bloco a bloco do Arrow em disco
+    if field in df.columns:
+        yield 0, pa.array(df[field].astype(object).where(df[field].notna(), None).to_numpy(), type=pa.large_string())
+    elif text is not None and field in text.columns:
+        yield from text.iter_arrays(field)
+
+
+def build_search_index(
+    df: pd.DataFrame, text: Optional[TextStore] = None, fields: Iterable[str] = SEARCH_FIELDS
+) -> Optional[SearchIndex]:
+    if pa is None:
+        return None
+    builder = SearchIndexBuilder(len(df))
+    for field in fields:
+        for offset, values in _field_arrays(df, text, field):
+            builder.add(field, offset, values)
+    return builder.finish()
+
+
+def _field_rows(df: pd.DataFrame, text: Optional[TextStore], field: str, rows: np.ndarray) -> Optional["pa.Array"]:
+    # só as linhas pedidas de um campo (frame ou Arrow em disco)
+    if field in df.columns:
+        values = df[field].take(rows)
+        return pa.array(values.astype(object).where(values.notna(), None).to_numpy(), type=pa.large_string())
+    if text is not None and field in text.columns:
+        return text.take_rows(rows, [field]).column(0).combine_chunks()
+    return None
+
+
+def update_search_index(
+    old: SearchIndex,
+    df: pd.DataFrame,
+    text: Optional[TextStore],
+    remap: np.ndarray,
+    changed: np.ndarray,
+    fields: Iterable[str] = SEARCH_FIELDS,
+) -> Optional[SearchIndex]:
+    # remap: posição antiga → nova (-1 = removida); changed: posições novas das linhas inseridas/alteradas
+    if pa is None:
+        return None
+    changed = np.asarray(changed, dtype=np.int64)
+    builder = SearchIndexBuilder(changed.size)
+    for field in fields:
+        values = _field_rows(df, text, field, changed)
+        if values is not None:
+            builder.add(field, 0, values)
+    delta = builder.finish()
+
+    # postings mantidos (linha remapeada) + postings das linhas novas, no vocabulário unido
+    vocab = np.union1d(old.vocab, delta.vocab).astype(object)
+    old_terms = np.repeat(np.searchsorted(vocab, old.vocab), np.diff(old.indptr))
+    new_rows = remap[old.rows]
+    keep = new_rows >= 0
+    terms = np.concatenate([old_terms[keep], np.repeat(np.searchsorted(vocab, delta.vocab), np.diff(delta.indptr))])
+    rows = np.concatenate([new_rows[keep], changed[delta.rows]]).astype(np.int64)
+    tf = np.concatenate([old.tf[keep], delta.tf])
+    del old_terms, new_rows, keep
+
+    # termos que ficaram sem linha saem, como na montagem completa
+    counts = np.bincount(terms, minlength=vocab.size)
+    used = counts > 0
+    terms = (np.cumsum(used) - 1)[terms]
+    key = terms.astype(np.int64) << 32 | rows
+    order = np.argsort(key, kind="stable")
+    indptr = np.zeros(int(used.sum()) + 1, dtype=np.int64)
+    np.cumsum(counts[used], out=indptr[1:])
+
+    doc_len = np.zeros(len(df), dtype=np.float32)
+    moved = np.flatnonzero(remap >= 0)
+    doc_len[remap[moved]] = old.doc_len[moved]
+    doc_len[changed] = delta.doc_len
+    return SearchIndex(
+        vocab=vocab[used],
+        indptr=indptr,
+        rows=rows[order].astype(np.int32),
+        tf=tf[order],
+        doc_len=doc_len,
+        n_rows=len(df),
+    )
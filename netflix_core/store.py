@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# netflix_core/store.py
+#
+# Dados imutáveis do catálogo, montados uma vez por processo e compartilhados por
+# todas as sessões (no app, via st.cache_resource: mesmo objeto, sem cópia por rerun).
+# CatalogStore reúne:
+#   - o frame compacto e as pontes título ↔ país/gênero;
+#   - índices de filtro (netflix_core/index.py) e incidências do heatmap;
+#   - termos da nuvem e o texto em disco (description/cast/director);
+#   - o cubo de ano × faixa de score (netflix_core/cube.py);
+#   - o índice da busca textual (netflix_core/search.py);
+#   - os rankings por score (netflix_core/ranking.py);
+#   - as opções da sidebar e as estatísticas de match com ratings.csv.
+# freeze_store() marca todos os arrays NumPy como somente leitura: uma escrita acidental
+# vira ValueError em vez de vazar para as outras sessões. Cada sessão guarda só as
+# seleções dos filtros e as máscaras/posições.
+
+from dataclasses import dataclass, field, fields, replace
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cooccurrence import Incidence, build_incidences
+from .cube import CatalogCube, build_cube
+from .index import TokenIndex, index_from_bridge
+from .ingest import IngestedCatalog, TextStore
+from .ranking import ScoreRanking, build_ranking
+from .ratings import TitleKeyIndex, match_stats
+from .refresh import RowDelta
+from .search import SearchIndex, build_search_index, update_search_index
+from .terms import TermMatrix
+
+FILTER_COLUMNS = ("country", "listed_in")
+DEFAULT_YEAR_RANGE = (1950, 2025)
+
+
+@dataclass(frozen=True)
+class CatalogStore:
+    df: pd.DataFrame                      # catálogo compacto (somente leitura)
+    bridges: Dict[str, pd.DataFrame]
+    indexes: Dict[str, TokenIndex]        # filtros país/gênero
+    incidences: Dict[str, Incidence]      # coocorrências do heatmap
+    terms: Optional[TermMatrix] = None
+    text: Optional[TextStore] = None
+    countries: Tuple[str, ...] = ()       # opções da sidebar (categorias das pontes)
+    genres: Tuple[str, ...] = ()
+    year_range: Tuple[int, int] = DEFAULT_YEAR_RANGE
+    score_range: Optional[Tuple[float, float]] = None  # percentis 1–99 do score
+    match: dict = field(default_factory=dict)          # match_stats com ratings.csv
+    cube: Optional[CatalogCube] = None                 # ano × tipo × faixa de score, por roll-up
+    search: Optional[SearchIndex] = None               # busca textual (BM25)
+    ranking: Optional[ScoreRanking] = None             # top N por score sem ordenar o recorte
+    generation: int = 0                                # geração da ingestão (refresh incremental)
+    content_id: str = ""                               # hash do conteúdo das fontes (chave dos presets)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.df)
+
+    def nbytes(self) -> int:
+        # memória residente aproximada (frame + arrays), para o teste de carga
+        total = int(self.df.memory_usage(deep=True).sum())
+        total += sum(int(b.memory_usage(deep=True).sum()) for b in self.bridges.values())
+        arrays = list(self.indexes.values()) + list(self.incidences.values()) + [self.terms, self.search]
+        if self.cube is not None:
+            total += int(self.cube.cells.memory_usage(deep=True).sum())
+            arrays += [self.cube] + [replace(f, incidence=None) for f in self.cube.facets.values()]
+        if self.ranking is not None:
+            arrays += [self.ranking] + list(self.ranking.facets.values())
+        for obj in arrays:
+            if obj is not None:
+                total += sum(getattr(obj, f.name).nbytes for f in fields(obj)
+                             if isinstance(getattr(obj, f.name), np.ndarray))
+        return total
+
+
+def _freeze_array(values):
+    # ndarray ganha uma visão somente leitura (a base não é copiada); Categorical é refeito
+    # sobre os códigos congelados; arrays Arrow já são imutáveis
+    if isinstance(values, np.ndarray):
+        view = values.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(values, pd.Categorical):
+        return pd.Categorical.from_codes(_freeze_array(values.codes), dtype=values.dtype, validate=False)
+    return values
+
+
+def _column_values(s: pd.Series):
+    # colunas NumPy saem como visão do bloco; categorias e strings Arrow, como o array pandas
+    return s.to_numpy() if isinstance(s.dtype, np.dtype) else s.array
+
+
+def freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # um bloco por coluna (copy=False): escrever em qualquer coluna levanta ValueError
+    cols = {c: _freeze_array(_column_values(df[c])) for c in df.columns}
+    return pd.DataFrame(cols, index=df.index, copy=False)
+
+
+def _freeze_fields(obj):
+    # dataclasses de arrays (TokenIndex, Incidence, TermMatrix): mesmos dados, flags somente leitura
+    if obj is None:
+        return None
+    arrays = {f.name: _freeze_array(getattr(obj, f.name)) for f in fields(obj)
+              if isinstance(getattr(obj, f.name), np.ndarray)}
+    return replace(obj, **arrays)
+
+
+def freeze_store(store: CatalogStore) -> CatalogStore:
+    incidences = {c: _freeze_fields(inc) for c, inc in store.incidences.items()}
+    return replace(
+        store,
+        df=freeze_frame(store.df),
+        bridges={c: freeze_frame(b) for c, b in store.bridges.items()},
+        indexes={c: _freeze_fields(ix) for c, ix in store.indexes.items()},
+        incidences=incidences,
+        terms=_freeze_fields(store.terms),
+        search=_freeze_fields(store.search),
+        ranking=None if store.ranking is None else replace(
+            _freeze_fields(store.ranking),
+            facets={c: _freeze_fields(ix) for c, ix in store.ranking.facets.items()},
+        ),
+        cube=None if store.cube is None else replace(
+            _freeze_fields(store.cube),
+            cells=freeze_frame(store.cube.cells),
+            facets={c: replace(_freeze_fields(f), incidence=incidences.get(c, f.incidence))
+                    for c, f in store.cube.facets.items()},
+        ),
+    )
+
+
+def _options(bridges: Dict[str, pd.DataFrame], col: str) -> Tuple[str, ...]:
+    if col not in bridges:
+        return ()
+    return tuple(bridges[col][col].cat.categories.tolist())
+
+
+def _year_range(df: pd.DataFrame) -> Tuple[int, int]:
+    if "release_year" not in df.columns or df["release_year"].isna().all():
+        return DEFAULT_YEAR_RANGE
+    years = df["release_year"].dropna()
+    return (int(years.min()), int(years.max()))
+
+
+def _score_range(df: pd.DataFrame) -> Optional[Tuple[float, float]]:
+    if "score" not in df.columns or df["score"].isna().all():
+        return None
+    scores = df["score"].to_numpy(dtype=float)
+    return (float(np.nanpercentile(scores, 1)), float(np.nanpercentile(scores, 99)))
+
+
+def _search_index(catalog: IngestedCatalog, previous: Optional[CatalogStore], delta: Optional[RowDelta]):
+    # com o store da geração anterior e o diff do refresh, só as linhas alteradas são tokenizadas
+    if previous is not None and delta is not None and previous.search is not None \
+            and previous.generation == delta.base_generation and previous.n_rows == delta.remap.size:
+        return update_search_index(previous.search, catalog.core, catalog.text, delta.remap, delta.changed)
+    return build_search_index(catalog.core, catalog.text)
+
+
+def build_store(catalog: IngestedCatalog, ratings: Optional[TitleKeyIndex] = None,
+                previous: Optional[CatalogStore] = None, delta: Optional[RowDelta] = None) -> CatalogStore:
+    # Tudo o que não depende da sessão: índices, incidências, cubo, busca, rankings, opções e estatísticas de match
+    df, bridges = catalog.core, catalog.bridges
+    indexes = {c: index_from_bridge(bridges[c], len(df)) for c in FILTER_COLUMNS if c in bridges}
+    incidences = build_incidences(df, bridges)
+    store = CatalogStore(
+        df=df,
+        bridges=bridges,
+        indexes=indexes,
+        incidences=incidences,
+        terms=catalog.terms,
+        text=catalog.text,
+        countries=_options(bridges, "country"),
+        genres=_options(bridges, "listed_in"),
+        year_range=_year_range(df),
+        score_range=_score_range(df),
+        match=match_stats(df, ratings),
+        cube=build_cube(df, incidences),
+        search=_search_index(catalog, previous, delta),
+        ranking=build_ranking(df, indexes),
+        generation=catalog.generation,
+        content_id=catalog.content_id,
+    )
+    return freeze_store(store)
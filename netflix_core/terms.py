@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# netflix_core/terms.py
+#
+# Frequência de termos por título (descrições), pré-calculada no carregamento.
+# Tokenização equivalente à do WordCloud.process_text: remove "'s", números e
+# stopwords, junta plurais simples e mostra cada termo na grafia mais comum.
+# Bigramas (dois termos vizinhos, sem stopword entre eles) entram no mesmo vocabulário
+# com os ids dos dois termos; no recorte, os que passam no teste de colocação do
+# WordCloud (razão de verossimilhança > COLLOCATION_THRESHOLD) viram um termo e
+# descontam as contagens dos dois termos, como em wordcloud.tokenization.
+# A nuvem do recorte sai da soma das linhas filtradas (generate_from_frequencies).
+# TermMatrixBuilder aceita as descrições em blocos, na ordem das linhas.
+
+import io
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from wordcloud import STOPWORDS, WordCloud
+
+EXTRA_STOPWORDS = {"film", "series", "movie", "netflix", "season", "year", "story", "one", "two", "new", "set", "based", "life"}
+TOKEN_PATTERN = r"\w[\w']*"
+MAX_WORDS = 200  # mesmo default do WordCloud
+COLLOCATION_THRESHOLD = 30  # idem
+
+
+def _loglik(k: np.ndarray, n: np.ndarray, x: np.ndarray) -> np.ndarray:
+    return np.log(np.maximum(x, 1e-10)) * k + np.log(np.maximum(1 - x, 1e-10)) * (n - k)
+
+
+def collocation_scores(c12: np.ndarray, c1: np.ndarray, c2: np.ndarray, n_words: float) -> np.ndarray:
+    # wordcloud.tokenization.score vetorizado (Dunning); 0 quando um dos termos é o documento inteiro
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = c2 / n_words
+        p1 = c12 / c1
+        p2 = (c2 - c12) / (n_words - c1)
+        score = -2 * (_loglik(c12, c1, p) + _loglik(c2 - c12, n_words - c1, p)
+                      - _loglik(c12, c1, p1) - _loglik(c2 - c12, n_words - c1, p2))
+    return np.where((n_words <= c1) | (n_words <= c2), 0.0, score)
+
+
+@dataclass(frozen=True)
+class TermMatrix:
+    vocab: np.ndarray    # termo na grafia mais comum
+    row_ids: np.ndarray  # (row_ids, term_ids, counts) = matriz esparsa título × termo
+    term_ids: np.ndarray
+    counts: np.ndarray
+    n_rows: int
+    left: Optional[np.ndarray] = None   # bigrama → ids dos dois termos (-1 = termo simples)
+    right: Optional[np.ndarray] = None
+
+    def frequencies(self, mask: Optional[np.ndarray] = None, max_words: int = MAX_WORDS,
+                    collocation_threshold: float = COLLOCATION_THRESHOLD) -> Dict[str, int]:
+        if mask is None:
+            ids, w = self.term_ids, self.counts
+        else:
+            sel = mask[self.row_ids]
+            ids, w = self.term_ids[sel], self.counts[sel]
+        totals = np.bincount(ids, weights=w, minlength=self.vocab.size)
+        if self.left is not None:
+            totals = self._collocations(totals, collocation_threshold)
+        nz = np.flatnonzero(totals > 0)
+        if nz.size > max_words:
+            nz = nz[np.argpartition(-totals[nz], max_words - 1)[:max_words]]
+        nz = nz[np.argsort(-totals[nz], kind="stable")]
+        return {self.vocab[i]: int(totals[i]) for i in nz}
+
+    def _collocations(self, totals: np.ndarray, threshold: float) -> np.ndarray:
+        # bigramas colocados ficam com a própria contagem e descontam a dos termos; os demais saem
+        bigram = self.left >= 0
+        uni = np.where(bigram, 0.0, totals)
+        bi = np.flatnonzero(bigram & (totals > 0))
+        if bi.size == 0:
+            return uni
+        c12, left, right = totals[bi], self.left[bi], self.right[bi]
+        coll = collocation_scores(c12, uni[left], uni[right], uni.sum()) > threshold
+        out = uni.copy()
+        np.subtract.at(out, left[coll], c12[coll])
+        np.subtract.at(out, right[coll], c12[coll])
+        out[bi[coll]] = c12[coll]
+        return out
+
+
+class TermMatrixBuilder:
+    # Acumula a matriz título × termo por blocos de descrições (ingestão em chunks).
+    # Plurais e grafia mais comum dependem do vocabulário inteiro: resolvidos em finish().
+    def __init__(self, stopwords: Optional[Iterable[str]] = None):
+        self.stop = {w.lower() for w in (STOPWORDS | EXTRA_STOPWORDS if stopwords is None else stopwords)}
+        self.keys = pd.Index([], dtype=object)  # termos e bigramas ("a b") em minúsculas, ordem da 1ª aparição
+        self.n_rows = 0
+        self._pairs: List[tuple] = []          # (row, key, count) em int32 por bloco
+        self._forms = pd.DataFrame({"key": np.empty(0, np.int64), "word": np.empty(0, object),
+                                    "count": np.empty(0, np.int64)})  # grafias, somadas a cada bloco
+
+    def add(self, descriptions: pd.Series) -> "TermMatrixBuilder":
+        s = pd.Series(descriptions.fillna("").astype(str).to_numpy(), index=self.n_rows + np.arange(len(descriptions)))
+        self.n_rows += len(descriptions)
+        words = s.str.findall(TOKEN_PATTERN).explode().dropna()
+        words = words.where(~words.str.lower().str.endswith("'s"), words.str[:-2])
+        words = words[(words != "") & ~words.str.isdigit()]
+        lower = words.str.lower()
+        keep = ~lower.isin(self.stop)
+        # bigramas antes de tirar as stopwords: vizinhos na mesma descrição, nenhum dos dois stopword
+        row, w, lw = words.index.to_numpy(), words.to_numpy(dtype=object), lower.to_numpy(dtype=object)
+        pair = np.flatnonzero((row[1:] == row[:-1]) & keep.to_numpy()[1:] & keep.to_numpy()[:-1])
+        bigrams = pd.Series(w[pair] + " " + w[pair + 1], index=row[pair], dtype=object)
+        words = pd.concat([words[keep], bigrams])
+        lower = pd.concat([lower[keep], pd.Series(lw[pair] + " " + lw[pair + 1], index=row[pair], dtype=object)])
+        if words.empty:
+            return self
+
+        new = pd.Index(lower.unique()).difference(self.keys, sort=False)
+        self.keys = self.keys.append(new)
+        codes = self.keys.get_indexer(lower.to_numpy())
+        pairs = pd.DataFrame({"row": words.index.to_numpy(), "key": codes}).value_counts(sort=False).reset_index()
+        self._pairs.append(tuple(pairs[c].to_numpy(dtype=np.int32) for c in ("row", "key", "count")))
+        forms = pd.DataFrame({"key": codes, "word": words.to_numpy()}).value_counts(sort=False).reset_index()
+        self._forms = pd.concat([self._forms, forms]).groupby(["key", "word"], sort=False)["count"].sum().reset_index()
+        return self
+
+    def finish(self) -> TermMatrix:
+        empty = np.empty(0, dtype=np.int32)
+        if not self._pairs:
+            return TermMatrix(np.empty(0, dtype=object), empty, empty, empty, self.n_rows)
+        keys = pd.Series(self.keys.to_numpy(dtype=object))
+
+        # plural simples ("stories" não; "friends" → "friend") quando o singular existe no catálogo;
+        # bigrama só junta com bigrama ("best friends" → "best friend"), como no WordCloud
+        plural = (keys.str.endswith("s") & ~keys.str.endswith("ss") & keys.str[:-1].isin(self.keys)).to_numpy()
+        final_keys = keys.where(~plural, keys.str[:-1])
+        final, _ = pd.factorize(final_keys.to_numpy())
+
+        # grafia mais comum de cada termo (empate: ordem alfabética)
+        forms = self._forms.copy()
+        is_plural = plural[forms["key"].to_numpy()]
+        forms["word"] = forms["word"].where(~is_plural, forms["word"].str[:-1])
+        forms["key"] = final[forms["key"].to_numpy()]
+        forms = forms.groupby(["key", "word"], sort=False)["count"].sum().reset_index()
+        forms = forms.sort_values(["key", "count", "word"], ascending=[True, False, True], kind="stable")
+        vocab = forms.drop_duplicates("key").set_index("key")["word"].reindex(np.arange(final.max() + 1)).to_numpy(dtype=object)
+
+        # componentes de cada bigrama, já no id final dos termos
+        final_str = pd.Series(final_keys.to_numpy(dtype=object)).groupby(final).first()
+        parts = final_str.str.split(" ", n=1, expand=True).reindex(columns=[0, 1])
+        bigram = parts[1].notna().to_numpy()
+        left = np.full(final_str.size, -1, dtype=np.int32)
+        right = np.full(final_str.size, -1, dtype=np.int32)
+        left[bigram] = final[self.keys.get_indexer(parts[0][bigram])]
+        right[bigram] = final[self.keys.get_indexer(parts[1][bigram])]
+
+        # ordena por (linha, termo) e soma os pares que o plural juntou na mesma linha
+        row = np.concatenate([p[0] for p in self._pairs])
+        term = final.astype(np.int32)[np.concatenate([p[1] for p in self._pairs])]
+        count = np.concatenate([p[2] for p in self._pairs])
+        order = np.lexsort((term, row))
+        row, term, count = row[order], term[order], count[order]
+        del order
+        start = np.flatnonzero(np.r_[True, (row[1:] != row[:-1]) | (term[1:] != term[:-1])])
+        return TermMatrix(
+            vocab=vocab,
+            row_ids=row[start],
+            term_ids=term[start],
+            counts=np.add.reduceat(count, start).astype(np.int32),
+            n_rows=self.n_rows,
+            left=left,
+            right=right,
+        )
+
+
+def build_term_matrix(descriptions: pd.Series, stopwords: Optional[Iterable[str]] = None) -> TermMatrix:
+    return TermMatrixBuilder(stopwords).add(descriptions).finish()
+
+
+def render_wordcloud(freqs: Dict[str, int], width: int = 1000, height: int = 360) -> bytes:
+    wc = WordCloud(width=width, height=height, background_color="white", max_words=MAX_WORDS)
+    buf = io.BytesIO()
+    wc.generate_from_frequencies(freqs).to_image().save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# netflix_core/warmup.py
+#
+# Aquecimento da visão padrão: junto com cada snapshot do catálogo, agrega o recorte
+# que o primeiro visitante vê (sidebar sem interação) e monta as figuras Plotly do
+# Dashboard e a nuvem de palavras em paralelo, num pool de processos (plotly e wordcloud
+# são Python puro e seguram o GIL). O WarmView fica no próprio snapshot, compartilhado
+# por todas as sessões: a primeira pintura só lê. As figuras voltam do pool já no JSON
+# compacto do cache de figuras (netflix_core/figcache.py). Os processos nascem de um
+# forkserver (ou spawn), nunca de fork direto: o servidor do Streamlit e a thread de troca
+# de snapshot têm outras threads vivas, e fork com threads pode travar o filho. Sem
+# processos no ambiente (sandbox, semáforos ausentes), cai para um pool de threads.
+# WarmupTask roda o aquecimento em segundo plano: o snapshot vai ao ar sem esperá-lo.
+# warm_view() prepara qualquer recorte do mesmo jeito (os presets salvos usam, em série).
+
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from .aggregations import DashboardAggregates, FilterState, compute_aggregates
+from .charts import DASHBOARD_FIGURES, build_figure, figure_inputs
+from .figcache import compact_json
+from .store import CatalogStore
+from .terms import render_wordcloud
+
+WARM_WORKERS = min(4, os.cpu_count() or 1)
+WARM_MODES = ("process", "thread", "serial")
+
+
+def default_score_range(score_range: Optional[Tuple[float, float]]) -> Optional[Tuple[float, float]]:
+    # valor inicial do slider de score: percentis 1–99 do catálogo, dentro de 0–10
+    if score_range is None:
+        return None
+    lo, hi = score_range
+    return max(0.0, round(lo, 1)), min(10.0, round(hi, 1))
+
+
+def default_filter_state(store: CatalogStore) -> FilterState:
+    # o mesmo estado que a sidebar produz antes de qualquer interação
+    return FilterState.from_selection(year_range=store.year_range, score_range=default_score_range(store.score_range))
+
+
+@dataclass
+class WarmView:
+    state_key: str
+    aggregates: DashboardAggregates
+    figures: Dict[str, str] = field(default_factory=dict)     # nome → JSON compacto
+    wordcloud: Optional[bytes] = None
+    mode: str = "serial"                                       # como as figuras foram montadas
+    timings: Dict[str, float] = field(default_factory=dict)   # ms: agregacao, figuras, total
+
+
+def _figure_json(name: str, values: tuple) -> str:
+    # roda no processo do pool: só o JSON atravessa de volta
+    return compact_json(build_figure(name, *values))
+
+
+def _pool(mode: str, workers: int):
+    if mode == "thread":
+        return ThreadPoolExecutor(workers, thread_name_prefix="warmup")
+    # forkserver: um processo de um só thread, com plotly/wordcloud pré-importados, de onde os
+    # workers saem por fork (sem pagar o import por worker); sem ele, spawn
+    if "forkserver" in mp.get_all_start_methods():
+        ctx = mp.get_context("forkserver")
+        ctx.set_forkserver_preload([__name__])
+    else:
+        ctx = mp.get_context("spawn")
+    return ProcessPoolExecutor(workers, mp_context=ctx)
+
+
+def _build_parallel(jobs: Dict[str, tuple], freqs: Dict[str, int], mode: str, workers: int):
+    with _pool(mode, workers) as pool:
+        # a nuvem é a tarefa mais longa: entra primeiro
+        wc = pool.submit(render_wordcloud, freqs) if freqs else None
+        futures = {name: pool.submit(_figure_json, name, values) for name, values in jobs.items()}
+        return {name: f.result() for name, f in futures.items()}, None if wc is None else wc.result()
+
+
+def warm_view(store: CatalogStore, state: FilterState, mode: str = "process", workers: int = WARM_WORKERS) -> WarmView:
+    if mode not in WARM_MODES:
+        raise ValueError(f"mode deve ser um de {WARM_MODES}: {mode!r}")
+    t0 = time.perf_counter()
+    mask = state.mask(store.df, store.indexes, store.search)
+    agg = compute_aggregates(store.df, store.bridges, mask, state, incidences=store.incidences, cube=store.cube,
+                             ranking=store.ranking)
+    freqs = store.terms.frequencies(mask) if store.terms is not None else {}
+    t_agg = time.perf_counter()
+
+    jobs = {}
+    for name in DASHBOARD_FIGURES:
+        values = figure_inputs(agg, name)
+        if values is not None:
+            jobs[name] = values
+    figures, wc = None, None
+    if mode == "process" and workers > 1:
+        try:
+            figures, wc = _build_parallel(jobs, freqs, mode, workers)
+        except (OSError, ImportError, NotImplementedError, BrokenProcessPool):
+            mode = "thread"
+    if figures is None and mode == "thread" and workers > 1:
+        figures, wc = _build_parallel(jobs, freqs, mode, workers)
+    if figures is None:
+        mode = "serial"
+        figures = {name: _figure_json(name, values) for name, values in jobs.items()}
+        wc = render_wordcloud(freqs) if freqs else None
+    t_end = time.perf_counter()
+    return WarmView(
+        state_key=state.key(),
+        aggregates=agg,
+        figures=figures,
+        wordcloud=wc,
+        mode=mode,
+        timings={"agregacao": (t_agg - t0) * 1e3, "figuras": (t_end - t_agg) * 1e3, "total": (t_end - t0) * 1e3},
+    )
+
+
+def warm_default_view(store: CatalogStore, mode: str = "process", workers: int = WARM_WORKERS) -> WarmView:
+    return warm_view(store, default_filter_state(store), mode, workers)
+
+
+class WarmupTask:
+    # Aquecimento da visão padrão numa thread: quem monta o snapshot devolve a tarefa já iniciada
+    # e o publica na hora; .view fica None até terminar (a página calcula o recorte normalmente).
+    def __init__(self, store: CatalogStore, mode: str = "process", workers: int = WARM_WORKERS):
+        self.view: Optional[WarmView] = None
+        self.error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, args=(store, mode, workers), daemon=True, name="warmup")
+        self._thread.start()
+
+    def _run(self, store: CatalogStore, mode: str, workers: int) -> None:
+        try:
+            self.view = warm_default_view(store, mode, workers)
+        except Exception as e:
+            self.error = e
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[WarmView]:
+        # espera o aquecimento (testes/CLI)
+        self._thread.join(timeout)
+        return self.view
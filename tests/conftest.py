@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# tests/conftest.py
+#
+# Catálogo sintético pequeno (benchmarks/synthetic.py), ingerido uma vez por sessão de testes.
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from netflix_core import build_store, ingest_catalog  # noqa: E402
+from synthetic import write_synthetic_catalog  # noqa: E402
+
+N_ROWS = 3000
+
+
+@pytest.fixture(scope="session")
+def catalog_paths(tmp_path_factory):
+    return write_synthetic_catalog(N_ROWS, str(tmp_path_factory.mktemp("src")), seed=1)
+
+
+@pytest.fixture(scope="session")
+def store(catalog_paths, tmp_path_factory):
+    return build_store(ingest_catalog(*catalog_paths, str(tmp_path_factory.mktemp("cache"))))
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Coocorrência (netflix_core/cooccurrence.py) contra o caminho antigo: explodir country e
+# listed_in e contar com pivot_table, com a expansão em blocos e os dois acumuladores.
+
+import pandas as pd
+import pytest
+
+from netflix_core import cooccurrence, cooccurrence_matrix
+
+
+def pivot(df: pd.DataFrame) -> pd.DataFrame:
+    # explode + pivot_table; token repetido no mesmo título conta uma vez (como nas pontes)
+    tmp = df[["country", "listed_in"]].reset_index(drop=True).rename_axis("row").reset_index()
+    for col in ("country", "listed_in"):
+        tmp[col] = tmp[col].astype(str).str.split(",")
+        tmp = tmp.explode(col)
+        tmp[col] = tmp[col].str.strip()
+    tmp = tmp[(tmp["country"] != "") & (tmp["listed_in"] != "") & ~tmp.isin(["nan"]).any(axis=1)]
+    tmp = tmp.drop_duplicates()
+    out = tmp.pivot_table(index="country", columns="listed_in", values="row", aggfunc="size", fill_value=0)
+    return out.astype("int64").sort_index().sort_index(axis=1)
+
+
+@pytest.mark.parametrize("pair_block, dense_max", [(cooccurrence.PAIR_BLOCK, cooccurrence.DENSE_MAX_CELLS),
+                                                   (97, cooccurrence.DENSE_MAX_CELLS), (97, 0)])
+def test_matches_pivot_table(store, monkeypatch, pair_block, dense_max):
+    monkeypatch.setattr(cooccurrence, "PAIR_BLOCK", pair_block)
+    monkeypatch.setattr(cooccurrence, "DENSE_MAX_CELLS", dense_max)
+    a, b = store.incidences["country"], store.incidences["listed_in"]
+    mask = (store.df["release_year"] >= 2015).to_numpy()
+    for sel in (None, mask):
+        got = cooccurrence_matrix(a, b, sel, top_a=None, top_b=None)
+        expected = pivot(store.df if sel is None else store.df[sel])
+        pd.testing.assert_frame_equal(got, expected, check_names=False)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Cubo (netflix_core/cube.py): poucas células e os mesmos agregados do cálculo linha a linha,
+# barras de país/gênero incluídas (títulos distintos por token, pelo CSR de cada célula).
+
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from netflix_core import FilterState, build_cube, compute_aggregates
+from netflix_core.warmup import default_filter_state
+
+STATES = [
+    FilterState(),
+    FilterState.from_selection(year_range=(2000, 2020)),
+    FilterState.from_selection(score_range=(6.0, 8.5)),
+    FilterState.from_selection(score_range=(6.3, 6.4)),
+    FilterState.from_selection(year_range=(2010, 2021), score_range=(5.1, 9.0)),
+    FilterState.from_selection(year_range=(1800, 1801)),
+]
+
+
+def assert_same(a, b):
+    for f in fields(a):
+        x, y = getattr(a, f.name), getattr(b, f.name)
+        if isinstance(x, (pd.Series, pd.DataFrame)):
+            pd.testing.assert_frame_equal(pd.DataFrame(x), pd.DataFrame(y), check_dtype=False, obj=f.name)
+        elif isinstance(x, float):
+            assert np.isclose(x, y), f.name
+        else:
+            assert x == y, f.name
+
+
+def test_cells_far_below_rows(store):
+    cube = store.cube
+    assert len(cube.cells) < store.n_rows / 3
+    assert int(cube.cells["count"].sum()) == store.n_rows
+    # mesmo cubo num catálogo 4× maior: o número de células quase não cresce
+    big = pd.concat([store.df] * 4, ignore_index=True)
+    assert len(build_cube(big).cells) == len(cube.cells)
+
+
+def test_cell_sums_match_rows(store):
+    score = store.df["score"].to_numpy(dtype=float, na_value=np.nan)
+    cells = store.cube.cells
+    assert np.isclose(cells["sum"].sum(), np.nansum(score))
+    assert np.isclose(cells["sumsq"].sum(), np.nansum(score * score))
+
+
+def test_facet_rollup_counts_distinct_titles(store):
+    dropped = 0
+    for state in STATES:
+        sl = state.cells(store.cube)
+        mask = state.mask(store.df, store.indexes)
+        dropped += sl.dropped.size
+        for col in ("country", "listed_in"):
+            bridge = store.bridges[col]
+            codes = bridge[col].cat.codes.to_numpy()[mask[bridge["title_id"].to_numpy()]]
+            expected = np.bincount(codes, minlength=len(bridge[col].cat.categories))
+            np.testing.assert_array_equal(store.cube.facet_rollup(col, sl), expected, err_msg=col)
+            # pares (célula, token) nunca passam das entradas da ponte
+            assert store.cube.facets[col].codes.size <= len(bridge)
+    assert dropped > 0  # as bordas de score foram descontadas em algum recorte
+
+
+@pytest.mark.parametrize("state", STATES, ids=lambda s: s.key()[:8])
+def test_cube_matches_rows(store, state):
+    mask = state.mask(store.df, store.indexes)
+    args = (store.df, store.bridges, mask, state)
+    assert state.cells(store.cube) is not None
+    assert_same(compute_aggregates(*args, cube=store.cube), compute_aggregates(*args))
+
+
+def test_default_view_matches_rows(store):
+    state = default_filter_state(store)
+    mask = state.mask(store.df, store.indexes)
+    agg = compute_aggregates(store.df, store.bridges, mask, state, cube=store.cube)
+    assert agg.total_titles == mask.sum() and agg.n_scored > 0
+    assert_same(agg, compute_aggregates(store.df, store.bridges, mask, state))
+
+
+def test_facets_fall_back_to_rows(store):
+    state = FilterState.from_selection(["India"], ["Dramas"])
+    assert state.cells(store.cube) is None
+    mask = state.mask(store.df, store.indexes)
+    agg = compute_aggregates(store.df, store.bridges, mask, state, cube=store.cube)
+    assert agg.total_titles == mask.sum()
+    assert agg.country_counts["India"] == agg.total_titles
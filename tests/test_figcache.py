@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Cache de figuras (netflix_core/figcache.py): LRU por entradas e por bytes, chave que muda
+# com os dados (valores, índice, dtype) e figura remontada igual à serializada.
+
+import base64
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from netflix_core import FigureCache, compact_json, figure_from_json, figure_key
+
+
+def bar(series: pd.Series) -> go.Figure:
+    return go.Figure(go.Bar(x=series.index.astype(str), y=series.to_numpy()), layout={"template": "plotly_white"})
+
+
+def test_lru_evicts_least_recently_used():
+    cache = FigureCache(max_bytes=10**6, max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # "a" passa a ser a mais recente
+    cache.put("c", "3")
+    assert cache.get("b") is None and cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.stats() == {"hits": 3, "misses": 1, "hit_rate": 0.75, "entries": 2, "bytes": 2, "evictions": 1}
+
+
+def test_byte_budget():
+    cache = FigureCache(max_bytes=10, max_entries=100)
+    cache.put("a", "x" * 4)
+    cache.put("b", "x" * 4)
+    cache.put("c", "x" * 4)  # 12 bytes > 10: sai a mais antiga
+    assert (len(cache), cache.nbytes, cache.get("a")) == (2, 8, None)
+    cache.put("b", "x" * 2)  # substituir a chave desconta o valor antigo
+    assert cache.nbytes == 6
+    cache.put("grande", "x" * 11)  # maior que o orçamento inteiro: não entra nem despeja
+    assert (len(cache), cache.get("grande"), cache.evictions) == (2, None, 1)
+
+
+def test_key_follows_data():
+    s = pd.Series([3, 2, 1], index=["BR", "US", "FR"], name="qtd")
+    key = figure_key("paises", s)
+    assert figure_key("paises", s.copy()) == key
+    assert figure_key("generos", s) != key
+    assert figure_key("paises", s.replace(3, 4)) != key
+    assert figure_key("paises", s.set_axis(["BR", "US", "IN"])) != key
+    assert figure_key("paises", s.astype("int32")) != key
+    assert figure_key("paises", s, 10) != figure_key("paises", s, 15)
+
+
+def test_payload_builds_once_per_key():
+    cache = FigureCache()
+    calls = []
+
+    def build(series):
+        calls.append(1)
+        return bar(series)
+
+    s = pd.Series([1.123456, 2.0], index=["a", "b"])
+    first = cache.figure("barras", build, s)
+    again = cache.figure("barras", build, s.copy())
+    cache.figure("barras", build, s * 2)
+    assert len(calls) == 2 and (cache.hits, cache.misses) == (1, 2)
+    assert first.to_plotly_json() == again.to_plotly_json()
+    y = first.data[0].y  # arrays NumPy vão em base64 (bdata) no JSON
+    assert np.frombuffer(base64.b64decode(y["bdata"]), dtype=y["dtype"]).tolist() == [1.1235, 2.0]  # FLOAT_DIGITS
+    # template só com os traces usados pela figura
+    assert set(first.layout.template.data.to_plotly_json()) == {"bar"}
+    assert figure_from_json(compact_json(first)).to_plotly_json() == first.to_plotly_json()
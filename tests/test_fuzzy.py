@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Match aproximado (netflix_core/fuzzy.py): chave dobrada, limiar do rapidfuzz, empate
+# (vale a primeira linha de ratings.csv), filtro de ano e bloco pela última palavra.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from netflix_core import apply_fuzzy_mapping, build_fuzzy_mapping, build_title_index, fuzzy_match, join_ratings
+
+pytest.importorskip("rapidfuzz")
+
+RATINGS = pd.DataFrame({
+    "title": ["Amélie!", "Stranger Things", "Narcos Mexicoa", "Narcos Mexicob", "Dark City", "Dark Waters", "Bird Boxa", "Bird Boxb"],
+    "score": [8.0, 8.7, 7.0, 6.0, 5.0, 6.1, 6.6, 4.4],
+    "release_year": [2001, 2016, 2018, 2018, 1998, 2019, 2010, 2018],
+})
+
+
+def matches(queries, threshold=90.0, years=None):
+    index = build_title_index(RATINGS, "score")
+    m = fuzzy_match(pd.Series(queries), index, threshold, query_years=None if years is None else pd.Series(years))
+    return {queries[q]: (index.titles[c], round(s, 1)) for q, c, s in m.itertuples(index=False)}
+
+
+def test_threshold():
+    got = matches(["Amelie", "Stranger Thingz", "Dark Watr", "Dark Ciyt", "Nada Parecido"])
+    # limiar inclusivo: "dark watr" × "dark waters" = 90,0 casa; "dark ciyt" × "dark city" = 88,9 não
+    assert got == {"Amelie": ("Amélie!", 100.0), "Stranger Thingz": ("Stranger Things", 93.3),
+                   "Dark Watr": ("Dark Waters", 90.0)}
+    assert matches(["Dark Ciyt"], threshold=85.0) == {"Dark Ciyt": ("Dark City", 88.9)}
+
+
+def test_tie_keeps_first_rating_row_unless_year_disagrees():
+    assert matches(["Narcos Mexico"])["Narcos Mexico"][0] == "Narcos Mexicoa"
+    assert matches(["Bird Box"])["Bird Box"][0] == "Bird Boxa"
+    # ano a mais de 1 de distância elimina o candidato; ano ausente não elimina
+    assert matches(["Bird Box"], years=[2018])["Bird Box"][0] == "Bird Boxb"
+    assert matches(["Bird Box"], years=[np.nan])["Bird Box"][0] == "Bird Boxa"
+
+
+def test_last_word_block():
+    # a primeira palavra tem erro de digitação: o bloco da última palavra acha o título
+    assert matches(["Strangr Things"])["Strangr Things"][0] == "Stranger Things"
+
+
+def test_mapping_fills_only_missing_scores():
+    index = build_title_index(RATINGS, "score")
+    df = join_ratings(pd.DataFrame({"title": ["Stranger Things", "Stranger Thingz", "Dark Ciyt"],
+                                    "release_year": [2016, 2016, 1998]}), index)
+    mapping = build_fuzzy_mapping(df, index)
+    assert mapping["title_norm"].tolist() == ["stranger thingz"]
+    out = apply_fuzzy_mapping(df, index, mapping)
+    assert out["score"].tolist()[:2] == [8.7, 8.7] and np.isnan(out["score"].iloc[2])
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Índice de tokens (netflix_core/index.py) contra o filtro por substring que ele substituiu.
+
+import numpy as np
+import pandas as pd
+
+from netflix_core import build_token_index, filter_mask
+
+
+def tokens_of(series: pd.Series) -> list:
+    return [set(t.strip() for t in str(v).split(",")) if pd.notna(v) else set() for v in series]
+
+
+def test_exact_token_not_substring():
+    s = pd.Series(["Niger", "Nigeria", "United States, Niger", None, "India, United States"], name="country")
+    ix = build_token_index(s)
+    assert ix.mask_any(["Niger"]).tolist() == [True, False, True, False, False]
+    # o filtro antigo trazia "Nigeria" junto
+    assert s.str.contains("Niger", na=False, regex=False).tolist() == [True, True, True, False, False]
+    assert ix.mask_any(["Niger", "India"]).tolist() == [True, False, True, False, True]
+    assert not ix.mask_any(["Brasil"]).any()
+
+
+def test_index_matches_substring_filter(store):
+    df = store.df
+    for col, options in (("country", store.countries), ("listed_in", store.genres)):
+        sets = tokens_of(df[col].astype(object))
+        text = df[col].astype(object).fillna("").astype(str)
+        for token in options:
+            got = store.indexes[col].mask_any([token])
+            exact = np.array([token in t for t in sets])
+            substring = text.str.contains(token, regex=False).to_numpy()
+            np.testing.assert_array_equal(got, exact)
+            # igual ao substring, exceto onde o token é pedaço de outro ("Movies" ⊂ "International Movies")
+            assert not (got & ~substring).any()
+            if not any(token in other and token != other for other in options):
+                np.testing.assert_array_equal(got, substring)
+
+
+def test_filter_mask_and_between_facets(store):
+    df = store.df
+    countries, genres = ["India", "France"], ["Dramas", "Comedies"]
+    mask = filter_mask(df, store.indexes, countries, genres, (2000, 2015))
+    c, g = tokens_of(df["country"].astype(object)), tokens_of(df["listed_in"].astype(object))
+    year = df["release_year"].to_numpy(dtype=float, na_value=np.nan)
+    expected = np.array([bool(c[i] & set(countries)) and bool(g[i] & set(genres)) for i in range(len(df))])
+    expected &= (year >= 2000) & (year <= 2015)
+    assert expected.any()
+    np.testing.assert_array_equal(mask, expected)
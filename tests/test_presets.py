@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Presets (netflix_core/presets.py): snapshot em JSON volta igual ao WarmView montado,
+# recorte sem snapshot não volta ao SQLite, e a chave é o conteúdo das fontes (não o mtime).
+
+import os
+import shutil
+from dataclasses import fields
+
+import pandas as pd
+
+from netflix_core import FilterState, PresetStore, build_store, default_filter_state, refresh_ingested, warm_view
+from netflix_core.presets import decode_view, encode_view
+
+STATES = [
+    FilterState.from_selection(["Brazil"]),
+    FilterState.from_selection(sel_genres=["Dramas"], year_range=(2010, 2020)),
+    FilterState.from_selection(year_range=(2050, 2051)),  # recorte vazio
+]
+
+
+def assert_views_equal(a, b):
+    assert (a.state_key, a.figures, a.wordcloud, a.mode, a.timings) == (b.state_key, b.figures, b.wordcloud, b.mode,
+                                                                       b.timings)
+    for f in fields(a.aggregates):
+        x, y = getattr(a.aggregates, f.name), getattr(b.aggregates, f.name)
+        if isinstance(x, pd.Series):
+            pd.testing.assert_series_equal(x, y, check_index_type=True)
+        elif isinstance(x, pd.DataFrame):
+            pd.testing.assert_frame_equal(x, y, check_index_type=True, check_column_type=True)
+        else:
+            assert x == y, f.name
+
+
+def test_snapshot_json_round_trip(store):
+    for state in STATES + [default_filter_state(store)]:
+        view = warm_view(store, state, mode="serial")
+        text = encode_view(view)
+        assert isinstance(text, str)
+        assert_views_equal(view, decode_view(text))
+
+
+def test_missing_view_is_memoized(store, tmp_path):
+    presets = PresetStore(str(tmp_path / "presets.sqlite"))
+    state = STATES[0]
+    assert presets.view(state.key(), store.content_id) is None
+    os.remove(presets.path)  # a segunda consulta não pode precisar do SQLite
+    assert presets.view(state.key(), store.content_id) is None
+
+    presets = PresetStore(str(tmp_path / "novo.sqlite"))
+    assert presets.view(state.key(), store.content_id) is None
+    presets.save("Brasil", state)
+    built = presets.build_snapshot("Brasil", store, store.content_id)
+    assert presets.view(state.key(), store.content_id) is built
+
+
+def test_signature_follows_content(catalog_paths, tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    paths = [shutil.copy(p, src) for p in catalog_paths]
+    cache = str(tmp_path / "cache")
+    first = refresh_ingested(*paths, cache).catalog
+    assert first.content_id
+
+    st = os.stat(paths[0])
+    os.utime(paths[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))  # touch: mesmo conteúdo
+    touched = refresh_ingested(*paths, cache).catalog
+    assert touched.content_id == first.content_id
+    assert build_store(touched).content_id == first.content_id
+
+    with open(paths[0], "a", encoding="utf-8") as f:
+        f.write("s999999,Movie,Novo título,Ana Lima,Rui Costa,Brazil,\"May 1, 2021\",2021,PG,90 min,Dramas,descrição\n")
+    changed = refresh_ingested(*paths, cache).catalog
+    assert changed.content_id != first.content_id
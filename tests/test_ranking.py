@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Ranking por score (netflix_core/ranking.py) contra a ordenação completa do recorte.
+
+import numpy as np
+import pytest
+
+from netflix_core import FilterState, facet_mask
+from netflix_core.aggregations import top_by_score
+
+STATES = [
+    FilterState(),
+    FilterState.from_selection(["United States"]),
+    FilterState.from_selection(["Nigeria"]),
+    FilterState.from_selection(["India"], ["Dramas"]),
+    FilterState.from_selection(["France", "Japan", "Egypt"]),
+    FilterState.from_selection((), ["Dramas", "TV Dramas"]),
+    FilterState.from_selection(year_range=(2015, 2021), score_range=(6.0, 9.0)),
+    FilterState.from_selection(score_range=(9.8, 10.0)),
+]
+
+
+def full_sort(df, mask, n):
+    return df.index.get_indexer(top_by_score(df, np.flatnonzero(mask), n).index)
+
+
+@pytest.mark.parametrize("state", STATES, ids=lambda s: s.key()[:8])
+@pytest.mark.parametrize("n", [1, 10, 50])
+def test_top_matches_full_sort(store, state, n):
+    mask = state.mask(store.df, store.indexes)
+    got = store.ranking.top(mask, n, {"country": state.countries, "listed_in": state.genres})
+    np.testing.assert_array_equal(got, full_sort(store.df, mask, n))
+
+
+def test_top_random_masks(store):
+    rng = np.random.default_rng(0)
+    for density in (0.001, 0.01, 0.3):
+        mask = rng.random(store.n_rows) < density
+        np.testing.assert_array_equal(store.ranking.top(mask, 10), full_sort(store.df, mask, 10))
+    assert store.ranking.top(np.zeros(store.n_rows, dtype=bool), 10).size == 0
+
+
+def test_ties_keep_catalog_order(store):
+    # scores com uma casa decimal: muitos empates, desempate pela posição no catálogo
+    score = store.df["score"].to_numpy(dtype=float, na_value=np.nan)
+    order = store.ranking.order
+    assert np.all(np.diff(score[order]) <= 0)
+    same = np.diff(score[order]) == 0
+    assert same.any() and np.all(np.diff(order)[same] > 0)
+
+
+def test_focus_uses_exact_country(store):
+    mask = facet_mask(store.bridges["country"], ["India"], store.n_rows)
+    np.testing.assert_array_equal(mask, store.indexes["country"].mask_any(["India"]))
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Join com ratings.csv (netflix_core/ratings.py): uma linha por show_id, chave repetida resolvida
+# pela primeira linha com score, contra o merge antigo que multiplicava as linhas do catálogo.
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from netflix_core import build_title_index, join_ratings, match_stats, normalize_titles, read_ratings
+from netflix_core.io import read_csv
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def fanout_join(df: pd.DataFrame, ratings: pd.DataFrame, score_col: str) -> pd.DataFrame:
+    # caminho antigo: merge por título normalizado, uma linha por par catálogo × ratings
+    r = ratings.assign(title_norm=normalize_titles(ratings["title"]))[["title_norm", score_col]]
+    return df.assign(title_norm=normalize_titles(df["title"])).merge(r, on="title_norm", how="left")
+
+
+def test_duplicate_keys_pick_first_scored_row():
+    df = pd.DataFrame({"show_id": ["s1", "s2", "s3", "s4"],
+                       "title": ["Dark", "The  Crown", "Ozark", "Sem nota"]})
+    ratings = pd.DataFrame({"title": ["dark", "Dark ", "The Crown", "the crown", "Ozark", "OZARK"],
+                            "score": [np.nan, 8.0, 7.5, 9.9, 6.0, 1.0]})
+    index = build_title_index(ratings, "score")
+    assert index.n_source_rows == 6 and index.n_duplicates == 2  # nota ausente não conta como duplicata
+
+    out = join_ratings(df.copy(), index)
+    assert len(out) == len(df) and out["show_id"].is_unique
+    assert out["score"].tolist()[:3] == [8.0, 7.5, 6.0] and np.isnan(out["score"].iloc[3])
+    assert len(fanout_join(df, ratings, "score")) == 7
+
+    stats = match_stats(out, index)
+    assert (stats["matched"], stats["ratings_duplicates"], stats["ratings_unused"]) == (3, 2, 0)
+
+
+def test_percent_scale_is_rescaled():
+    ratings = pd.DataFrame({"title": ["A", "B"], "score": [85, 42]})
+    index = build_title_index(ratings, "score")
+    np.testing.assert_allclose(index.scores, [8.5, 4.2])
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(DATA, "ratings.csv")), reason="sem data/")
+def test_real_catalog_one_row_per_show_id():
+    df = read_csv(os.path.join(DATA, "netflix_titles.csv"))
+    ratings, score_col = read_ratings(os.path.join(DATA, "ratings.csv"))
+    out = join_ratings(df.copy(), build_title_index(ratings, score_col))
+    fanout = fanout_join(df, ratings, score_col)
+    assert (len(out), len(fanout)) == (8807, 8819)
+    assert out["show_id"].is_unique and fanout["show_id"].nunique() == len(out)
+    # o score escolhido é o da primeira linha de ratings.csv com aquela chave
+    first = fanout.drop_duplicates("show_id", keep="first").set_index("show_id")[score_col]
+    pd.testing.assert_series_equal(out.set_index("show_id")["score"], first, check_names=False)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Refresh incremental (netflix_core/refresh.py) contra a ingestão completa do mesmo CSV:
+# linhas removidas, alteradas e inseridas por show_id, score refeito pelo ratings.csv novo.
+
+import os
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench_refresh import mutate
+from netflix_core import build_store, ingest_catalog, refresh_ingested
+from synthetic import synthetic_catalog
+
+CHUNK_ROWS = 500
+
+
+def assert_arrays_equal(a, b):
+    for f in fields(a):
+        x, y = getattr(a, f.name), getattr(b, f.name)
+        if isinstance(x, np.ndarray):
+            np.testing.assert_array_equal(x, y, err_msg=f.name)
+
+
+@pytest.fixture(scope="module")
+def refreshed(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("refresh")
+    titles, ratings = synthetic_catalog(2000, seed=3)
+    netflix_path, ratings_path = str(tmp / "netflix_titles.csv"), str(tmp / "ratings.csv")
+    titles.to_csv(netflix_path, index=False)
+    ratings.to_csv(ratings_path, index=False)
+    before = build_store(ingest_catalog(netflix_path, ratings_path, str(tmp / "inc"), CHUNK_ROWS))
+
+    new_titles, new_ratings = mutate(titles, ratings, 0.02, seed=3)
+    new_titles.to_csv(netflix_path, index=False)
+    new_ratings.to_csv(ratings_path, index=False)
+    result = refresh_ingested(netflix_path, ratings_path, str(tmp / "inc"), chunk_rows=CHUNK_ROWS)
+    full = ingest_catalog(netflix_path, ratings_path, str(tmp / "full"), CHUNK_ROWS)
+    return before, result, full, (netflix_path, ratings_path, str(tmp / "inc"))
+
+
+def test_diff_counts(refreshed):
+    before, result, full, _ = refreshed
+    assert result.diff == type(result.diff)(inserted=40, updated=40, deleted=40, unchanged=len(full.core) - 80)
+    assert result.delta.base_generation == before.generation == result.catalog.generation - 1
+    assert result.delta.changed.size == 80
+
+
+def test_catalog_equals_full_ingest(refreshed):
+    _, result, full, _ = refreshed
+    inc = result.catalog
+    assert inc.core.equals(full.core) and list(inc.core.dtypes) == list(full.core.dtypes)
+    assert inc.bridges.keys() == full.bridges.keys()
+    for col in full.bridges:
+        assert inc.bridges[col].equals(full.bridges[col]), col
+    rows = np.arange(len(full.core))
+    for col in full.text.columns:
+        assert inc.text.take(col, rows).equals(full.text.take(col, rows)), col
+    np.testing.assert_array_equal(inc.row_hash, full.row_hash)
+    # termos: mesmas contagens por linha; o vocabulário só difere na grafia dos termos novos
+    per_row = [np.bincount(c.terms.row_ids, weights=c.terms.counts, minlength=len(c.core)) for c in (inc, full)]
+    np.testing.assert_array_equal(*per_row)
+
+
+def test_text_take_rows_reads_by_batch(refreshed):
+    _, _, full, _ = refreshed
+    text = full.text
+    offsets = text.offsets()
+    assert offsets[-1] == len(full.core) and offsets.size - 1 == len(full.core) // CHUNK_ROWS
+    rows = np.random.default_rng(5).permutation(len(full.core))[:300]  # fora de ordem, vários batches
+    table = pd.concat([text.get_batch(i).to_pandas() for i in range(offsets.size - 1)], ignore_index=True)
+    got = text.take_rows(rows, ["description", "cast"]).to_pandas()
+    assert got.equals(table.loc[rows, ["description", "cast"]].reset_index(drop=True))
+    assert text.take_rows(np.array([], dtype=np.int64)).num_rows == 0
+
+
+def test_store_equals_full_build(refreshed):
+    before, result, full, _ = refreshed
+    inc = build_store(result.catalog, previous=before, delta=result.delta)
+    ref = build_store(full)
+    assert_arrays_equal(inc.search, ref.search)
+    np.testing.assert_array_equal(inc.search.vocab, ref.search.vocab)
+    for col in ref.indexes:
+        assert_arrays_equal(inc.indexes[col], ref.indexes[col])
+    for col in ref.incidences:
+        assert_arrays_equal(inc.incidences[col], ref.incidences[col])
+    assert_arrays_equal(inc.ranking, ref.ranking)
+    assert (inc.countries, inc.genres, inc.year_range, inc.score_range) == \
+        (ref.countries, ref.genres, ref.year_range, ref.score_range)
+    for query in ("revised edition", "love", "nov"):
+        np.testing.assert_array_equal(inc.search.search(query, prefix=True)[0], ref.search.search(query, prefix=True)[0])
+
+
+def test_unchanged_sources_reuse_store(refreshed):
+    _, _, _, (netflix_path, ratings_path, cache_dir) = refreshed
+    result = refresh_ingested(netflix_path, ratings_path, cache_dir, chunk_rows=CHUNK_ROWS)
+    assert result.diff.changed == 0 and result.delta.changed.size == 0
+    store = build_store(result.catalog)
+    again = build_store(result.catalog, previous=store, delta=result.delta)
+    assert_arrays_equal(again.search, store.search)
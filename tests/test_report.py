@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Relatórios em lote (netflix_core/report.py): pool de processos com o store recarregado
+# da ingestão em disco, plotly.js do CDN na versão do plotly instalado e um arquivo por rótulo.
+
+import os
+
+import pytest
+from plotly.offline import get_plotlyjs_version
+
+from netflix_core import StoreSource, build_store, country_states, export_reports, ingest_catalog
+from netflix_core.report import slugify, unique_slugs
+
+
+@pytest.fixture(scope="module")
+def ingested(catalog_paths, tmp_path_factory):
+    cache_dir = str(tmp_path_factory.mktemp("report_cache"))
+    store = build_store(ingest_catalog(*catalog_paths, cache_dir))
+    return store, StoreSource(*catalog_paths, cache_dir)
+
+
+def test_process_pool_loads_store_from_source(ingested, tmp_path):
+    store, source = ingested
+    states = country_states(store, store.countries[:2])
+    result = export_reports(store, states, str(tmp_path), workers=2, mode="process", plotlyjs="cdn", source=source)
+    assert result.mode == "process"
+    assert [os.path.basename(p) for p in result.paths] == [f"{slugify(label)}.html" for label, _ in states]
+    with open(result.paths[0], encoding="utf-8") as f:
+        page = f.read()
+    assert f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js" in page
+    assert os.path.exists(os.path.join(str(tmp_path), "index.html"))
+
+
+def test_process_pool_needs_matching_source(ingested, tmp_path):
+    store, source = ingested
+    states = country_states(store, store.countries[:2])
+    # sem source, ou com a ingestão de outra versão, os recortes vão para threads
+    assert export_reports(store, states, str(tmp_path / "a"), workers=2, mode="process").mode == "thread"
+    other = StoreSource(source.netflix_path, source.ratings_path, str(tmp_path / "vazio"))
+    assert export_reports(store, states, str(tmp_path / "b"), workers=2, mode="process", source=other).mode == "thread"
+
+
+def test_colliding_labels_get_distinct_files(ingested, tmp_path):
+    store, _ = ingested
+    (_, state), = country_states(store, store.countries[:1])
+    states = [("Côte d'Ivoire", state), ("Cote d Ivoire", state), ("cote-d-ivoire-2", state)]
+    result = export_reports(store, states, str(tmp_path), workers=1, plotlyjs="cdn")
+    names = [os.path.basename(p) for p in result.paths]
+    assert names == ["cote-d-ivoire.html", "cote-d-ivoire-3.html", "cote-d-ivoire-2.html"]
+    assert sorted(os.listdir(tmp_path)) == sorted(names + ["index.html"])
+    assert unique_slugs(["A", "a", "á"]) == ["a", "a-2", "a-3"]
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Busca BM25 (netflix_core/search.py): escores contra uma implementação de referência
+# e a ordem esperada entre campos, tf e tamanho do documento.
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from netflix_core import build_search_index
+from netflix_core.search import BM25_B, BM25_K1
+
+DOCS = pd.DataFrame({
+    "title": ["Harbor Lights", "Quiet Valley", "Dragon Harbor", "Night Train", "São Paulo Nights"],
+    "description": [
+        "fishermen harbor storm",
+        "farmers valley harvest drought harvest",
+        "dragon tamer village",
+        "detective train murder harbor harbor",
+        "samba dancers carnival",
+    ],
+})
+
+
+def bm25_reference(docs, query):
+    # BM25 direto da fórmula, um campo só (peso 1); linha sem algum dos termos = 0
+    tokens = [d.split() for d in docs]
+    avg = sum(map(len, tokens)) / len(tokens)
+    out = np.zeros(len(docs))
+    matched = np.ones(len(docs), dtype=bool)
+    for term in query.split():
+        df = sum(term in t for t in tokens)
+        idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+        for i, t in enumerate(tokens):
+            tf = t.count(term)
+            matched[i] &= tf > 0
+            out[i] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * len(t) / avg))
+    return np.where(matched, out, 0)
+
+
+@pytest.mark.parametrize("query", ["harbor", "harvest", "train", "harbor storm", "valley drought harvest"])
+def test_scores_match_reference(query):
+    ix = build_search_index(DOCS, fields=["description"])
+    expected = bm25_reference(DOCS["description"].tolist(), query)
+    np.testing.assert_allclose(ix.scores(query), expected, rtol=1e-5)
+
+
+def test_title_beats_description():
+    ix = build_search_index(DOCS)
+    rows, _ = ix.search("harbor")
+    # título curto com o termo > título com o termo > só na descrição (mesmo com tf 2)
+    assert rows[0] in (0, 2) and set(rows[:2]) == {0, 2}
+    assert rows.tolist()[2:] == [3]
+
+
+def test_higher_tf_ranks_first():
+    ix = build_search_index(DOCS, fields=["description"])
+    rows, s = ix.search("harbor")
+    assert rows.tolist() == [3, 0] and s[0] > s[1]
+
+
+def test_multi_term_is_and():
+    ix = build_search_index(DOCS)
+    np.testing.assert_array_equal(np.flatnonzero(ix.mask("harbor storm")), [0])
+    assert not ix.mask("dragon harvest").any()
+    assert not ix.mask("harbor xyzzy").any()
+
+
+def test_prefix_and_accents():
+    ix = build_search_index(DOCS)
+    assert ix.scores("harb") is not None and not ix.mask("harb").any()
+    np.testing.assert_array_equal(np.flatnonzero(ix.mask("harb", prefix=True)), [0, 2, 3])
+    np.testing.assert_array_equal(np.flatnonzero(ix.mask("sao paulo")), [4])
+    np.testing.assert_array_equal(np.flatnonzero(ix.mask("SÃO")), [4])
+    assert ix.scores("the of") is None
+
+
+def test_search_respects_mask_and_limit(store):
+    word = "love"
+    scores = store.search.scores(word)
+    assert (scores > 0).sum() > 20
+    mask = np.zeros(store.n_rows, dtype=bool)
+    mask[::2] = True
+    rows, s = store.search.search(word, mask=mask, limit=10)
+    assert rows.size == 10 and mask[rows].all()
+    assert np.all(np.diff(s) <= 0)
+    hit = np.flatnonzero((scores > 0) & mask)
+    assert s[-1] >= np.sort(scores[hit])[-10]
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# Termos da nuvem (netflix_core/terms.py): mesmas frequências do WordCloud.process_text,
+# stopwords (inclusive as extras) fora, bigramas colocados descontando os termos, por recorte.
+
+import numpy as np
+import pandas as pd
+from wordcloud import STOPWORDS, WordCloud
+
+from netflix_core import EXTRA_STOPWORDS, TermMatrixBuilder, build_term_matrix
+
+FILLER = "detective partner coffee bakery pirates ocean island village doctor teacher".split()
+DESCRIPTIONS = pd.Series(
+    [f"Ice cream shop: {FILLER[i]} sells ice cream to {FILLER[(i + 3) % 10]} and ice lovers." for i in range(10)]
+    + ["In 1999 the film's Jazz musicians play jazz music and jazz in a new cream colored club with two clubs."]
+)
+
+
+def test_matches_wordcloud_process_text():
+    expected = WordCloud(stopwords=STOPWORDS | EXTRA_STOPWORDS).process_text("\n".join(DESCRIPTIONS))
+    assert build_term_matrix(DESCRIPTIONS).frequencies() == expected
+
+
+def test_kept_and_dropped_terms():
+    freqs = build_term_matrix(DESCRIPTIONS).frequencies()
+    # colocação: "ice cream" e "cream shop" viram termos e "cream" some (todas as ocorrências foram absorvidas)
+    assert (freqs["Ice cream"], freqs["cream shop"], freqs["ice"]) == (20, 10, 10)
+    assert "cream" not in freqs
+    # plural junta no singular, grafia mais comum, sem "'s" nem números
+    assert freqs["club"] == 2 and freqs["jazz"] == 3 and "film" not in freqs
+    dropped = {"in", "the", "to", "and", "a", "with", "film", "new", "two", "1999", "film's", "clubs"}
+    assert not dropped & {w.lower() for w in freqs}
+
+
+def test_collocations_follow_the_slice():
+    tm = build_term_matrix(DESCRIPTIONS)
+    last = np.zeros(len(DESCRIPTIONS), dtype=bool)
+    last[-1] = True
+    freqs = tm.frequencies(last)
+    assert freqs["cream"] == 1 and "Ice cream" not in freqs
+    assert tm.frequencies(collocation_threshold=np.inf)["cream"] == 21
+
+
+def test_chunked_builder_equals_single_pass():
+    whole = build_term_matrix(DESCRIPTIONS)
+    builder = TermMatrixBuilder()
+    for start in range(0, len(DESCRIPTIONS), 4):
+        builder.add(DESCRIPTIONS.iloc[start:start + 4])
+    chunked = builder.finish()
+    assert chunked.frequencies() == whole.frequencies()
+    per_row = [np.bincount(t.row_ids, weights=t.counts, minlength=t.n_rows) for t in (whole, chunked)]
+    np.testing.assert_array_equal(*per_row)
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+# Aquecimento em segundo plano: o pool de processos (forkserver/spawn, disparado de uma
+# thread) monta as mesmas figuras que a montagem em série.
+
+from netflix_core import WarmupTask, warm_default_view
+
+
+def test_background_warmup_matches_serial(store):
+    task = WarmupTask(store, mode="process", workers=2)
+    view = task.wait(timeout=300)
+    assert task.error is None and not task.running
+    assert view.mode in ("process", "thread")
+    serial = warm_default_view(store, mode="serial")
+    assert view.state_key == serial.state_key
+    assert view.figures == serial.figures
+    assert view.wordcloud is not None and view.aggregates.total_titles == serial.aggregates.total_titles